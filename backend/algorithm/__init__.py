@@ -4,10 +4,18 @@ from backend.algorithm.seperators import (
     SquareSeperator,
     RectangleSeperator
 )
+from backend.algorithm.preprocessing import (
+    CompressedPoints,
+    compress_points
+)
+from backend.algorithm.range_sum import RangeSumIndex
 
 __all__=[
     'Point',
     'Rectangle',
     'SquareSeperator',
-    'RectangleSeperator'
+    'RectangleSeperator',
+    'CompressedPoints',
+    'compress_points',
+    'RangeSumIndex'
 ]
\ No newline at end of file
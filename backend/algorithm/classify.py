@@ -0,0 +1,206 @@
+"""Vectorized containment queries of point batches against computed shapes.
+
+``ShapeIndex`` answers, for every point in a batch, which shape contains it
+(the lowest shape index wins, -1 for none) and how many batch points each
+shape contains. Containment is closed on all sides, like Rectangle.contains.
+With few shapes every shape is tested against the whole batch. With many,
+an interval index over x (or y, whichever is smaller) narrows each point
+to the shapes covering its slab first; it is only built while it stays
+within ``SLAB_ENTRIES_PER_SHAPE`` entries per shape per log2(shapes).
+Shapes overlapping too much for that are scanned in order against just
+the points they can still label, and their counts come from offline
+range counts, so no path grows with the square of the shape count.
+"""
+import math
+from typing import Iterable, Iterator, Mapping, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+from backend.algorithm.range_sum import RangeSumIndex, dominance_sums
+from backend.utils.imports import lazy_import
+
+if TYPE_CHECKING:
+    from backend.algorithm.seperators import Rectangle
+
+np = lazy_import("numpy", "Point classification")
+
+# Above this many shapes, use the slab interval index
+INTERVAL_INDEX_MIN_SHAPES = 16
+# Slab index size limit, in entries per shape per log2(shapes)
+SLAB_ENTRIES_PER_SHAPE = 16
+# (point, candidate shape) pairs tested per vectorized step
+MAX_PAIRS_PER_STEP = 1 << 22
+
+ShapeLike = Union["Rectangle", Mapping[str, float]]
+
+
+def _shape_bounds(shape: ShapeLike) -> Tuple[float, float, float, float]:
+    if isinstance(shape, Mapping):
+        x, y, w, h = shape["x"], shape["y"], shape["width"], shape["height"]
+    else:
+        x, y, w, h = shape.x, shape.y, shape.width, shape.height
+    # x + w exactly as Rectangle.contains computes it
+    return (x, x + w, y, y + h)
+
+
+def _total(inside: "np.ndarray", count: Optional["np.ndarray"]) -> int:
+    if count is None:
+        return int(np.count_nonzero(inside))
+    return int(count[inside].sum())
+
+
+def _slab_entries(lo: "np.ndarray", hi: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Boundaries, first slab and slab count of every [lo, hi] interval.
+
+    Slab 2k+1 is the boundary value b[k] itself, slab 2k the open gap
+    before it; an interval with edges b[i], b[j] covers slabs 2i+1 .. 2j+1.
+    """
+    b = np.unique(np.concatenate([lo, hi]))
+    first = 2 * np.searchsorted(b, lo) + 1
+    return b, first, 2 * np.searchsorted(b, hi) + 2 - first
+
+
+class ShapeIndex:
+    """Reusable containment index over a fixed list of shapes."""
+
+    def __init__(self, shapes: Sequence[ShapeLike]):
+        bounds = np.array([_shape_bounds(s) for s in shapes], dtype=np.float64).reshape(-1, 4)
+        self.min_x, self.max_x, self.min_y, self.max_y = bounds.T.copy()
+        self.num_shapes = len(bounds)
+        self.use_interval_index = (
+            self.num_shapes >= INTERVAL_INDEX_MIN_SHAPES and self._build_interval_index()
+        )
+
+    def _build_interval_index(self) -> bool:
+        """Shapes covering each slab of the cheaper axis, in ascending shape
+        order, as one flat array cut by ``_slab_starts``. Returns False,
+        building nothing, when both axes exceed the size limit."""
+        limit = SLAB_ENTRIES_PER_SHAPE * self.num_shapes * math.ceil(math.log2(self.num_shapes))
+        b, first, sizes, self._slab_axis = min(
+            (
+                _slab_entries(self.min_x, self.max_x) + ("x",),
+                _slab_entries(self.min_y, self.max_y) + ("y",),
+            ),
+            key=lambda entries: int(entries[2].sum()),
+        )
+        entries = int(sizes.sum())
+        if entries > limit:
+            return False
+        shape_of_entry = np.repeat(np.arange(self.num_shapes), sizes)
+        # Offset of each entry within its shape's run of slabs
+        within = np.arange(entries) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        slab_of_entry = np.repeat(first, sizes) + within
+        # Stable, so every slab lists its shapes in ascending order
+        order = np.argsort(slab_of_entry, kind="stable")
+        self._boundaries = b
+        self._slab_shapes = shape_of_entry[order]
+        self._slab_starts = np.searchsorted(slab_of_entry[order], np.arange(2 * len(b) + 2))
+        return True
+
+    def _slab_of(self, v: "np.ndarray") -> "np.ndarray":
+        b = self._boundaries
+        pos = np.searchsorted(b, v, side="left")
+        exact = (pos < len(b)) & (b[np.minimum(pos, len(b) - 1)] == v)
+        return 2 * pos + exact
+
+    def classify(self, x, y, count=None) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Per-point shape label (-1 for none) and per-shape point counts.
+
+        ``count`` gives each point's multiplicity (e.g. a registered
+        dataset's deduplicated points); it only affects the counts.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        count = None if count is None else np.asarray(count, dtype=np.int64)
+        labels = np.full(len(x), -1, dtype=np.int64)
+        counts = np.zeros(self.num_shapes, dtype=np.int64)
+        if not self.num_shapes or not len(x):
+            return labels, counts
+        if self.use_interval_index:
+            return self._classify_slabs(x, y, count, labels, counts)
+        if self.num_shapes >= INTERVAL_INDEX_MIN_SHAPES:
+            return self._classify_overlapping(x, y, count, labels)
+
+        # Reverse order so the lowest index ends up as the label
+        for k in range(self.num_shapes - 1, -1, -1):
+            inside = (
+                (self.min_x[k] <= x) & (x <= self.max_x[k])
+                & (self.min_y[k] <= y) & (y <= self.max_y[k])
+            )
+            counts[k] = _total(inside, count)
+            labels[inside] = k
+        return labels, counts
+
+    def _classify_slabs(self, x, y, count, labels, counts) -> Tuple["np.ndarray", "np.ndarray"]:
+        if self._slab_axis == "x":
+            along, across, cross_min, cross_max = x, y, self.min_y, self.max_y
+        else:
+            along, across, cross_min, cross_max = y, x, self.min_x, self.max_x
+        slabs = self._slab_of(along)
+        starts = self._slab_starts[slabs]
+        lengths = self._slab_starts[slabs + 1] - starts
+        ends = np.cumsum(lengths)
+        cut = 0
+        while cut < len(x):
+            # Next run of points whose candidates fit in MAX_PAIRS_PER_STEP
+            stop = max(cut + 1, int(np.searchsorted(ends, ends[cut] - lengths[cut] + MAX_PAIRS_PER_STEP, side="right")))
+            step_lengths = lengths[cut:stop]
+            pairs = int(step_lengths.sum())
+            if pairs:
+                point = np.repeat(np.arange(cut, stop), step_lengths)
+                within = np.arange(pairs) - np.repeat(np.cumsum(step_lengths) - step_lengths, step_lengths)
+                shape = self._slab_shapes[np.repeat(starts[cut:stop], step_lengths) + within]
+                inside = (cross_min[shape] <= across[point]) & (across[point] <= cross_max[shape])
+                point, shape = point[inside], shape[inside]
+                weights = None if count is None else count[point]
+                counts += np.rint(np.bincount(shape, weights=weights, minlength=self.num_shapes)).astype(np.int64)
+                # Pairs are grouped by point in ascending shape order,
+                # so a point's first hit is its lowest shape
+                hit, first = np.unique(point, return_index=True)
+                labels[hit] = shape[first]
+            cut = stop
+        return labels, counts
+
+    def _classify_overlapping(self, x, y, count, labels) -> Tuple["np.ndarray", "np.ndarray"]:
+        points = RangeSumIndex.from_arrays(
+            x, y, np.zeros(len(x)), np.ones(len(x), dtype=np.int64) if count is None else count
+        )
+        counts = points.box_sums(np.column_stack([self.min_x, self.max_x, self.min_y, self.max_y]))[:, -1]
+        # Shapes covering each point, as closed-box corner dominance counts:
+        # +1 at (min_x, min_y) and (max_x+, max_y+), -1 at the other two
+        # corners, where v+ is the next float above v
+        above_x, above_y = np.nextafter(self.max_x, np.inf), np.nextafter(self.max_y, np.inf)
+        covered = dominance_sums(
+            np.concatenate([self.min_x, above_x, above_x, self.min_x]),
+            np.concatenate([self.min_y, above_y, self.min_y, above_y]),
+            np.repeat([1, 1, -1, -1], self.num_shapes),
+            x,
+            y,
+        )[:, 0]
+        # Ascending, so a point keeps the first shape that takes it; points
+        # no shape covers are never scanned
+        remaining = np.flatnonzero(covered > 0)
+        for k in range(self.num_shapes):
+            if not len(remaining):
+                break
+            px, py = x[remaining], y[remaining]
+            inside = (
+                (self.min_x[k] <= px) & (px <= self.max_x[k])
+                & (self.min_y[k] <= py) & (py <= self.max_y[k])
+            )
+            labels[remaining[inside]] = k
+            remaining = remaining[~inside]
+        return labels, counts
+
+
+def classify_points(shapes: Sequence[ShapeLike], x, y, count=None) -> Tuple["np.ndarray", "np.ndarray"]:
+    """One-shot ``ShapeIndex(shapes).classify(x, y, count)``."""
+    return ShapeIndex(shapes).classify(x, y, count)
+
+
+def classify_chunks(
+    shapes: Sequence[ShapeLike],
+    chunks: Iterable[Tuple[Sequence[float], Sequence[float]]],
+) -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+    """Classify an (x, y) chunk stream lazily, yielding (labels, counts) per chunk."""
+    index = ShapeIndex(shapes)
+    for x, y in chunks:
+        yield index.classify(x, y)
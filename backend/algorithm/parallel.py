@@ -0,0 +1,306 @@
+"""Multi-process evaluation of candidate splits for very large instances.
+
+The parent sorts the unique red points once along each sweep axis and
+copies those coordinates, with the blue range-sum index, into
+``multiprocessing.shared_memory`` blocks. Each worker gets only a range of
+split positions plus the block names: it builds that range's shape pairs
+from the shared coordinates, scores them with one exact RangeSumIndex batch
+and returns only its best pair, so neither candidates nor points are
+built in the parent or pickled per task.
+"""
+import asyncio
+import atexit
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+from backend.algorithm.preprocessing import CompressedPoints, PointArrays
+from backend.algorithm.range_sum import RangeSumIndex, normalize_limbs
+from backend.utils.imports import lazy_import
+
+np = lazy_import("numpy", "Parallel solve")
+
+# Ranges per worker; a few per worker evens out the load between them
+CHUNKS_PER_WORKER = 4
+
+# Same minimum shape extent as the sequential sweeps
+EPS = 1e-6
+
+# name -> (shared memory block name, array shape, dtype string)
+ArraySpecs = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+# (axis, first split, end split, offset of the axis' splits in sweep order)
+SplitRange = Tuple[str, int, int, int]
+
+# (sort key, candidate index in sweep order, summed box_sums row)
+RangeBest = Tuple[Tuple[int, ...], int, List[int]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+def default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def release_affinity() -> None:
+    """Let a pool process run on any core the host allows.
+
+    Pool processes inherit the affinity of the server worker that starts
+    them, and backend.server pins each worker to a single core; the kernel
+    narrows the full mask down to the cgroup's cpuset.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, range(os.cpu_count() or 1))
+    except OSError:
+        pass
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    """Process pool reused across solves; recreated if the size changes."""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        shutdown_executor()
+        # spawn: never fork a process that may be running server threads
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=release_affinity
+        )
+        _executor_workers = workers
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+    _executor, _executor_workers = None, 0
+
+
+atexit.register(shutdown_executor)
+
+
+class SharedArrays:
+    """Arrays copied once into named shared memory blocks, dtype preserved."""
+
+    def __init__(self, arrays: Dict[str, "np.ndarray"]):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.specs: ArraySpecs = {}
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self.blocks.append(shm)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+                self.specs[name] = (shm.name, values.shape, values.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+        self.blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _attach(specs: ArraySpecs) -> Tuple[List[shared_memory.SharedMemory], Dict[str, "np.ndarray"]]:
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        # Workers share the parent's resource tracker, so attaching does not
+        # add a second owner; the parent alone unlinks the block
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
+
+
+def coordinate_arrays(points: Union[CompressedPoints, PointArrays]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """x and y of every unique point, as float64 arrays."""
+    if isinstance(points, PointArrays):
+        return points.x, points.y
+    return (
+        np.fromiter((p.x for p in points.points), dtype=np.float64, count=len(points)),
+        np.fromiter((p.y for p in points.points), dtype=np.float64, count=len(points)),
+    )
+
+
+def known_orders(points: Union[CompressedPoints, PointArrays]) -> Optional[Dict[str, "np.ndarray"]]:
+    """Stored stable sort orders of the points, keyed by axis, if any."""
+    if isinstance(points, PointArrays) and points.order_x is not None and points.order_y is not None:
+        return {"x": points.order_x, "y": points.order_y}
+    return None
+
+
+def sweep_arrays(x, y, orders: Optional[Dict[str, "np.ndarray"]] = None) -> Dict[str, "np.ndarray"]:
+    """Unique red points sorted along each sweep axis ('y' first, like the
+    sequential sweeps) and the positions where that coordinate changes.
+
+    Every change position is one candidate split: points before it form
+    the lower/left shape, the rest the upper/right one. ``orders`` are
+    precomputed stable argsorts per axis (see ``known_orders``).
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    arrays = {}
+    for axis, key in (("y", y), ("x", x)):
+        order = np.argsort(key, kind="stable") if orders is None else np.asarray(orders[axis])
+        ordered = key[order]
+        arrays[f"{axis}_x"] = x[order]
+        arrays[f"{axis}_y"] = y[order]
+        arrays[f"{axis}_cuts"] = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+    return arrays
+
+
+def _prefix_boxes(x: "np.ndarray", y: "np.ndarray", cuts: "np.ndarray") -> "np.ndarray":
+    """(min_x, max_x, min_y, max_y) of ``x[:cut], y[:cut]`` for every cut."""
+    end = int(cuts.max())
+    at = cuts - 1
+    return np.stack(
+        [
+            np.minimum.accumulate(x[:end])[at],
+            np.maximum.accumulate(x[:end])[at],
+            np.minimum.accumulate(y[:end])[at],
+            np.maximum.accumulate(y[:end])[at],
+        ],
+        axis=-1,
+    )
+
+
+def split_shapes(arrays: Dict[str, "np.ndarray"], axis: str, start: int, stop: int, squares: bool) -> "np.ndarray":
+    """(splits, 2, 4) array of (x, y, width, height) shape pairs.
+
+    Same floats as ``candidate_rects``/``candidate_squares`` produce for
+    splits ``start:stop`` of the ``axis`` sweep.
+    """
+    x, y = arrays[f"{axis}_x"], arrays[f"{axis}_y"]
+    cuts = arrays[f"{axis}_cuts"][start:stop]
+    lower = _prefix_boxes(x, y, cuts)
+    upper = _prefix_boxes(x[::-1], y[::-1], len(x) - cuts)
+    pairs = np.stack([lower, upper], axis=1)
+    width = pairs[..., 1] - pairs[..., 0]
+    height = pairs[..., 3] - pairs[..., 2]
+    if squares:
+        width = height = np.maximum(np.maximum(width, height), EPS)
+    else:
+        width, height = np.maximum(width, EPS), np.maximum(height, EPS)
+    return np.stack([pairs[..., 0], pairs[..., 2], width, height], axis=-1)
+
+
+def _best_in_range(arrays: Dict[str, "np.ndarray"], squares: bool, axis: str, start: int, stop: int, offset: int) -> RangeBest:
+    """Best pair among splits ``start:stop`` of the ``axis`` sweep."""
+    index = RangeSumIndex.from_export(arrays)
+    shapes = split_shapes(arrays, axis, start, stop, squares).reshape(-1, 4)
+    # Same closed bounds as rect_bounds
+    bounds = np.stack(
+        [shapes[:, 0], shapes[:, 0] + shapes[:, 2], shapes[:, 1], shapes[:, 1] + shapes[:, 3]],
+        axis=-1,
+    )
+    sums = index.box_sums(bounds)
+    totals = sums[0::2] + sums[1::2]
+    best = index.argmin_weight(totals)  # first minimum, like the sequential sweep
+    key = normalize_limbs(totals[best:best + 1, :index.limbs])[0]
+    return tuple(int(limb) for limb in key[::-1]), offset + start + best, [int(v) for v in totals[best]]
+
+
+def _evaluate_range(specs: ArraySpecs, squares: bool, axis: str, start: int, stop: int, offset: int) -> RangeBest:
+    blocks, arrays = _attach(specs)
+    try:
+        return _best_in_range(arrays, squares, axis, start, stop, offset)
+    finally:
+        # Views must be gone before the mapping can be closed
+        arrays.clear()
+        for shm in blocks:
+            shm.close()
+
+
+def _problem_arrays(x, y, blue_index: RangeSumIndex, orders: Optional[Dict[str, "np.ndarray"]]) -> Dict[str, "np.ndarray"]:
+    arrays = dict(blue_index.export())
+    arrays.update(sweep_arrays(x, y, orders))
+    return arrays
+
+
+def split_ranges(arrays: Dict[str, "np.ndarray"], workers: int) -> List[SplitRange]:
+    """Cut both sweeps into about ``workers * CHUNKS_PER_WORKER`` ranges."""
+    y_splits, x_splits = len(arrays["y_cuts"]), len(arrays["x_cuts"])
+    chunk = max(1, math.ceil((y_splits + x_splits) / (workers * CHUNKS_PER_WORKER)))
+    return [
+        (axis, start, min(start + chunk, count), offset)
+        for axis, count, offset in (("y", y_splits, 0), ("x", x_splits, y_splits))
+        for start in range(0, count, chunk)
+    ]
+
+
+def _winner(arrays: Dict[str, "np.ndarray"], results: List[RangeBest], squares: bool) -> Tuple[Optional["np.ndarray"], Optional[List[int]]]:
+    if not results:
+        return None, None
+    # Exact keys; ties resolve to the lowest index, as in the sequential sweep
+    _, best, total = min(results)
+    y_splits = len(arrays["y_cuts"])
+    axis, split = ("y", best) if best < y_splits else ("x", best - y_splits)
+    return split_shapes(arrays, axis, split, split + 1, squares)[0], total
+
+
+def evaluate_splits(
+    x,
+    y,
+    blue_index: RangeSumIndex,
+    squares: bool = False,
+    workers: Optional[int] = None,
+    orders: Optional[Dict[str, "np.ndarray"]] = None,
+) -> Tuple[Optional["np.ndarray"], Optional[List[int]]]:
+    """Shape pair (see ``split_shapes``) and summed ``box_sums`` row of the
+    cheapest split of the unique red points ``x``/``y``.
+
+    Sums are exact, so the answer matches the sequential sweep.
+    ``workers=1`` scores everything in-process.
+    """
+    workers = workers or default_workers()
+    arrays = _problem_arrays(x, y, blue_index, orders)
+    ranges = split_ranges(arrays, workers)
+    if workers <= 1:
+        return _winner(arrays, [_best_in_range(arrays, squares, *r) for r in ranges], squares)
+
+    executor = get_executor(workers)
+    with SharedArrays(arrays) as shared:
+        futures = [executor.submit(_evaluate_range, shared.specs, squares, *r) for r in ranges]
+        results = [f.result() for f in futures]
+    return _winner(arrays, results, squares)
+
+
+async def evaluate_splits_async(
+    x,
+    y,
+    blue_index: RangeSumIndex,
+    squares: bool = False,
+    workers: Optional[int] = None,
+    orders: Optional[Dict[str, "np.ndarray"]] = None,
+) -> Tuple[Optional["np.ndarray"], Optional[List[int]]]:
+    """``evaluate_splits`` for the event loop: sorting and copying run in a
+    thread and the worker futures are awaited, never blocked on."""
+    workers = workers or default_workers()
+    loop = asyncio.get_running_loop()
+    if workers <= 1:
+        return await loop.run_in_executor(None, evaluate_splits, x, y, blue_index, squares, 1, orders)
+
+    arrays = await loop.run_in_executor(None, _problem_arrays, x, y, blue_index, orders)
+    ranges = split_ranges(arrays, workers)
+    executor = get_executor(workers)
+    shared = await loop.run_in_executor(None, SharedArrays, arrays)
+    try:
+        results = await asyncio.gather(
+            *(asyncio.wrap_future(executor.submit(_evaluate_range, shared.specs, squares, *r)) for r in ranges)
+        )
+    finally:
+        shared.close()
+    return _winner(arrays, list(results), squares)
@@ -0,0 +1,169 @@
+from typing import List, Tuple, Dict, Optional, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from backend.algorithm.seperators import Point
+
+# Bounds are kept in the same (min_x,max_x,min_y,max_y) order used by the solvers
+Bounds = Tuple[float, float, float, float]
+
+
+class CompressedPoints:
+    """Deduplicated point set with rank-compressed coordinates.
+
+    Every distinct (x, y) is stored once together with its multiplicity
+    (``counts``) and the summed weight of its copies (``weights``).
+    ``xs``/``ys`` hold the sorted distinct coordinate values and
+    ``x_ranks``/``y_ranks`` map each unique point to its index in them.
+    """
+
+    def __init__(
+        self,
+        points: List["Point"],
+        counts: List[int],
+        weights: List[float],
+        xs: List[float],
+        ys: List[float],
+        x_ranks: List[int],
+        y_ranks: List[int],
+    ):
+        self.points = points
+        self.counts = counts
+        self.weights = weights
+        self.xs = xs
+        self.ys = ys
+        self.x_ranks = x_ranks
+        self.y_ranks = y_ranks
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def total_weight(self) -> float:
+        return sum(self.weights)
+
+    def groups(self, axis: str) -> List[List["Point"]]:
+        """Unique points bucketed by their rank on ``axis`` ('x' or 'y').
+
+        Consecutive buckets are separated by exactly one candidate split,
+        so runs of equal coordinates never produce a split between them.
+        """
+        if axis == 'x':
+            ranks, size = self.x_ranks, len(self.xs)
+        elif axis == 'y':
+            ranks, size = self.y_ranks, len(self.ys)
+        else:
+            raise ValueError(f"Unknown axis '{axis}'")
+        buckets: List[List["Point"]] = [[] for _ in range(size)]
+        for point, rank in zip(self.points, ranks):
+            buckets[rank].append(point)
+        return buckets
+
+
+class PointArrays:
+    """Unique points held as parallel arrays, e.g. a registered dataset's
+    memory-mapped files.
+
+    Same role as CompressedPoints, but no Point objects are built: the
+    solvers sweep these with numpy (see backend/algorithm/parallel.py).
+    ``order_x``/``order_y``, when known, are the stable sorted orders along
+    each axis, so the sweep does not sort again.
+    """
+
+    def __init__(self, x, y, weights, counts, order_x=None, order_y=None):
+        self.x = x
+        self.y = y
+        self.weights = weights
+        self.counts = counts
+        self.order_x = order_x
+        self.order_y = order_y
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def total_count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+
+def compress_points(points: Sequence["Point"]) -> CompressedPoints:
+    """Deduplicate ``points`` and rank-compress their coordinates.
+
+    Copies of the same location are merged and their weights summed, so
+    pre-aggregated inputs collapse the same way as raw duplicates.
+    Runs in O(n log n); the order of first occurrence is preserved.
+    """
+    counts: Dict[Tuple[float, float], int] = {}
+    weights: Dict[Tuple[float, float], float] = {}
+    first: Dict[Tuple[float, float], "Point"] = {}
+    for p in points:
+        key = (p.x, p.y)
+        if key in counts:
+            counts[key] += 1
+            weights[key] += p.weight
+        else:
+            counts[key] = 1
+            weights[key] = p.weight
+            first[key] = p
+
+    unique = list(counts)
+    xs = sorted({x for x, _ in unique})
+    ys = sorted({y for _, y in unique})
+    x_index = {v: i for i, v in enumerate(xs)}
+    y_index = {v: i for i, v in enumerate(ys)}
+
+    return CompressedPoints(
+        points=[first[key] for key in unique],
+        counts=[counts[key] for key in unique],
+        weights=[weights[key] for key in unique],
+        xs=xs,
+        ys=ys,
+        x_ranks=[x_index[x] for x, _ in unique],
+        y_ranks=[y_index[y] for _, y in unique],
+    )
+
+
+def cumulative_bounds(groups: Sequence[Sequence["Point"]]) -> List[Optional[Bounds]]:
+    """Bounding box of ``groups[0..i]`` for every i, in a single pass."""
+    result: List[Optional[Bounds]] = []
+    min_x = min_y = float('inf')
+    max_x = max_y = float('-inf')
+    seen = False
+    for group in groups:
+        for p in group:
+            x, y = p.x, p.y
+            if x < min_x:
+                min_x = x
+            if x > max_x:
+                max_x = x
+            if y < min_y:
+                min_y = y
+            if y > max_y:
+                max_y = y
+            seen = True
+        result.append((min_x, max_x, min_y, max_y) if seen else None)
+    return result
+
+
+def split_bounds(groups: Sequence[Sequence["Point"]]) -> List[Tuple[Bounds, Bounds]]:
+    """(lower, upper) bounding boxes for every split between consecutive groups.
+
+    Split k separates ``groups[:k]`` from ``groups[k:]``; only splits with
+    points on both sides are returned, in sweep order.
+    """
+    prefix = cumulative_bounds(groups)
+    suffix = cumulative_bounds(groups[::-1])[::-1]
+    splits: List[Tuple[Bounds, Bounds]] = []
+    for k in range(1, len(groups)):
+        lower, upper = prefix[k - 1], suffix[k]
+        if lower is None or upper is None:
+            continue
+        splits.append((lower, upper))
+    return splits
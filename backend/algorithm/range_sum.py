@@ -0,0 +1,305 @@
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from backend.algorithm.preprocessing import Bounds, CompressedPoints
+from backend.utils.imports import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    from backend.algorithm.seperators import Rectangle
+
+# Weights are summed as exact integers split into limbs of this many bits;
+# a limb column summed over fewer than 2**31 points cannot overflow int64
+LIMB_BITS = 31
+LIMB_MASK = (1 << LIMB_BITS) - 1
+# Bits of precision kept below the largest weight (at most three limbs)
+WEIGHT_BITS = 3 * LIMB_BITS
+
+
+def _numpy():
+    # Imported on first use: the solvers are loaded by `import backend.app`
+    return lazy_import("numpy", "Weighted range sums")
+
+
+def weight_limbs(weights) -> Tuple["np.ndarray", int]:
+    """Fixed-point form of non-negative float weights.
+
+    Returns ``(limbs, scale)`` with ``round(weights[i] * 2**scale) ==
+    sum(limbs[i, k] << LIMB_BITS*k)``. Every finite float is a multiple of
+    a power of two, so the smallest common ``scale`` makes all of them
+    integers without rounding. That scale is capped so the largest weight
+    stays below ``2**WEIGHT_BITS``: weights spanning more than WEIGHT_BITS
+    bits are rounded to multiples of ``2**-scale`` and the index never
+    needs more than three limbs.
+    """
+    np = _numpy()
+    w = np.asarray(weights, dtype=np.float64).reshape(-1)
+    if not np.isfinite(w).all() or (w < 0).any():
+        raise ValueError("Weights must be finite and non-negative")
+    nonzero = w != 0
+    if not nonzero.any():
+        return np.zeros((len(w), 1), dtype=np.int64), 0
+    frac, exp = np.frexp(w)
+    mantissa = np.ldexp(frac, 53).astype(np.int64)
+    # Exponent of each weight's lowest set bit
+    lowest_bit = np.frexp((mantissa & -mantissa).astype(np.float64))[1] - 1
+    low = exp - 53 + lowest_bit
+    scale = min(max(0, -int(low[nonzero].min())), WEIGHT_BITS - int(exp[nonzero].max()))
+    # Integer-valued floats below 2**WEIGHT_BITS; splitting off the top limb
+    # leaves at most 53 significant bits, so every step is exact
+    scaled = np.rint(np.ldexp(w, scale))
+    top = np.floor(np.ldexp(scaled, -2 * LIMB_BITS))
+    low = (scaled - np.ldexp(top, 2 * LIMB_BITS)).astype(np.int64)
+    limbs = np.column_stack([low & LIMB_MASK, low >> LIMB_BITS, top.astype(np.int64)])
+    count = max(1, -(-int(scaled.max()).bit_length() // LIMB_BITS))
+    return np.ascontiguousarray(limbs[:, :count]), scale
+
+
+def _level_orders(y_rank: "np.ndarray", ny: int):
+    """Yield, for level 0, 1, ..., the positions sorted by (block of
+    2**level, y rank)."""
+    np = _numpy()
+    m = len(y_rank)
+    order = np.arange(m)
+    yield order
+    for level in range(1, m.bit_length()):
+        keys = (order >> level) * (ny + 1) + y_rank[order]
+        # Runs sorted by y within the previous blocks; a stable sort merges them
+        order = order[np.argsort(keys, kind="stable")]
+        yield order
+
+
+def merge_levels(y_rank: "np.ndarray", ny: int) -> "np.ndarray":
+    """Every ``_level_orders`` level above the first, one row each.
+
+    They only depend on the indexed points, so an index that is queried
+    again and again (e.g. a registered dataset) can store them once.
+    """
+    np = _numpy()
+    m = len(y_rank)
+    levels = np.zeros((max(0, m.bit_length() - 1), m), dtype=np.int32 if m < 2**31 else np.int64)
+    for level, order in enumerate(_level_orders(y_rank, ny)):
+        if level:
+            levels[level - 1] = order
+    return levels
+
+
+def _dominance_sums(
+    y_rank: "np.ndarray",
+    values: "np.ndarray",
+    ny: int,
+    prefix: "np.ndarray",
+    below: "np.ndarray",
+    levels: Optional["np.ndarray"] = None,
+) -> "np.ndarray":
+    """Row sums of ``values[:prefix[i]]`` restricted to ``y_rank < below[i]``.
+
+    Offline merge-sort-tree walk: the x-ordered positions are cut into
+    blocks of 2**level, every prefix is a union of at most one block per
+    level, and each level only needs the previous level's order merged
+    pairwise. O((m + q) log m) time, O(m + q) memory; with stored
+    ``merge_levels`` no level is sorted again.
+    """
+    np = _numpy()
+    m = len(y_rank)
+    out = np.zeros((len(prefix), values.shape[1]), dtype=np.int64)
+    stride = ny + 1
+    if levels is None:
+        orders = _level_orders(y_rank, ny)
+    else:
+        orders = itertools.chain([np.arange(m)], levels)
+    for level, order in enumerate(orders):
+        selected = np.nonzero((prefix >> level) & 1)[0]
+        if not len(selected):
+            continue
+        order = np.asarray(order, dtype=np.int64)
+        keys = (order >> level) * stride + y_rank[order]
+        cumulative = np.zeros((m + 1, values.shape[1]), dtype=np.int64)
+        np.cumsum(values[order], axis=0, out=cumulative[1:])
+        block = ((prefix[selected] >> level) - 1) * stride
+        lo = np.searchsorted(keys, block, side="left")
+        hi = np.searchsorted(keys, block + below[selected], side="left")
+        out[selected] += cumulative[hi] - cumulative[lo]
+    return out
+
+
+def dominance_sums(x, y, values, qx, qy) -> "np.ndarray":
+    """For every query, the sum of ``values`` (int64 rows, any sign) over
+    the points with ``x <= qx`` and ``y <= qy``. O((m + q) log m)."""
+    np = _numpy()
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    order = np.argsort(x, kind="stable")
+    ys, y_rank = np.unique(y, return_inverse=True)
+    return _dominance_sums(
+        y_rank.reshape(-1)[order].astype(np.int64),
+        np.asarray(values, dtype=np.int64).reshape(len(x), -1)[order],
+        len(ys),
+        np.searchsorted(x[order], qx, side="right"),
+        np.searchsorted(ys, qy, side="right"),
+    )
+
+
+class RangeSumIndex:
+    """Exact weighted orthogonal range sums over a compressed point set.
+
+    Per-location weights are held as integer limbs (see ``weight_limbs``),
+    so range sums are exact to ``2**-WEIGHT_BITS`` of the largest weight
+    and only rounded once, when converted back to a float. Point counts are
+    kept as one more integer column. Queries are answered offline in
+    batches (``box_sums``) in O((m + q) log m); the solvers collect every
+    candidate shape first and issue a single batch.
+    """
+
+    def __init__(self, points: CompressedPoints):
+        np = _numpy()
+        order = sorted(range(len(points)), key=points.x_ranks.__getitem__)
+        self._init(
+            x=np.array([points.xs[points.x_ranks[i]] for i in order], dtype=np.float64),
+            ys=np.array(points.ys, dtype=np.float64),
+            y_rank=np.array([points.y_ranks[i] for i in order], dtype=np.int64),
+            weights=np.array([points.weights[i] for i in order], dtype=np.float64),
+            counts=np.array([points.counts[i] for i in order], dtype=np.int64),
+        )
+
+    def _init(self, x, ys, y_rank, weights, counts) -> None:
+        np = _numpy()
+        limbs, self.scale = weight_limbs(weights)
+        self.x, self.ys, self.y_rank = x, ys, y_rank
+        self.values = np.column_stack([limbs, counts]).astype(np.int64)
+        self.levels = None
+
+    @classmethod
+    def from_arrays(cls, x, y, weights, counts) -> "RangeSumIndex":
+        """Index over unique points given as arrays (in any order)."""
+        np = _numpy()
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        order = np.argsort(x, kind="stable")
+        ys, y_rank = np.unique(y, return_inverse=True)
+        index = cls.__new__(cls)
+        index._init(
+            x=x[order],
+            ys=ys,
+            y_rank=y_rank.reshape(-1)[order].astype(np.int64),
+            weights=np.asarray(weights, dtype=np.float64)[order],
+            counts=np.asarray(counts, dtype=np.int64)[order],
+        )
+        return index
+
+    def store_levels(self) -> "RangeSumIndex":
+        """Precompute the ``merge_levels`` of this index, so later batches
+        skip every sort; costs O(m log m) extra memory."""
+        self.levels = merge_levels(self.y_rank, len(self.ys))
+        return self
+
+    @property
+    def limbs(self) -> int:
+        return self.values.shape[1] - 1
+
+    @property
+    def total_count(self) -> int:
+        return int(self.values[:, -1].sum())
+
+    @property
+    def total_weight(self) -> float:
+        return self.to_weight(self.values.sum(axis=0))
+
+    def box_sums(self, boxes) -> "np.ndarray":
+        """Exact sums for closed (min_x, max_x, min_y, max_y) boxes.
+
+        Returns a (len(boxes), limbs + 1) int64 array: the weight limbs
+        followed by the point count. Rows can be added together before
+        ``to_weight``/``argmin_weight`` without losing precision.
+        """
+        np = _numpy()
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if not len(boxes):
+            return np.zeros((0, self.values.shape[1]), dtype=np.int64)
+        p_lo = np.searchsorted(self.x, boxes[:, 0], side="left")
+        p_hi = np.searchsorted(self.x, boxes[:, 1], side="right")
+        j_lo = np.searchsorted(self.ys, boxes[:, 2], side="left")
+        j_hi = np.searchsorted(self.ys, boxes[:, 3], side="right")
+        sums = _dominance_sums(
+            self.y_rank,
+            self.values,
+            len(self.ys),
+            np.concatenate([p_hi, p_lo, p_hi, p_lo]),
+            np.concatenate([j_hi, j_hi, j_lo, j_lo]),
+            self.levels,
+        ).reshape(4, len(boxes), self.values.shape[1])
+        return sums[0] - sums[1] - sums[2] + sums[3]
+
+    def to_weight(self, row) -> float:
+        """Correctly rounded float of one (possibly summed) ``box_sums`` row."""
+        total = sum(int(limb) << (LIMB_BITS * k) for k, limb in enumerate(row[:self.limbs]))
+        if self.scale < 0:
+            return float(total << -self.scale)
+        return total / (1 << self.scale)
+
+    def argmin_weight(self, rows: "np.ndarray") -> Optional[int]:
+        """Index of the first row with the smallest exact weight (None if empty)."""
+        np = _numpy()
+        if not len(rows):
+            return None
+        limbs = normalize_limbs(rows[:, :self.limbs])
+        candidates = np.arange(len(limbs))
+        for k in reversed(range(limbs.shape[1])):
+            column = limbs[candidates, k]
+            candidates = candidates[column == column.min()]
+        return int(candidates[0])
+
+    def query(self, min_x: float, max_x: float, min_y: float, max_y: float) -> float:
+        """Total weight of points with min_x<=x<=max_x and min_y<=y<=max_y.
+
+        A single query costs a full O(m log m) pass; batch with ``box_sums``.
+        """
+        return self.to_weight(self.box_sums([(min_x, max_x, min_y, max_y)])[0])
+
+    def count(self, min_x: float, max_x: float, min_y: float, max_y: float) -> int:
+        return int(self.box_sums([(min_x, max_x, min_y, max_y)])[0, -1])
+
+    def query_rect(self, rect: "Rectangle") -> float:
+        return self.query(*rect_bounds(rect))
+
+    def export(self) -> Dict[str, "np.ndarray"]:
+        """Arrays that fully describe the index, e.g. to store or share them."""
+        np = _numpy()
+        arrays = {
+            "x": self.x,
+            "ys": self.ys,
+            "y_rank": self.y_rank,
+            "values": self.values,
+            "scale": np.array([self.scale], dtype=np.int64),
+        }
+        if self.levels is not None:
+            arrays["levels"] = self.levels
+        return arrays
+
+    @classmethod
+    def from_export(cls, data: Dict[str, "np.ndarray"]) -> "RangeSumIndex":
+        """Rebuild an index from ``export()`` output without copying it, so
+        memory-mapped or shared arrays stay shared."""
+        index = cls.__new__(cls)
+        index.x, index.ys, index.y_rank, index.values = data["x"], data["ys"], data["y_rank"], data["values"]
+        index.scale = int(data["scale"][0])
+        index.levels = data.get("levels")
+        return index
+
+
+def normalize_limbs(limbs: "np.ndarray") -> "np.ndarray":
+    """Carry every limb but the top one into [0, 2**LIMB_BITS), so rows
+    compare lexicographically from the top limb down."""
+    limbs = limbs.copy()
+    for k in range(limbs.shape[1] - 1):
+        limbs[:, k + 1] += limbs[:, k] >> LIMB_BITS
+        limbs[:, k] &= LIMB_MASK
+    return limbs
+
+
+def rect_bounds(rect: "Rectangle") -> Bounds:
+    # Same closed bounds as Rectangle.contains
+    return (rect.x, rect.x + rect.width, rect.y, rect.y + rect.height)
+
+
+def shapes_bounds(pairs: Sequence[Tuple["Rectangle", "Rectangle"]]) -> List[Bounds]:
+    """Bounds of every shape of every candidate pair, pair by pair."""
+    return [rect_bounds(r) for pair in pairs for r in pair]
@@ -1,9 +1,13 @@
-from typing import  List, Tuple, Dict, Optional
+from typing import  List, Tuple, Dict, Optional, Union
 from pydantic import BaseModel
+from backend.algorithm.preprocessing import CompressedPoints, PointArrays, compress_points, split_bounds
+from backend.algorithm.range_sum import RangeSumIndex, rect_bounds, shapes_bounds
 
 class Point(BaseModel):
     x: float
     y: float
+    # Penalty for blue points, importance for red points
+    weight: float = 1.0
 
     class Config:
         frozen= True
@@ -27,15 +31,38 @@ class Rectangle:
         }
 
 
+def shape_pair(shapes)->Optional[Tuple[Rectangle,Rectangle]]:
+    # (2, 4) array of (x, y, width, height) rows from the parallel sweep
+    if shapes is None:
+        return None
+    return tuple(Rectangle(*(float(v) for v in row)) for row in shapes)
+
+
 #Implementing the logic for rectangle seperator
 # PRoblem statement 6.1
 # TC: O(m+n) with O(mlogm+nlogn) preprocessing
 # SC O(m+n)
+# Blue points are weighted; the sweep minimizes total covered blue weight
 
 class RectangleSeperator:
-    def __init__(self,red_points:List[Point],blue_points:List[Point]):
+    def __init__(
+        self,
+        red_points:List[Point],
+        blue_points:List[Point],
+        red:Optional[Union[CompressedPoints,PointArrays]]=None,
+        blue:Optional[CompressedPoints]=None,
+        blue_index:Optional[RangeSumIndex]=None
+    ):
         self.red_points=red_points
         self.blue_points=blue_points
+        # Deduplicated / rank-compressed red points shared by both sweeps
+        # (prebuilt ones, e.g. from a registered dataset, are used as given)
+        self.red=red if red is not None else compress_points(red_points)
+        # Blue is only used through its index; a prebuilt one (e.g. the mapped
+        # index of a registered dataset) is used as given
+        if blue_index is None:
+            blue_index=RangeSumIndex(blue if blue is not None else compress_points(blue_points))
+        self.blue_index=blue_index
 
     def find_bounding_rect(self,points:List[Point])->Optional[Tuple[float,float,float,float]]:
         if not points:
@@ -47,30 +74,20 @@ class RectangleSeperator:
         return (min_x,max_x,min_y,max_y)
 
     def count_blue_in_rect(self,rect:Rectangle)->int:
-        count=0
-        for bp in self.blue_points:
-            if rect.contains(bp):
-                count+=1
-        return count
+        # Each unique blue point counts with its multiplicity
+        return self.blue_index.count(*rect_bounds(rect))
+
+    def blue_weight_in_rect(self,rect:Rectangle)->float:
+        return self.blue_index.query_rect(rect)
     
-    def solve(self)->Dict:
-        if not self.red_points:
-            return {'rectangles':[], 'blue_covered': 0, 'red_covered': 0}
-        best_rects=None
-        min_blue_count=float('inf')
+    def candidate_rects(self)->List[Tuple[Rectangle,Rectangle]]:
+        """Rectangle pair for every candidate split, horizontal sweep first."""
         EPS=1e-6
+        candidates=[]
         # First veertical sweep line
-        red_sorted_y=sorted(self.red_points,key=lambda p:p.y)
-        for i in range(len(red_sorted_y)-1):
-            split_y=(red_sorted_y[i].y + red_sorted_y[i+1].y)/2
-            # Get red points above and below the split
-            lower_red=[p for p in self.red_points if p.y <= split_y]
-            upper_red=[p for p in self.red_points if p.y > split_y]
-            if not lower_red or not upper_red:
-                continue
-            lower_bounds=(self.find_bounding_rect(lower_red))
-            upper_bounds=(self.find_bounding_rect(upper_red))
-
+        # One candidate split per pair of consecutive distinct red y values;
+        # lower/upper bounds come from prefix/suffix boxes instead of refiltering
+        for lower_bounds,upper_bounds in split_bounds(self.red.groups('y')):
             rect1=Rectangle(
                 lower_bounds[0],
                 lower_bounds[2],
@@ -86,23 +103,10 @@ class RectangleSeperator:
                 max(upper_bounds[3]-upper_bounds[2],EPS)
                 # add some buffer if required
             )
+            candidates.append((rect1,rect2))
 
-            blue_count= (self.count_blue_in_rect(rect1) + self.count_blue_in_rect(rect2))
-            if blue_count < min_blue_count:
-                min_blue_count=blue_count
-                best_rects=(rect1,rect2)
-            
             #Vertical Line Sweep
-        red_sorted_x=sorted(self.red_points,key=lambda p:p.x)
-        for i in range(len(red_sorted_x)-1):
-            split_x=(red_sorted_x[i].x + red_sorted_x[i+1].x)/2
-            left_red=[p for p in self.red_points if p.x <= split_x]
-            right_red=[p for p in self.red_points if p.x > split_x]
-            if not left_red or not right_red:
-                continue
-            left_bounds=self.find_bounding_rect(left_red)
-            right_bounds=self.find_bounding_rect(right_red)
-
+        for left_bounds,right_bounds in split_bounds(self.red.groups('x')):
             rect1=Rectangle(
                 left_bounds[0],
                 left_bounds[2],
@@ -116,24 +120,70 @@ class RectangleSeperator:
                 max(right_bounds[1]-right_bounds[0],EPS),
                 max(right_bounds[3]-right_bounds[2],EPS)
             )
+            candidates.append((rect1,rect2))
+        return candidates
 
-            blue_count=self.count_blue_in_rect(rect1) + self.count_blue_in_rect(rect2)
-            if blue_count < min_blue_count:
-                min_blue_count=blue_count
-                best_rects=(rect1,rect2)
+    def solve(self)->Dict:
+        if not len(self.red):
+            return {'rectangles':[], 'blue_covered': 0, 'blue_weight_covered': 0.0, 'red_covered': 0, 'red_weight_covered': 0.0}
+        if isinstance(self.red,PointArrays):
+            # No Point objects to sweep: use the vectorized sweep in-process
+            return self.solve_parallel(workers=1)
+        candidates=self.candidate_rects()
+        # One exact batch for every shape; pair totals stay exact integers
+        sums=self.blue_index.box_sums(shapes_bounds(candidates))
+        totals=sums[0::2]+sums[1::2]
+        best=self.blue_index.argmin_weight(totals)
+        if best is None:
+            return self._result(None,None)
+        return self._result(candidates[best],totals[best])
+
+    def solve_parallel(self,workers:Optional[int]=None)->Dict:
+        """Same result as solve(), with the split sweep spread across processes."""
+        if not len(self.red):
+            return self.solve()
+        from backend.algorithm.parallel import coordinate_arrays, evaluate_splits, known_orders
+        shapes,total=evaluate_splits(*coordinate_arrays(self.red),self.blue_index,squares=False,workers=workers,orders=known_orders(self.red))
+        return self._result(shape_pair(shapes),total)
+
+    async def solve_parallel_async(self,workers:Optional[int]=None)->Dict:
+        """solve_parallel() that awaits the workers instead of blocking the event loop."""
+        if not len(self.red):
+            return self.solve()
+        from backend.algorithm.parallel import coordinate_arrays, evaluate_splits_async, known_orders
+        shapes,total=await evaluate_splits_async(*coordinate_arrays(self.red),self.blue_index,squares=False,workers=workers,orders=known_orders(self.red))
+        return self._result(shape_pair(shapes),total)
+
+    def _result(self,best_rects,total)->Dict:
+        # total: summed RangeSumIndex.box_sums row of the two shapes
         return {
             'rectangles': [r.to_dict() for r in best_rects] if best_rects else [],
-            'blue_covered': int(min_blue_count) if min_blue_count!=float('inf') else 0,
-            'red_covered': len(self.red_points)
+            'blue_covered': int(total[-1]) if best_rects else 0,
+            'blue_weight_covered': self.blue_index.to_weight(total) if best_rects else 0.0,
+            'red_covered': self.red.total_count,
+            'red_weight_covered': self.red.total_weight
         }
 
 #Implements the logic for Square Sperator
 # TC : O(n*m) with O(mlogm + nlogn) preprocessing
 # SC O(m+n)
 class SquareSeperator:
-    def __init__(self,red_points:List[Point],blue_points:List[Point]):
+    def __init__(
+        self,
+        red_points:List[Point],
+        blue_points:List[Point],
+        red:Optional[Union[CompressedPoints,PointArrays]]=None,
+        blue:Optional[CompressedPoints]=None,
+        blue_index:Optional[RangeSumIndex]=None
+    ):
         self.red_points=red_points
         self.blue_points=blue_points
+        self.red=red if red is not None else compress_points(red_points)
+        # Blue is only used through its index; a prebuilt one (e.g. the mapped
+        # index of a registered dataset) is used as given
+        if blue_index is None:
+            blue_index=RangeSumIndex(blue if blue is not None else compress_points(blue_points))
+        self.blue_index=blue_index
     def find_bouding_square(self,points:List[Point])->Optional[Tuple[float,float,float,float]]:
         if not points:
             return None
@@ -145,28 +195,16 @@ class SquareSeperator:
         return (min_x,max_x,min_y,max_y)
     
     def count_blue_in_square(self,square:Rectangle)->int:
-        count=0
-        for bp in self.blue_points:
-            if square.contains(bp):
-                count+=1
-        return count
-    # Find set of squares that cover all red points while minimizing blue points
-    def solve(self)->Dict:
-        if not self.red_points:
-            return {"squares":[],"blue_covered":0,"red_coverd":0}
-        EPS=1e-6
-        best_squares=None
-        min_blue_count=float('inf')
-        red_sorted_y=sorted(self.red_points,key=lambda p:p.y)
-        for i in range(len(red_sorted_y)-1):
-            split_y=(red_sorted_y[i].y + red_sorted_y[i+1].y)/2
-            lower_red=[p for p in self.red_points if p.y <= split_y]
-            upper_red=[p for p in self.red_points if p.y > split_y]
-            if not lower_red or not upper_red:
-                continue
-            lower_bounds=self.find_bouding_square(lower_red)
-            upper_bounds=self.find_bouding_square(upper_red)
+        # Each unique blue point counts with its multiplicity
+        return self.blue_index.count(*rect_bounds(square))
 
+    def blue_weight_in_square(self,square:Rectangle)->float:
+        return self.blue_index.query_rect(square)
+    def candidate_squares(self)->List[Tuple[Rectangle,Rectangle]]:
+        """Square pair for every candidate split, horizontal sweep first."""
+        EPS=1e-6
+        candidates=[]
+        for lower_bounds,upper_bounds in split_bounds(self.red.groups('y')):
             side1=max(lower_bounds[1]-lower_bounds[0],lower_bounds[3]-lower_bounds[2])
             side2=max(upper_bounds[1]-upper_bounds[0],upper_bounds[3]-upper_bounds[2])
 
@@ -185,46 +223,65 @@ class SquareSeperator:
                 max(side2,EPS)
             )
             # Add buffer if required
-            blue_count=self.count_blue_in_square(square1) + self.count_blue_in_square(square2)
-            if blue_count < min_blue_count:
-                min_blue_count=blue_count
-                best_squares=(square1,square2)
+            candidates.append((square1,square2))
             # Vertical Line Sweep
-        red_sorted_x=sorted(self.red_points,key=lambda p:p.x)
-        for i in range(len(red_sorted_x)-1):
-            split_x=(red_sorted_x[i].x + red_sorted_x[i+1].x)/2
-            left_red=[p for p in self.red_points if p.x <= split_x]
-            right_red=[p for p in self.red_points if p.x > split_x]
-            if not left_red or not right_red:
-                continue
-            left_bounds=self.find_bouding_square(left_red)
-            right_bounds=self.find_bouding_square(right_red)
-
+        for left_bounds,right_bounds in split_bounds(self.red.groups('x')):
             side1=max(left_bounds[1]-left_bounds[0],left_bounds[3]-left_bounds[2])
             side2=max(right_bounds[1]-right_bounds[0],right_bounds[3]-right_bounds[2])
 
             square1=Rectangle(
                 left_bounds[0],
                 left_bounds[2],
-                side1,
-                side1
+                max(side1,EPS),
+                max(side1,EPS)
             )
 
             square2=Rectangle(
                 right_bounds[0],
                 right_bounds[2],
-                side2,
-                side2
+                max(side2,EPS),
+                max(side2,EPS)
             )
+            candidates.append((square1,square2))
+        return candidates
+
+    # Find set of squares that cover all red points while minimizing blue points
+    def solve(self)->Dict:
+        if not len(self.red):
+            return {"squares":[],"blue_covered":0,"blue_weight_covered":0.0,"red_coverd":0,"red_weight_covered":0.0}
+        if isinstance(self.red,PointArrays):
+            # No Point objects to sweep: use the vectorized sweep in-process
+            return self.solve_parallel(workers=1)
+        candidates=self.candidate_squares()
+        sums=self.blue_index.box_sums(shapes_bounds(candidates))
+        totals=sums[0::2]+sums[1::2]
+        best=self.blue_index.argmin_weight(totals)
+        if best is None:
+            return self._result(None,None)
+        return self._result(candidates[best],totals[best])
+
+    def solve_parallel(self,workers:Optional[int]=None)->Dict:
+        """Same result as solve(), with the split sweep spread across processes."""
+        if not len(self.red):
+            return self.solve()
+        from backend.algorithm.parallel import coordinate_arrays, evaluate_splits, known_orders
+        shapes,total=evaluate_splits(*coordinate_arrays(self.red),self.blue_index,squares=True,workers=workers,orders=known_orders(self.red))
+        return self._result(shape_pair(shapes),total)
 
-            blue_count=self.count_blue_in_square(square1) + self.count_blue_in_square(square2)
-            if blue_count < min_blue_count:
-                min_blue_count=blue_count
-                best_squares=(square1,square2)
+    async def solve_parallel_async(self,workers:Optional[int]=None)->Dict:
+        """solve_parallel() that awaits the workers instead of blocking the event loop."""
+        if not len(self.red):
+            return self.solve()
+        from backend.algorithm.parallel import coordinate_arrays, evaluate_splits_async, known_orders
+        shapes,total=await evaluate_splits_async(*coordinate_arrays(self.red),self.blue_index,squares=True,workers=workers,orders=known_orders(self.red))
+        return self._result(shape_pair(shapes),total)
 
+    def _result(self,best_squares,total)->Dict:
         return {
             "squares":[s.to_dict() for s in best_squares] if best_squares else [],
-            "blue_covered": int(min_blue_count) if min_blue_count!=float('inf') else 0,
-            "red_covered": len(self.red_points)
+            "blue_covered": int(total[-1]) if best_squares else 0,
+            "blue_weight_covered": self.blue_index.to_weight(total) if best_squares else 0.0,
+            "red_covered": self.red.total_count,
+            "red_weight_covered": self.red.total_weight
         }
 # Updated and completed Algorithm Logic
\ No newline at end of file
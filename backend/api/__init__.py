@@ -5,7 +5,16 @@ from .models import(
     SeperatorResponse,
     ErrorResponse,
     ShapeSchema,
-    HealthResponse
+    HealthResponse,
+    DatasetUploadRequest,
+    DatasetInfo,
+    DatasetImportResponse,
+    ClassifyRequest,
+    ClassifyResponse,
+    TilesetRequest,
+    TilesetInfo,
+    TileLayer,
+    TileResponse
 )
 
 from .routes import router
@@ -18,5 +27,14 @@ __all__=[
     'ErrorResponse',
     'ShapeSchema',
     'HealthResponse',
+    'DatasetUploadRequest',
+    'DatasetInfo',
+    'DatasetImportResponse',
+    'ClassifyRequest',
+    'ClassifyResponse',
+    'TilesetRequest',
+    'TilesetInfo',
+    'TileLayer',
+    'TileResponse',
     'router'
-]
\ No newline at end of file
+]
@@ -1,11 +1,17 @@
-from pydantic import BaseModel, Field, EmailStr, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Dict
 from datetime import datetime, timezone
 from enum import Enum
 
 class PointSchema(BaseModel):
     x: float =Field(..., description="X coordinate of the point")
     y: float = Field(..., description="Y coord of the point")
+    weight: float = Field(
+        default=1.0,
+        description="Penalty (blue) or importance (red) of the point",
+        ge=0,
+        le=1e9
+    )
 
     @field_validator('x','y')
     @classmethod
@@ -20,7 +26,8 @@ class PointSchema(BaseModel):
         json_schema_extra = {
             "example":{
                 "x":100.0,
-                "y":150.0
+                "y":150.0,
+                "weight":1.0
             }
         }
 class AlgoType(str, Enum):
@@ -29,14 +36,21 @@ class AlgoType(str, Enum):
         
 class SeperatorRequest(BaseModel):
     red_points: List[PointSchema] = Field(
-        ..., description="List of red points",
-        min_length=1
+        default=[], description="List of red points (or use red_dataset_id)"
         )
     blue_points: List[PointSchema]= Field(
         default=[], 
         description="List of blue points to minm coverage",
 
         )
+    red_dataset_id: Optional[str]= Field(
+        default=None,
+        description="Registered dataset to use as the red points"
+        )
+    blue_dataset_id: Optional[str]= Field(
+        default=None,
+        description="Registered dataset to use as the blue points"
+        )
 
     algorithm: AlgoType = Field(
         default=AlgoType.rectangles,
@@ -51,8 +65,6 @@ class SeperatorRequest(BaseModel):
     @field_validator('red_points')
     @classmethod
     def validate_red_points(cls,value):
-        if len(value)<1:
-            raise ValueError("At least one red point should be there")
         if len(value)>10000:
             raise ValueError("Too many red pts max(10000)")
         return value
@@ -62,6 +74,16 @@ class SeperatorRequest(BaseModel):
         if len(value)>1000:
             raise ValueError("Too many blue pts max(1000)")
         return value
+
+    @model_validator(mode='after')
+    def validate_point_sources(self):
+        if self.red_dataset_id and self.red_points:
+            raise ValueError("Give either red_points or red_dataset_id, not both")
+        if self.blue_dataset_id and self.blue_points:
+            raise ValueError("Give either blue_points or blue_dataset_id, not both")
+        if not self.red_dataset_id and len(self.red_points)<1:
+            raise ValueError("At least one red point should be there")
+        return self
             
     class Config:
         json_schema_extra={
@@ -79,6 +101,30 @@ class SeperatorRequest(BaseModel):
                     "save_to_db":False
                 }
             }
+class DatasetUploadRequest(BaseModel):
+    points: List[PointSchema]= Field(
+        ...,
+        description="Points to register (colour is chosen per request)",
+        min_length=1
+    )
+
+class DatasetInfo(BaseModel):
+    dataset_id: str= Field(..., description="Content-hash ID used in SeperatorRequest")
+    num_points: int= Field(..., description="Points uploaded", ge=0)
+    unique_points: int= Field(..., description="Distinct locations after deduplication", ge=0)
+    total_weight: float= Field(..., description="Sum of point weights", ge=0)
+    indexed: bool= Field(..., description="Whether the exact range-sum index was prebuilt")
+    size_bytes: int= Field(..., description="Size on disk", ge=0)
+    created_at: datetime= Field(..., description="Registration time")
+
+class DatasetImportResponse(BaseModel):
+    datasets: Dict[str, DatasetInfo]= Field(
+        ...,
+        description="Registered datasets keyed by 'red'/'blue' (or 'points' without a label column)"
+    )
+    rows_read: int= Field(..., description="Rows read from the file", ge=0)
+    rows_skipped: int= Field(..., description="Rows with invalid coordinates/weights or unknown labels", ge=0)
+
 class ShapeSchema(BaseModel):
     """Shape (rectangle/square) schema"""
     x: float = Field(..., description="X coordinate of top-left corner")
@@ -95,6 +141,104 @@ class ShapeSchema(BaseModel):
                 "height": 110.0
             }
         }
+class ClassifyRequest(BaseModel):
+    shapes: List[ShapeSchema]= Field(
+        ...,
+        description="Computed separator shapes, e.g. SeperatorResponse.shapes",
+        min_length=1
+    )
+    points: List[PointSchema]= Field(
+        default=[],
+        description="Points to classify"
+    )
+    dataset_id: Optional[str]= Field(
+        None,
+        description="Classify a registered dataset instead of inline points (counts only)"
+    )
+    include_labels: bool= Field(
+        True,
+        description="Return the per-point labels, not just the per-shape counts"
+    )
+
+    @model_validator(mode='after')
+    def validate_point_source(self):
+        if self.dataset_id and self.points:
+            raise ValueError("Give either points or dataset_id, not both")
+        return self
+
+class ClassifyResponse(BaseModel):
+    labels: Optional[List[int]]= Field(
+        None,
+        description="Index of the first shape containing each point, -1 if none"
+    )
+    counts: List[int]= Field(..., description="Points contained in each shape")
+    total_points: int= Field(..., description="Points classified", ge=0)
+    outside: int= Field(..., description="Points contained in no shape", ge=0)
+
+class TilesetRequest(BaseModel):
+    red_points: List[PointSchema]= Field(
+        default=[],
+        description="Red points, registered as a dataset"
+    )
+    blue_points: List[PointSchema]= Field(
+        default=[],
+        description="Blue points, registered as a dataset"
+    )
+    red_dataset_id: Optional[str]= Field(
+        None,
+        description="Registered dataset to use as the red points"
+    )
+    blue_dataset_id: Optional[str]= Field(
+        None,
+        description="Registered dataset to use as the blue points"
+    )
+    shapes: List[ShapeSchema]= Field(
+        default=[],
+        description="Shape overlay served with the tiles, e.g. SeperatorResponse.shapes"
+    )
+
+    @model_validator(mode='after')
+    def validate_point_sources(self):
+        if self.red_dataset_id and self.red_points:
+            raise ValueError("Give either red_points or red_dataset_id, not both")
+        if self.blue_dataset_id and self.blue_points:
+            raise ValueError("Give either blue_points or blue_dataset_id, not both")
+        if not (self.red_points or self.blue_points or self.red_dataset_id or self.blue_dataset_id):
+            raise ValueError("A tileset needs red or blue points")
+        return self
+
+class TilesetInfo(BaseModel):
+    tileset_id: str= Field(..., description="ID used in tile URLs")
+    red_dataset_id: Optional[str]= Field(None, description="Red dataset")
+    blue_dataset_id: Optional[str]= Field(None, description="Blue dataset")
+    shapes: List[ShapeSchema]= Field(..., description="Shape overlay")
+    tile_bins: int= Field(..., description="Bins per tile side", gt=0)
+    origin_x: float= Field(..., description="X of the zoom-0 tile's corner")
+    origin_y: float= Field(..., description="Y of the zoom-0 tile's corner")
+    size: float= Field(..., description="Side length of the zoom-0 tile", gt=0)
+    bounds: List[float]= Field(..., description="Point bounding box [min_x, min_y, max_x, max_y]")
+    max_zoom: int= Field(..., description="Deepest zoom level", ge=0)
+    total_red: int= Field(..., description="Red points", ge=0)
+    total_blue: int= Field(..., description="Blue points", ge=0)
+
+class TileLayer(BaseModel):
+    """Non-empty bins of one colour, as parallel arrays"""
+    x: List[float]= Field(..., description="Centroid x of each bin")
+    y: List[float]= Field(..., description="Centroid y of each bin")
+    count: List[int]= Field(..., description="Points in each bin")
+    weight: List[float]= Field(..., description="Total point weight in each bin")
+    total: int= Field(..., description="Points in the tile", ge=0)
+
+class TileResponse(BaseModel):
+    tileset_id: str= Field(..., description="Tileset ID")
+    z: int= Field(..., description="Zoom level", ge=0)
+    x: int= Field(..., description="Tile column", ge=0)
+    y: int= Field(..., description="Tile row", ge=0)
+    bounds: List[float]= Field(..., description="Tile extent [min_x, min_y, max_x, max_y]")
+    red: TileLayer
+    blue: TileLayer
+    shapes: List[ShapeSchema]= Field(..., description="Overlay shapes intersecting the tile")
+
 class SeperatorResponse(BaseModel):
     computation_id: Optional[int]=Field(
         None,
@@ -110,11 +254,21 @@ class SeperatorResponse(BaseModel):
         description="Number of blue points covered by the shapes",
         ge=0
     )
+    blue_weight_covered: float= Field(
+        0.0,
+        description="Total weight of blue points covered by the shapes",
+        ge=0
+    )
     red_covered: int= Field(
         ...,
         description="Number of red points covered by the shapes",
         ge=0
     )
+    red_weight_covered: float= Field(
+        0.0,
+        description="Total weight of red points covered by the shapes",
+        ge=0
+    )
     total_red: int= Field(
         ...,
         description="Total red points",
@@ -149,7 +303,9 @@ class SeperatorResponse(BaseModel):
                     {"x": 145.0, "y": 145.0, "width": 65.0, "height": 65.0}
                 ],
                 "blue_covered": 2,
+                "blue_weight_covered": 2.0,
                 "red_covered": 3,
+                "red_weight_covered": 3.0,
                 "total_red": 3,
                 "total_blue": 2,
                 "execution_time_ms": 1.23,
@@ -157,11 +313,37 @@ class SeperatorResponse(BaseModel):
                 "created_at": None
             }
         }
+class PoolMetricsSchema(BaseModel):
+    pool_size: int = Field(..., description="Configured persistent connections", ge=0)
+    max_overflow: int = Field(..., description="Extra connections allowed above pool_size")
+    checked_out: int = Field(..., description="Connections currently in use", ge=0)
+    idle: int = Field(..., description="Connections idle in the pool", ge=0)
+    overflow: int = Field(..., description="Current overflow (negative while the pool warms up)")
+    saturation: float = Field(..., description="checked_out / (pool_size + max_overflow)", ge=0)
+    connections_opened: int = Field(..., description="New database connections opened since start", ge=0)
+    checkouts: int = Field(..., description="Successful checkouts since start", ge=0)
+    checkins: int = Field(..., description="Connections returned to the pool since start", ge=0)
+    timeouts: int = Field(..., description="Checkouts that hit DB_POOL_TIMEOUT", ge=0)
+    avg_wait_ms: float = Field(..., description="Mean time spent waiting for a connection", ge=0)
+    max_wait_ms: float = Field(..., description="Longest wait for a connection", ge=0)
+
+class DatabaseHealth(BaseModel):
+    status: str = Field(..., description="Database status")
+    connected: bool = Field(..., description="Whether SELECT 1 succeeded")
+    backend: Optional[str] = Field(None, description="Database backend name")
+    database_url: Optional[str] = Field(None, description="Host/database without credentials")
+    pool: Optional[PoolMetricsSchema] = Field(None, description="Connection pool metrics")
+    error: Optional[str] = Field(None, description="Error while checking the database")
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
     message: str = Field(..., description="Status message")
     version: str = Field(..., description= "API Version")
     database_connected: bool =Field(..., description="DB connection status")
+    database: Optional[DatabaseHealth] = Field(
+        None,
+        description="Database and pool details (only when DATABASE_ENABLED)"
+    )
     timestamp: Optional[datetime]= Field(
         default_factory=lambda: datetime.now(timezone.utc),
         description="HEalth check timestamp"
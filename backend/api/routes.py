@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict
 import time
 from datetime import datetime, timezone
@@ -6,6 +7,7 @@ import logging as logger
 #NOTE:API Routes without DB connection for now
 from backend.api.models import (
     AlgoInfo,
+    DatabaseHealth,
     HealthResponse,
     SeperatorRequest,
     SeperatorResponse,
@@ -23,6 +25,48 @@ from backend.config import get_settings
 router=APIRouter(prefix="/api", tags=["Seperator ALgorithms"])
 settings=get_settings()
 
+def load_prebuilt(request: SeperatorRequest)->Dict:
+    """Red points / blue index from registered datasets, if referenced.
+
+    Both are views of the mapped files; no Point objects are built.
+    """
+    if not request.red_dataset_id and not request.blue_dataset_id:
+        return {}
+    # The registry pulls in numpy, so only import it when datasets are used
+    from backend.data.registry import DatasetNotFoundError, get_registry
+    registry=get_registry()
+    prebuilt={}
+    try:
+        red=registry.load(request.red_dataset_id) if request.red_dataset_id else None
+        blue=registry.load(request.blue_dataset_id) if request.blue_dataset_id else None
+    except DatasetNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset '{e.args[0]}' not found"
+        )
+    # Datasets may be larger than a solve should take; MAX_POINTS covers the inline ones
+    solve_points=(
+        (red.num_points if red else len(request.red_points))
+        +(blue.num_points if blue else len(request.blue_points))
+    )
+    if solve_points>settings.MAX_SOLVE_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Total points exceed maximum solve limit of {settings.MAX_SOLVE_POINTS}"
+        )
+    if red:
+        prebuilt["red"]=red.points
+    if blue:
+        prebuilt["blue_index"]=blue.index
+    return prebuilt
+
+def build_seperator(request: SeperatorRequest, red_points: List[AlgoPoint], blue_points: List[AlgoPoint]):
+    # Blocking (dataset loading, compression, index build): run it in a thread
+    prebuilt=load_prebuilt(request)
+    if request.algorithm==AlgoType.rectangles:
+        return RectangleSeperator(red_points, blue_points, **prebuilt)
+    return SquareSeperator(red_points, blue_points, **prebuilt)
+
 @router.post(
     "/compute-separators",
     response_model=SeperatorResponse,
@@ -56,46 +100,52 @@ async def compute_separators(
     client_ip= http_request.client.host
     logger.info(
         f"Compute Requuest from {client_ip}: "
-        f"{len(request.red_points)} red, {len(request.blue_points)} blue points, "
+        f"{request.red_dataset_id or len(request.red_points)} red, "
+        f"{request.blue_dataset_id or len(request.blue_points)} blue points, "
         f"algforithm: {request.algorithm.value}"
     )
     try:
-        if not request.red_points:
+        if not request.red_points and not request.red_dataset_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Red points list cannot be empty"
             )
 
-        total_points= len(request.red_points)+ len(request.blue_points)
-        if (total_points>settings.MAX_POINTS):
+        # MAX_POINTS limits inline points; registered datasets were checked at upload
+        inline_points= len(request.red_points)+ len(request.blue_points)
+        if (inline_points>settings.MAX_POINTS):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Total points exceed maximum limit of {settings.MAX_POINTS}"
             )
-        red_points=[AlgoPoint(x=pt.x, y=pt.y) for pt in request.red_points]
-        blue_points=[AlgoPoint(x=pt.x, y=pt.y) for pt in request.blue_points]
+        red_points=[AlgoPoint(x=pt.x, y=pt.y, weight=pt.weight) for pt in request.red_points]
+        blue_points=[AlgoPoint(x=pt.x, y=pt.y, weight=pt.weight) for pt in request.blue_points]
         start_time=time.perf_counter()
-        if request.algorithm==AlgoType.rectangles:
-            seperator= RectangleSeperator(red_points, blue_points)
-            result=seperator.solve()
-            shapes_key="rectangles"
+        seperator=await run_in_threadpool(build_seperator, request, red_points, blue_points)
+        shapes_key="rectangles" if request.algorithm==AlgoType.rectangles else "squares"
+        total_red=seperator.red.total_count
+        total_blue=seperator.blue_index.total_count
+        total_points=total_red+total_blue
+        if settings.PARALLEL_SOLVE_WORKERS>0 and total_points>=settings.PARALLEL_MIN_POINTS:
+            result=await seperator.solve_parallel_async(settings.PARALLEL_SOLVE_WORKERS)
         else:
-            seperator= SquareSeperator(red_points, blue_points)
-            result=seperator.solve()
-            shapes_key="squares"
+            result=await run_in_threadpool(seperator.solve)
         execution_time=(time.perf_counter()-start_time)*1000
         logger.info(
             f"Computation time: {execution_time:.2f} ms, "
-            f"blue covered: {result.get('blue_covered',0)}/{len(request.blue_points)}"
+            f"blue covered: {result.get('blue_covered',0)}/{total_blue}, "
+            f"blue weight: {result.get('blue_weight_covered',0.0):.4g}"
 
         )
         response= SeperatorResponse(
             computation_id=None,
             shapes=result.get(shapes_key, []),
             blue_covered=result.get("blue_covered",0),
+            blue_weight_covered=result.get("blue_weight_covered",0.0),
             red_covered=result.get("red_covered",0),
-            total_red=len(request.red_points),
-            total_blue=len(request.blue_points),
+            red_weight_covered=result.get("red_weight_covered",0.0),
+            total_red=total_red,
+            total_blue=total_blue,
             execution_time_ms=round(execution_time, 2),
             algorithm=request.algorithm.value,
             created_at=None
@@ -126,11 +176,23 @@ async def compute_separators(
 )
 
 async def health_check()->HealthResponse:
+    if not settings.DATABASE_ENABLED:
+        return HealthResponse(
+            status="healthy",
+            message="Seperator API is running (Testing Mode - No Database)",
+            version=settings.VERSION,
+            database_connected=False,
+            timestamp=datetime.now(timezone.utc)
+        )
+    # Imported here so the API never loads SQLAlchemy unless a DB is configured
+    from backend.database.connection import get_db_health
+    db_health=await run_in_threadpool(get_db_health)
     return HealthResponse(
-        status="healthy",
-        message="Seperator API is running (Testing Mode - No Database)",
+        status="healthy" if db_health["connected"] else "degraded",
+        message="Seperator API is running",
         version=settings.VERSION,
-        database_connected=False,
+        database_connected=db_health["connected"],
+        database=DatabaseHealth(**db_health),
         timestamp=datetime.now(timezone.utc)
     )
 
@@ -147,14 +209,14 @@ async def get_algorithms()->Dict[str,AlgoInfo]:
             name="Two Disjoint Axis-Parallel Rectangles",
             time_complexity="O(m + n) with O(m log m + n log n) preprocessing",
             space_complexity="O(m + n)",
-            description="Computes two disjoint rectangles that cover all red points while minimizing blue point coverage. Uses sweep line technique for optimal splitting.",
+            description="Computes two disjoint rectangles that cover all red points while minimizing the total weight of covered blue points. Uses sweep line technique for optimal splitting.",
             use_case="Best for most scenarios due to linear time complexity after preprocessing"
         ),
         "squares": AlgoInfo(
             name="Two Disjoint Axis-Parallel Squares",
             time_complexity="O(nm) with O(m log m + n log n) preprocessing",
             space_complexity="O(m + n)",
-            description="Computes two disjoint squares (equal width and height) that cover all red points while minimizing blue point coverage.",
+            description="Computes two disjoint squares (equal width and height) that cover all red points while minimizing the total weight of covered blue points.",
             use_case="Use when equal dimensions are required; may be slower for large datasets"
         )
     }
@@ -3,9 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from backend.api.routes import router as api_router
+from backend.routers.datasets import router as datasets_router
+from backend.routers.classification import router as classification_router
+from backend.routers.tiles import router as tiles_router
+from backend.auth.router import router as auth_router
 from backend.config import get_settings
 import logging as logger
-import uvicorn
 import time
 
 settings=get_settings()
@@ -54,6 +57,10 @@ async def shutdown_event():
     logger.info("Shutting down the Separator API service...")
 
 app.include_router(api_router)
+app.include_router(datasets_router)
+app.include_router(classification_router)
+app.include_router(tiles_router)
+app.include_router(auth_router)
 @app.get("/", tags=["Root"])
 async def root():
     return{
@@ -67,7 +74,11 @@ async def root():
         "endpoints": {
             "compute_separators": f"{settings.API_V1_PREFIX}/compute-separators",
             "health": f"{settings.API_V1_PREFIX}/health",
-            "algorithms": f"{settings.API_V1_PREFIX}/algorithms"
+            "algorithms": f"{settings.API_V1_PREFIX}/algorithms",
+            "datasets": f"{settings.API_V1_PREFIX}/datasets",
+            "classify": f"{settings.API_V1_PREFIX}/classify",
+            "tiles": f"{settings.API_V1_PREFIX}/tiles",
+            "auth": f"{settings.API_V1_PREFIX}/auth"
         }
     }
 
@@ -79,7 +90,9 @@ async def favicon():
 #     return {"message": "Hello"}
 
 
+# Development server with auto-reload; use `python -m backend.server` in production
 if __name__=="__main__":
+    import uvicorn
     print("Hello from backend/app.py")
     uvicorn.run(
         "backend.app:app",
@@ -0,0 +1,63 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordBearer
+from typing import Optional
+import logging as logger
+
+from backend.auth.jwt_handler import TokenError, decode_access_token
+from backend.config import get_settings
+from backend.schemas.user import UserResponse
+from backend.services.user_service import load_user_sync
+from backend.utils.cache import TTLCache
+
+settings=get_settings()
+oauth2_scheme=OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
+
+# username -> UserResponse; a stale entry lives at most USER_CACHE_TTL seconds
+user_cache=TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+def require_database()->None:
+    if not settings.DATABASE_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication requires the database (DATABASE_ENABLED)"
+        )
+
+async def get_user(username:str)->Optional[UserResponse]:
+    """User by name, from the per-worker cache when possible."""
+    user=user_cache.get(username)
+    if user is None:
+        user=await run_in_threadpool(load_user_sync, username)
+        # Unknown users are not cached, so a new account works immediately
+        if user is not None:
+            user_cache.set(username, user)
+    return user
+
+def invalidate_user(username:str)->None:
+    user_cache.pop(username)
+
+async def get_current_user(token: str=Depends(oauth2_scheme))->UserResponse:
+    require_database()
+    credentials_error=HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+    try:
+        # HMAC check on a cache miss, a dictionary lookup otherwise
+        claims=decode_access_token(token)
+    except TokenError as e:
+        logger.info(f"Rejected token: {str(e)}")
+        raise credentials_error
+    user=await get_user(claims["sub"])
+    if user is None:
+        raise credentials_error
+    return user
+
+async def get_current_active_user(user: UserResponse=Depends(get_current_user))->UserResponse:
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    return user
@@ -0,0 +1,98 @@
+"""HMAC-signed JWT access tokens (HS256/HS384/HS512) using the standard library.
+
+Decoded claims are cached per token (keyed by the token's SHA-256) until the
+sooner of the token's expiry and ``TOKEN_CACHE_TTL``, so an authenticated
+request normally costs one dictionary lookup instead of a signature check.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from backend.config import get_settings
+from backend.utils.cache import TTLCache
+
+settings=get_settings()
+
+_DIGESTS={
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+token_cache=TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
+class TokenError(ValueError):
+    """Malformed, badly signed or expired token."""
+
+
+def _b64encode(data:bytes)->str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data:str)->bytes:
+    return base64.urlsafe_b64decode(data+"="*(-len(data) % 4))
+
+
+def _signature(signing_input:bytes, algorithm:str)->bytes:
+    digest=_DIGESTS.get(algorithm)
+    if digest is None:
+        raise TokenError(f"Unsupported JWT algorithm '{algorithm}'")
+    return hmac.new(settings.SECRET_KEY.encode(), signing_input, digest).digest()
+
+
+def create_access_token(
+    subject:str,
+    expires_delta:Optional[timedelta]=None,
+    extra_claims:Optional[Dict[str, Any]]=None
+)->str:
+    """Signed token for ``subject`` (the username), expiring after ``expires_delta``."""
+    expires_delta=expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now=int(time.time())
+    claims={**(extra_claims or {}), "sub": subject, "iat": now, "exp": now+int(expires_delta.total_seconds())}
+    header={"alg": settings.ALGORITHM, "typ": "JWT"}
+    signing_input=".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode()) for part in (header, claims)
+    ).encode("ascii")
+    return signing_input.decode("ascii")+"."+_b64encode(_signature(signing_input, settings.ALGORITHM))
+
+
+def _verify(token:str)->Dict[str, Any]:
+    try:
+        header_b64, claims_b64, signature_b64=token.split(".")
+        header=json.loads(_b64decode(header_b64))
+        claims=json.loads(_b64decode(claims_b64))
+        signature=_b64decode(signature_b64)
+    except (ValueError, UnicodeDecodeError):
+        raise TokenError("Malformed token") from None
+    # Only the configured algorithm is accepted; never trust the header's choice
+    if not isinstance(header, dict) or header.get("alg")!=settings.ALGORITHM:
+        raise TokenError("Unexpected token algorithm")
+    expected=_signature(f"{header_b64}.{claims_b64}".encode("ascii"), settings.ALGORITHM)
+    if not hmac.compare_digest(signature, expected):
+        raise TokenError("Invalid token signature")
+    if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str):
+        raise TokenError("Token has no subject")
+    if not isinstance(claims.get("exp"), (int, float)):
+        raise TokenError("Token has no expiry")
+    return claims
+
+
+def decode_access_token(token:str)->Dict[str, Any]:
+    """Verified claims of ``token``; raises TokenError if it is invalid or expired."""
+    key=hashlib.sha256(token.encode()).digest()
+    claims=token_cache.get(key)
+    cached=claims is not None
+    if not cached:
+        claims=_verify(token)
+    remaining=claims["exp"]-time.time()
+    if remaining<=0:
+        token_cache.pop(key)
+        raise TokenError("Token has expired")
+    if not cached:
+        token_cache.set(key, claims, ttl=remaining)
+    return dict(claims)
@@ -0,0 +1,66 @@
+"""Password hashing with passlib, run off the event loop.
+
+Hashing is deliberately slow (hundreds of milliseconds of CPU), so the async
+helpers run it on a small dedicated thread pool: a burst of logins can
+neither stall the event loop nor starve the shared threadpool that the
+solver endpoints use. hashlib releases the GIL while it hashes, so the
+threads run in parallel.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from backend.config import get_settings
+
+settings=get_settings()
+
+# pbkdf2_sha256 is pure Python/hashlib and needs no extra backend package
+pwd_context=CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+_executor: Optional[ThreadPoolExecutor]=None
+_dummy_hash: Optional[str]=None
+
+
+def _get_executor()->ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor=ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _executor
+
+
+def hash_password_sync(password:str)->str:
+    return pwd_context.hash(password)
+
+
+def verify_password_sync(password:str, hashed_password:Optional[str])->bool:
+    """Check ``password``; with no stored hash, burn the same time and fail.
+
+    Verifying against a dummy hash for unknown users keeps login timing from
+    revealing which usernames exist.
+    """
+    global _dummy_hash
+    if hashed_password is None:
+        if _dummy_hash is None:
+            _dummy_hash=pwd_context.hash("dummy-password")
+        pwd_context.verify(password, _dummy_hash)
+        return False
+    try:
+        return pwd_context.verify(password, hashed_password)
+    except ValueError:
+        # Unrecognised or corrupt stored hash
+        return False
+
+
+async def hash_password(password:str)->str:
+    loop=asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_password_sync, password)
+
+
+async def verify_password(password:str, hashed_password:Optional[str])->bool:
+    loop=asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), verify_password_sync, password, hashed_password)
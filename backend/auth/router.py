@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm
+import logging as logger
+
+from backend.api.models import ErrorResponse
+from backend.auth.dependencies import (
+    get_current_active_user,
+    invalidate_user,
+    require_database,
+    user_cache
+)
+from backend.auth.jwt_handler import create_access_token
+from backend.config import get_settings
+from backend.schemas.user import Token, UserCreate, UserResponse
+from backend.services.user_service import create_user_sync, load_credentials_sync
+
+# passlib is imported inside the handlers (SQLAlchemy inside the user
+# service) so that the API cold start does not pay for them
+router=APIRouter(prefix="/api/auth", tags=["Authentication"])
+settings=get_settings()
+
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register a user",
+    responses={
+        400: {"description": "Username or email already registered", "model": ErrorResponse},
+        503: {"description": "Database disabled", "model": ErrorResponse}
+    }
+)
+
+async def register(request: UserCreate)->UserResponse:
+    from backend.auth.password import hash_password
+    require_database()
+    hashed_password=await hash_password(request.password)
+    user=await run_in_threadpool(create_user_sync, request, hashed_password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
+    invalidate_user(user.username)
+    logger.info(f"Registered user {user.username}")
+    return user
+
+@router.post(
+    "/login",
+    response_model=Token,
+    summary="Log in",
+    description="Exchange username and password (OAuth2 password form) for a bearer token",
+    responses={
+        401: {"description": "Wrong username or password", "model": ErrorResponse},
+        503: {"description": "Database disabled", "model": ErrorResponse}
+    }
+)
+
+async def login(form: OAuth2PasswordRequestForm=Depends())->Token:
+    from backend.auth.password import verify_password
+    require_database()
+    # Always fetched fresh: a cached user must never authorise a changed password
+    user, hashed_password=await run_in_threadpool(load_credentials_sync, form.username)
+    if not await verify_password(form.password, hashed_password) or user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    # The next authenticated request then needs no database round trip
+    user_cache.set(user.username, user)
+    return Token(
+        access_token=create_access_token(user.username),
+        token_type="bearer",
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES*60
+    )
+
+@router.get(
+    "/me",
+    response_model=UserResponse,
+    summary="Current user",
+    responses={401: {"description": "Missing or invalid token", "model": ErrorResponse}}
+)
+
+async def read_current_user(user: UserResponse=Depends(get_current_active_user))->UserResponse:
+    return user
@@ -0,0 +1,168 @@
+"""Chunked CSV/Parquet import of labelled point clouds into the dataset registry.
+
+Files are read ``chunk_rows`` rows at a time (pandas for CSV, pyarrow for
+Parquet). Each chunk is reduced to unique (x, y) locations with summed
+weights and multiplicities before it is merged into a running aggregate, so
+memory grows with the number of distinct points per label, not with file
+size. Each label ends up as one registered dataset.
+"""
+import logging
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from backend.data.registry import DatasetRegistry, aggregate_points
+from backend.utils.imports import lazy_import
+
+np = lazy_import("numpy", "Point import")
+pd = lazy_import("pandas", "Point import")
+
+logger=logging.getLogger(__name__)
+
+# Same bounds as PointSchema
+MAX_ABS_COORD=1e10
+MAX_WEIGHT=1e9
+# Merge buffered chunk aggregates once they hold at least this many rows
+CONSOLIDATE_ROWS=1_000_000
+
+SUPPORTED_FORMATS=("csv", "parquet")
+
+
+class PointImportError(ValueError):
+    """Bad file or column parameters; reported to the client as a 400."""
+
+
+class PointAccumulator:
+    """Running (x, y) -> (count, weight) aggregate for one label."""
+
+    def __init__(self):
+        self._parts: List[Dict[str, "np.ndarray"]]=[]
+        self._merged=0 # unique points in the last merged aggregate
+        self._pending=0 # rows pushed since that merge
+        self.rows=0
+
+    def add(self, x:"np.ndarray", y:"np.ndarray", weight:"np.ndarray")->None:
+        if not len(x):
+            return
+        self.rows+=len(x)
+        self._push(aggregate_points(x, y, weight))
+
+    def _push(self, arrays:Dict[str, "np.ndarray"])->None:
+        self._parts.append(arrays)
+        self._pending+=len(arrays["x"])
+        # Merge only once the new rows are as many as the aggregate holds, so
+        # a growing aggregate is re-merged O(log n) times, not once per chunk
+        if self._pending>=max(CONSOLIDATE_ROWS, self._merged) and len(self._parts)>1:
+            self._consolidate()
+
+    def _consolidate(self)->None:
+        merged=aggregate_points(
+            np.concatenate([p["x"] for p in self._parts]),
+            np.concatenate([p["y"] for p in self._parts]),
+            np.concatenate([p["weight"] for p in self._parts]),
+            np.concatenate([p["count"] for p in self._parts]),
+        )
+        self._parts=[merged]
+        self._merged=len(merged["x"])
+        self._pending=0
+
+    def arrays(self)->Dict[str, "np.ndarray"]:
+        if len(self._parts)>1:
+            self._consolidate()
+        return self._parts[0]
+
+
+def detect_format(filename:Optional[str], fmt:Optional[str])->str:
+    if fmt:
+        fmt=fmt.lower()
+    elif filename and filename.lower().endswith((".parquet", ".pq")):
+        fmt="parquet"
+    elif filename and filename.lower().endswith((".csv", ".csv.gz", ".txt")):
+        fmt="csv"
+    if fmt not in SUPPORTED_FORMATS:
+        raise PointImportError(f"Unsupported file format '{fmt or filename}', expected one of {SUPPORTED_FORMATS}")
+    return fmt
+
+
+def iter_chunks(
+    file:BinaryIO,
+    fmt:str,
+    columns:List[str],
+    chunk_rows:int,
+    compression:Optional[str]=None
+)->Iterator["pd.DataFrame"]:
+    try:
+        if fmt=="csv":
+            yield from pd.read_csv(file, usecols=columns, chunksize=chunk_rows, compression=compression)
+        else:
+            pq=lazy_import("pyarrow.parquet", "Parquet import")
+            for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows, columns=columns):
+                yield batch.to_pandas()
+    except (ValueError, KeyError) as e:
+        # pandas/pyarrow report missing columns and malformed files this way
+        raise PointImportError(f"Could not read {fmt} file: {e}") from e
+
+
+def import_points(
+    file:BinaryIO,
+    registry:DatasetRegistry,
+    fmt:str,
+    x_column:str="x",
+    y_column:str="y",
+    label_column:Optional[str]="label",
+    weight_column:Optional[str]=None,
+    red_label:str="red",
+    blue_label:str="blue",
+    chunk_rows:int=100_000,
+    max_points:Optional[int]=None,
+    compression:Optional[str]=None,
+)->Dict:
+    """Stream ``file`` into per-label accumulators and register each as a dataset.
+
+    Without a label column every row goes to a single "points" dataset.
+    Rows with missing/out-of-range coordinates or unknown labels are skipped.
+    """
+    columns=[c for c in (x_column, y_column, label_column, weight_column) if c]
+    labels={red_label: "red", blue_label: "blue"} if label_column else {}
+    accumulators={name: PointAccumulator() for name in (labels.values() if label_column else ["points"])}
+    rows_read=rows_skipped=0
+
+    for chunk in iter_chunks(file, fmt, columns, chunk_rows, compression):
+        rows_read+=len(chunk)
+        x=pd.to_numeric(chunk[x_column], errors="coerce").to_numpy(dtype=np.float64)
+        y=pd.to_numeric(chunk[y_column], errors="coerce").to_numpy(dtype=np.float64)
+        if weight_column:
+            weight=pd.to_numeric(chunk[weight_column], errors="coerce").to_numpy(dtype=np.float64)
+        else:
+            weight=np.ones(len(chunk))
+        valid=(
+            np.isfinite(x) & np.isfinite(y) & np.isfinite(weight)
+            & (np.abs(x)<=MAX_ABS_COORD) & (np.abs(y)<=MAX_ABS_COORD)
+        )
+        if (weight[valid]<0).any():
+            raise PointImportError(f"Negative values in weight column '{weight_column}'")
+        if (weight[valid]>MAX_WEIGHT).any():
+            raise PointImportError(f"Values above {MAX_WEIGHT:g} in weight column '{weight_column}'")
+
+        accepted=0
+        if label_column:
+            label=chunk[label_column].astype(str).str.strip().str.lower().to_numpy()
+            for raw, name in labels.items():
+                mask=valid & (label==raw.lower())
+                accumulators[name].add(x[mask], y[mask], weight[mask])
+                accepted+=int(mask.sum())
+        else:
+            accumulators["points"].add(x[valid], y[valid], weight[valid])
+            accepted=int(valid.sum())
+        rows_skipped+=len(chunk)-accepted
+
+        for name, acc in accumulators.items():
+            if max_points and acc.rows>max_points:
+                raise PointImportError(f"'{name}' points exceed maximum of {max_points}")
+
+    datasets={}
+    for name, acc in accumulators.items():
+        if not acc.rows:
+            continue
+        arrays=acc.arrays()
+        datasets[name]=registry.register_arrays(arrays["x"], arrays["y"], arrays["weight"], arrays["count"])
+    logger.info(f"Imported {rows_read} rows ({rows_skipped} skipped) into {len(datasets)} datasets")
+    return {"datasets": datasets, "rows_read": rows_read, "rows_skipped": rows_skipped}
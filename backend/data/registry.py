@@ -0,0 +1,333 @@
+"""Registered point datasets stored as memory-mapped NumPy files.
+
+A dataset is deduplicated, rank-compressed and indexed once at upload and
+written to ``DATASET_DIR/<id>/`` as one ``.npy`` file per array. Loading
+maps the files read-only, so every worker process serving the same dataset
+shares the same page-cache pages. The id is a content hash, so uploading the
+same points twice is free. Directories are evicted least-recently-used first
+once their total size, tileset pyramids included, exceeds
+``DATASET_DISK_BUDGET_MB``.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.algorithm.preprocessing import PointArrays
+from backend.algorithm.range_sum import RangeSumIndex
+from backend.algorithm.seperators import Point
+from backend.config import get_settings
+from backend.utils.imports import lazy_import
+
+np = lazy_import("numpy", "Dataset registry")
+
+logger=logging.getLogger(__name__)
+settings=get_settings()
+
+META_FILE="meta.json"
+FORMAT_VERSION=3
+# <dataset>/pins/<owner>: datasets something else depends on (e.g. a tileset)
+PINS_DIR="pins"
+
+
+class DatasetNotFoundError(KeyError):
+    pass
+
+
+class DatasetPinnedError(ValueError):
+    """Deleting a dataset that a tileset still serves."""
+
+
+def aggregate_points(x, y, weight, count=None) -> Dict[str, "np.ndarray"]:
+    """Unique (x, y) locations, sorted, with summed weights and multiplicities.
+
+    ``count`` gives the multiplicity of each row when the input is already
+    aggregated (defaults to 1 per row), so partial aggregates can be merged.
+    """
+    x=np.asarray(x, dtype=np.float64)
+    y=np.asarray(y, dtype=np.float64)
+    weight=np.asarray(weight, dtype=np.float64)
+    count=np.ones(len(x)) if count is None else np.asarray(count, dtype=np.float64)
+    unique, inverse=np.unique(np.column_stack([x, y]).reshape(-1, 2), axis=0, return_inverse=True)
+    inverse=inverse.reshape(-1)
+    return {
+        "x": unique[:, 0].copy(),
+        "y": unique[:, 1].copy(),
+        "weight": np.bincount(inverse, weights=weight, minlength=len(unique)),
+        "count": np.rint(np.bincount(inverse, weights=count, minlength=len(unique))).astype(np.int64),
+    }
+
+
+def build_arrays(x, y, weight, count=None) -> Dict[str, "np.ndarray"]:
+    """Unique points plus everything a solve would otherwise rebuild.
+
+    The points come sorted by x (then y); ``order_y`` is their stable
+    order along y, the sweep order of the red solvers. ``xs``/``ys`` are
+    the distinct coordinates and the ``index_*`` arrays are
+    ``RangeSumIndex.export()`` with its merge levels stored.
+    """
+    arrays=aggregate_points(x, y, weight, count)
+    ux, uy, uw=arrays["x"], arrays["y"], arrays["weight"]
+    arrays.update({
+        "xs": np.unique(ux),
+        "ys": np.unique(uy),
+        "order_y": np.argsort(uy, kind="stable").astype(np.int64),
+    })
+    index=RangeSumIndex.from_arrays(ux, uy, uw, arrays["count"]).store_levels()
+    arrays.update({f"index_{name}": values for name, values in index.export().items()})
+    return arrays
+
+
+def dataset_id_for(arrays:Dict[str, "np.ndarray"])->str:
+    # Hash of the deduplicated content, so raw and pre-aggregated uploads of
+    # the same points get the same id
+    digest=hashlib.sha256()
+    for name in ("x", "y", "count", "weight"):
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:32]
+
+
+class Dataset:
+    """A registered dataset with its arrays mapped read-only."""
+
+    def __init__(self, dataset_id:str, path:Path, meta:dict):
+        self.id=dataset_id
+        self.path=path
+        self.meta=meta
+        self.arrays={
+            name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in meta["arrays"]
+        }
+        self._index: Optional[RangeSumIndex]=None
+
+    @property
+    def num_points(self)->int:
+        return self.meta["num_points"]
+
+    @property
+    def points(self)->PointArrays:
+        """Solver view of the unique points: the mapped arrays themselves,
+        with their stored sweep orders."""
+        a=self.arrays
+        return PointArrays(
+            x=a["x"],
+            y=a["y"],
+            weights=a["weight"],
+            counts=a["count"],
+            order_x=np.arange(len(a["x"])),
+            order_y=a["order_y"],
+        )
+
+    @property
+    def index(self)->RangeSumIndex:
+        """Exact blue range-sum index over the mapped arrays (no copies)."""
+        if self._index is None:
+            self._index=RangeSumIndex.from_export({
+                name[len("index_"):]: values for name, values in self.arrays.items() if name.startswith("index_")
+            })
+        return self._index
+
+    def info(self)->dict:
+        return {"dataset_id": self.id, **{k: v for k, v in self.meta.items() if k!="arrays"}}
+
+
+class DatasetRegistry:
+    def __init__(self, root:Path, disk_budget_bytes:int, cache_size:int=8):
+        self.root=Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.disk_budget_bytes=disk_budget_bytes
+        self.cache_size=cache_size
+        self._loaded: "OrderedDict[str, Dataset]"=OrderedDict()
+        self._lock=Lock()
+
+    def _path(self, dataset_id:str)->Path:
+        if not dataset_id.isalnum():
+            raise DatasetNotFoundError(dataset_id)
+        return self.root / dataset_id
+
+    def register_points(self, points:Sequence[Point])->dict:
+        return self.register_arrays(
+            [p.x for p in points],
+            [p.y for p in points],
+            [p.weight for p in points],
+        )
+
+    def register_arrays(self, x, y, weight, count=None)->dict:
+        """Store a dataset (no-op if identical content exists) and return its info."""
+        arrays=build_arrays(x, y, weight, count)
+        dataset_id=dataset_id_for(arrays)
+        target=self._path(dataset_id)
+        pins=[]
+        if target.exists() and not self._is_current(target):
+            # Written by an older layout: rebuild it in place, keeping its pins
+            pins=self.pins(dataset_id)
+            self.delete(dataset_id, force=True)
+        if not target.exists():
+            # Write into a temp dir and rename, so concurrent workers never see partial files
+            staging=Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+            try:
+                for name, values in arrays.items():
+                    np.save(staging / f"{name}.npy", values)
+                meta={
+                    "format": FORMAT_VERSION,
+                    "num_points": int(arrays["count"].sum()),
+                    "unique_points": int(len(arrays["x"])),
+                    "total_weight": float(arrays["weight"].sum()),
+                    "indexed": True,
+                    "size_bytes": sum(f.stat().st_size for f in staging.glob("*.npy")),
+                    "created_at": time.time(),
+                    "arrays": sorted(arrays),
+                }
+                (staging / META_FILE).write_text(json.dumps(meta))
+                os.rename(staging, target)
+                logger.info(f"Registered dataset {dataset_id} ({meta['num_points']} points)")
+            except OSError:
+                # Lost a race with another worker registering the same content
+                shutil.rmtree(staging, ignore_errors=True)
+                if not target.exists():
+                    raise
+        for owner in pins:
+            self.pin(dataset_id, owner)
+        self._touch(target)
+        self.evict(keep=[dataset_id])
+        return self.load(dataset_id).info()
+
+    def load(self, dataset_id:str)->Dataset:
+        with self._lock:
+            dataset=self._loaded.get(dataset_id)
+            if dataset is not None and dataset.path.exists():
+                self._loaded.move_to_end(dataset_id)
+                self._touch(dataset.path)
+                return dataset
+        path=self._path(dataset_id)
+        try:
+            meta=json.loads((path / META_FILE).read_text())
+        except FileNotFoundError:
+            raise DatasetNotFoundError(dataset_id) from None
+        if meta.get("format")!=FORMAT_VERSION:
+            raise DatasetNotFoundError(dataset_id)
+        dataset=Dataset(dataset_id, path, meta)
+        self._touch(path)
+        with self._lock:
+            self._loaded[dataset_id]=dataset
+            while len(self._loaded)>self.cache_size:
+                self._loaded.popitem(last=False)
+        return dataset
+
+    def list(self)->List[dict]:
+        infos=[]
+        for path in self._dataset_dirs():
+            meta=json.loads((path / META_FILE).read_text())
+            meta.pop("arrays", None)
+            infos.append({"dataset_id": path.name, **meta})
+        return infos
+
+    def pin(self, dataset_id:str, owner:str)->None:
+        """Keep a dataset out of eviction (and deletion) for ``owner``."""
+        path=self._path(dataset_id)
+        if not path.exists():
+            raise DatasetNotFoundError(dataset_id)
+        (path / PINS_DIR).mkdir(exist_ok=True)
+        (path / PINS_DIR / owner).touch()
+
+    def unpin(self, dataset_id:str, owner:str)->None:
+        try:
+            (self._path(dataset_id) / PINS_DIR / owner).unlink()
+        except FileNotFoundError:
+            pass
+
+    def pins(self, dataset_id:str)->List[str]:
+        return sorted(p.name for p in (self._path(dataset_id) / PINS_DIR).glob("*"))
+
+    def delete(self, dataset_id:str, force:bool=False)->None:
+        path=self._path(dataset_id)
+        if not path.exists():
+            raise DatasetNotFoundError(dataset_id)
+        pins=self.pins(dataset_id)
+        if pins and not force:
+            raise DatasetPinnedError(f"Dataset '{dataset_id}' is used by {', '.join(pins)}")
+        with self._lock:
+            self._loaded.pop(dataset_id, None)
+        # Processes that still map the files keep their pages until they unmap
+        shutil.rmtree(path, ignore_errors=True)
+
+    def disk_entries(self)->List[Tuple[float, str, int, Optional[Callable[[str], None]]]]:
+        """(last used, id, bytes, delete) of every dataset and tileset on
+        disk; ``delete`` is None for datasets a tileset pins."""
+        # Tilesets are built on the registry and stored under its root
+        from backend.data.tiles import get_tileset_store
+        entries=[
+            (
+                path.stat().st_mtime,
+                path.name,
+                sum(f.stat().st_size for f in path.glob("*.npy")),
+                None if self.pins(path.name) else self.delete,
+            )
+            for path in self._dataset_dirs()
+        ]
+        return entries+get_tileset_store(self).disk_entries()
+
+    def disk_usage(self)->int:
+        return sum(size for _, _, size, _ in self.disk_entries())
+
+    def evict(self, keep:Iterable[str]=())->List[str]:
+        """Delete least-recently-used datasets and tilesets until the disk
+        budget is met. Evicting a tileset releases its datasets' pins, so
+        they can go next."""
+        keep=set(keep)
+        evicted=[]
+        while True:
+            entries=self.disk_entries()
+            if sum(size for _, _, size, _ in entries)<=self.disk_budget_bytes:
+                break
+            candidates=[(used, name, delete) for used, name, _, delete in entries if delete and name not in keep]
+            if not candidates:
+                break
+            _, name, delete=min(candidates, key=lambda c: c[:2])
+            # Tried once either way, so a directory that will not go cannot loop
+            keep.add(name)
+            try:
+                delete(name)
+            except (KeyError, DatasetPinnedError):
+                continue # removed or pinned by another worker meanwhile
+            evicted.append(name)
+            logger.info(f"Evicted {name} (disk budget)")
+        return evicted
+
+    def _dataset_dirs(self)->List[Path]:
+        return [
+            p for p in self.root.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / META_FILE).exists()
+        ]
+
+    @staticmethod
+    def _is_current(path:Path)->bool:
+        try:
+            return json.loads((path / META_FILE).read_text()).get("format")==FORMAT_VERSION
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def _touch(path:Path)->None:
+        # Directory mtime doubles as the last-used stamp, shared by all workers
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+@lru_cache()
+def get_registry()->DatasetRegistry:
+    return DatasetRegistry(
+        Path(settings.DATASET_DIR),
+        disk_budget_bytes=settings.DATASET_DISK_BUDGET_MB*1024*1024,
+        cache_size=settings.DATASET_CACHE_SIZE,
+    )
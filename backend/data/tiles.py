@@ -0,0 +1,389 @@
+"""Level-of-detail tile pyramid over registered red/blue datasets.
+
+A tileset covers the square bounding box of its datasets. At zoom ``z`` that
+square is cut into 2^z x 2^z tiles, each summarised as a ``TILE_BINS`` x
+``TILE_BINS`` grid of bins holding the point count, total weight and
+centroid of the points inside. Points are ordered by the Morton (Z-order)
+code of their finest-level cell, so every tile and every bin is a
+contiguous range (a linear quadtree) and a tile is two ``searchsorted``
+calls. Tileset specs are small JSON files next to the datasets and the
+pyramid arrays are ``.npy`` files in a directory per tileset, written once
+and memory-mapped like the datasets, so every worker serves every tileset
+from the same page-cache pages. A tileset pins its datasets, so disk-budget
+eviction never pulls them from under tiles that are served as immutable;
+the pyramid files count against the registry's disk budget, and deleting
+or evicting the tileset (least recently used first) releases the pins.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import get_settings
+from backend.data.registry import DatasetRegistry
+from backend.utils.imports import lazy_import
+
+np = lazy_import("numpy", "Tile pyramid")
+
+logger=logging.getLogger(__name__)
+settings=get_settings()
+
+# Finest quantization level: 2^24 cells per axis; Morton codes use 48 bits
+BASE_LEVEL=24
+TILESET_DIR=".tilesets"
+
+_MASKS=(
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+)
+
+
+class TilesetNotFoundError(KeyError):
+    pass
+
+
+class TileOutOfRangeError(ValueError):
+    pass
+
+
+def _spread_bits(v:"np.ndarray")->"np.ndarray":
+    # 0b1011 -> 0b01000101: room for the other axis in every second bit
+    v=np.asarray(v, dtype=np.uint64)
+    for shift, mask in _MASKS:
+        v=(v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton_codes(qx, qy)->"np.ndarray":
+    """Z-order codes of integer cell coordinates (x in the even bits)."""
+    return _spread_bits(qx) | (_spread_bits(qy) << np.uint64(1))
+
+
+def _stored_arrays(path:Path, build:Callable[[], Dict[str, "np.ndarray"]])->Dict[str, "np.ndarray"]:
+    """Arrays kept as ``path/<name>.npy``, built and written on first use.
+
+    Written into a temp dir and renamed into place, so concurrent workers
+    never map partial files; whoever loses the race maps the winner's.
+    """
+    if not path.exists():
+        arrays=build()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging=Path(tempfile.mkdtemp(prefix=".staging-", dir=path.parent))
+        try:
+            for name, values in arrays.items():
+                np.save(staging / f"{name}.npy", values)
+            os.rename(staging, path)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not path.exists():
+                raise
+    return {f.stem: np.load(f, mmap_mode="r") for f in path.glob("*.npy")}
+
+
+class PointPyramid:
+    """Aggregated levels of one dataset, all sharing the Morton order.
+
+    ``order`` (the dataset's unique points in Morton order) and their sorted
+    ``codes`` are stored under ``path``. Levels at which no two points share
+    a cell are read straight from the mapped dataset through ``order``;
+    only coarser levels, where points merge, are aggregated, once, into
+    files of their own.
+    """
+
+    def __init__(
+        self,
+        arrays:Dict[str, "np.ndarray"],
+        path:Path,
+        origin_x:float,
+        origin_y:float,
+        size:float,
+        on_write:Optional[Callable[[], None]]=None
+    ):
+        self.arrays=arrays
+        self.path=path
+        # Called after files are added under ``path``, e.g. to enforce a disk budget
+        self.on_write=on_write
+
+        def build_base()->Dict[str, "np.ndarray"]:
+            cells=1 << BASE_LEVEL
+            qx=np.clip(((np.asarray(arrays["x"])-origin_x)/size*cells).astype(np.int64), 0, cells-1)
+            qy=np.clip(((np.asarray(arrays["y"])-origin_y)/size*cells).astype(np.int64), 0, cells-1)
+            codes=morton_codes(qx, qy)
+            order=np.argsort(codes, kind="stable")
+            codes=codes[order]
+            # Smallest XOR of neighbouring codes: level l merges points iff
+            # it is below 4^(BASE_LEVEL-l)
+            gap=(codes[1:] ^ codes[:-1]).min() if len(codes)>1 else np.uint64(1 << (2*BASE_LEVEL))
+            return {"order": order.astype(np.int64), "codes": codes, "min_gap": np.array([gap], dtype=np.uint64)}
+
+        base=self._stored("base", build_base)
+        self.order, self.codes=base["order"], base["codes"]
+        self.min_gap=int(base["min_gap"][0])
+        self._levels: Dict[int, Dict[str, "np.ndarray"]]={}
+        self._lock=Lock()
+
+    def merges(self, level:int)->bool:
+        """Whether some points share a cell at ``level`` (never at BASE_LEVEL)."""
+        return level<BASE_LEVEL and self.min_gap < 1 << (2*(BASE_LEVEL-level))
+
+    def level(self, level:int)->Dict[str, "np.ndarray"]:
+        """Points merged per 2^level x 2^level cell, with count-weighted centroids.
+
+        Only for levels that ``merges``; the others are the dataset itself.
+        """
+        with self._lock:
+            cached=self._levels.get(level)
+            if cached is None:
+                cached=self._levels[level]=self._stored(f"level-{level}", lambda: self._build_level(level))
+            return cached
+
+    def _stored(self, name:str, build:Callable[[], Dict[str, "np.ndarray"]])->Dict[str, "np.ndarray"]:
+        written=not (self.path / name).exists()
+        arrays=_stored_arrays(self.path / name, build)
+        if written and self.on_write is not None:
+            self.on_write()
+        return arrays
+
+    def _build_level(self, level:int)->Dict[str, "np.ndarray"]:
+        codes=self.codes >> np.uint64(2*(BASE_LEVEL-level))
+        starts=np.flatnonzero(np.r_[True, codes[1:]!=codes[:-1]])
+        a={name: np.asarray(self.arrays[name])[self.order] for name in ("x", "y", "count", "weight")}
+        count=np.add.reduceat(a["count"].astype(np.int64), starts)
+        return {
+            "codes": codes[starts],
+            "count": count,
+            "weight": np.add.reduceat(a["weight"].astype(np.float64), starts),
+            "x": np.add.reduceat(a["x"]*a["count"], starts)/count,
+            "y": np.add.reduceat(a["y"]*a["count"], starts)/count,
+        }
+
+    def tile(self, z:int, tx:int, ty:int, bins_bits:int)->Dict[str, "np.ndarray"]:
+        """Bins of tile (z, tx, ty): the tile's slice of level z + bins_bits."""
+        level=z+bins_bits
+        first=int(morton_codes(tx, ty)) << (2*bins_bits)
+        last=first+(1 << (2*bins_bits))
+        if self.merges(level):
+            data=self.level(level)
+            lo, hi=np.searchsorted(data["codes"], np.array([first, last], dtype=np.uint64))
+            return {name: np.asarray(data[name][lo:hi]) for name in ("x", "y", "count", "weight")}
+        # One point per cell: the tile's points, read through the Morton order
+        shift=2*(BASE_LEVEL-level)
+        lo, hi=np.searchsorted(self.codes, np.array([first << shift, last << shift], dtype=np.uint64))
+        rows=self.order[lo:hi]
+        return {name: np.asarray(self.arrays[name])[rows] for name in ("x", "y", "count", "weight")}
+
+
+def _intersects(shape:dict, bounds:Sequence[float])->bool:
+    min_x, min_y, max_x, max_y=bounds
+    return (
+        shape["x"]<=max_x and shape["x"]+shape["width"]>=min_x
+        and shape["y"]<=max_y and shape["y"]+shape["height"]>=min_y
+    )
+
+
+class Tileset:
+    """A tileset spec plus the pyramids of its datasets, built on demand."""
+
+    def __init__(self, spec:dict, registry:DatasetRegistry, path:Path):
+        self.spec=spec
+        self.registry=registry
+        self.path=path
+        self.bins_bits=int(spec["tile_bins"]).bit_length()-1
+        self._pyramids: Dict[str, Optional[PointPyramid]]={}
+        self._lock=Lock()
+
+    @property
+    def id(self)->str:
+        return self.spec["tileset_id"]
+
+    def info(self)->dict:
+        return dict(self.spec)
+
+    def pyramid(self, color:str)->Optional[PointPyramid]:
+        with self._lock:
+            if color not in self._pyramids:
+                dataset_id=self.spec[f"{color}_dataset_id"]
+                pyramid=None
+                if dataset_id:
+                    pyramid=PointPyramid(
+                        self.registry.load(dataset_id).arrays,
+                        self.path / color,
+                        self.spec["origin_x"], self.spec["origin_y"], self.spec["size"],
+                        on_write=lambda: self.registry.evict(keep=[self.id])
+                    )
+                self._pyramids[color]=pyramid
+            return self._pyramids[color]
+
+    def tile_bounds(self, z:int, tx:int, ty:int)->List[float]:
+        step=self.spec["size"]/(1 << z)
+        min_x=self.spec["origin_x"]+tx*step
+        min_y=self.spec["origin_y"]+ty*step
+        return [min_x, min_y, min_x+step, min_y+step]
+
+    def tile(self, z:int, tx:int, ty:int)->dict:
+        if not 0<=z<=self.spec["max_zoom"] or not (0<=tx<(1 << z) and 0<=ty<(1 << z)):
+            raise TileOutOfRangeError(f"No tile {z}/{tx}/{ty} (max zoom {self.spec['max_zoom']})")
+        bounds=self.tile_bounds(z, tx, ty)
+        layers={}
+        for color in ("red", "blue"):
+            pyramid=self.pyramid(color)
+            if pyramid is None:
+                layers[color]={"x": [], "y": [], "count": [], "weight": [], "total": 0}
+                continue
+            bins=pyramid.tile(z, tx, ty, self.bins_bits)
+            layers[color]={name: values.tolist() for name, values in bins.items()}
+            layers[color]["total"]=int(bins["count"].sum())
+        return {
+            "tileset_id": self.id,
+            "z": z,
+            "x": tx,
+            "y": ty,
+            "bounds": bounds,
+            **layers,
+            "shapes": [s for s in self.spec["shapes"] if _intersects(s, bounds)],
+        }
+
+
+class TilesetStore:
+    def __init__(self, registry:DatasetRegistry, cache_size:int=8):
+        self.registry=registry
+        self.root=registry.root / TILESET_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_size=cache_size
+        self._loaded: "OrderedDict[str, Tileset]"=OrderedDict()
+        self._lock=Lock()
+
+    def create(
+        self,
+        red_dataset_id:Optional[str],
+        blue_dataset_id:Optional[str],
+        shapes:Sequence[dict]=(),
+        tile_bins:int=64
+    )->dict:
+        """Register a tileset over existing datasets and return its spec."""
+        if tile_bins<1 or tile_bins & (tile_bins-1) or tile_bins>(1 << BASE_LEVEL):
+            raise ValueError("tile_bins must be a power of two")
+        min_x=min_y=float("inf")
+        max_x=max_y=float("-inf")
+        totals={}
+        for color, dataset_id in (("red", red_dataset_id), ("blue", blue_dataset_id)):
+            totals[color]=0
+            if not dataset_id:
+                continue
+            dataset=self.registry.load(dataset_id)
+            a=dataset.arrays
+            min_x, max_x=min(min_x, float(a["xs"][0])), max(max_x, float(a["xs"][-1]))
+            min_y, max_y=min(min_y, float(a["ys"][0])), max(max_y, float(a["ys"][-1]))
+            totals[color]=dataset.num_points
+        if min_x==float("inf"):
+            raise ValueError("A tileset needs at least one dataset")
+        size=max(max_x-min_x, max_y-min_y) or 1.0
+        spec={
+            "red_dataset_id": red_dataset_id,
+            "blue_dataset_id": blue_dataset_id,
+            "shapes": [dict(s) for s in shapes],
+            "tile_bins": tile_bins,
+        }
+        spec["tileset_id"]=hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:32]
+        spec.update({
+            "origin_x": min_x,
+            "origin_y": min_y,
+            "size": size,
+            "bounds": [min_x, min_y, max_x, max_y],
+            "max_zoom": BASE_LEVEL-(tile_bins.bit_length()-1),
+            "total_red": totals["red"],
+            "total_blue": totals["blue"],
+        })
+        # Tiles are served as immutable, so their datasets must outlive eviction
+        for dataset_id in (red_dataset_id, blue_dataset_id):
+            if dataset_id:
+                self.registry.pin(dataset_id, spec["tileset_id"])
+        path=self._spec_path(spec["tileset_id"])
+        if not path.exists():
+            tmp=path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(spec))
+            tmp.replace(path)
+            logger.info(f"Registered tileset {spec['tileset_id']}")
+        self._touch(path)
+        return spec
+
+    def _spec_path(self, tileset_id:str)->Path:
+        if not tileset_id.isalnum():
+            raise TilesetNotFoundError(tileset_id)
+        return self.root / f"{tileset_id}.json"
+
+    def load(self, tileset_id:str)->Tileset:
+        path=self._spec_path(tileset_id)
+        with self._lock:
+            tileset=self._loaded.get(tileset_id)
+            if tileset is not None and path.exists():
+                self._loaded.move_to_end(tileset_id)
+                self._touch(path)
+                return tileset
+        try:
+            spec=json.loads(path.read_text())
+        except FileNotFoundError:
+            raise TilesetNotFoundError(tileset_id) from None
+        tileset=Tileset(spec, self.registry, self.root / tileset_id)
+        self._touch(path)
+        with self._lock:
+            self._loaded[tileset_id]=tileset
+            while len(self._loaded)>self.cache_size:
+                self._loaded.popitem(last=False)
+        return tileset
+
+    def delete(self, tileset_id:str)->None:
+        """Remove a tileset's spec and pyramid and release its dataset pins."""
+        path=self._spec_path(tileset_id)
+        try:
+            spec=json.loads(path.read_text())
+        except FileNotFoundError:
+            raise TilesetNotFoundError(tileset_id) from None
+        with self._lock:
+            self._loaded.pop(tileset_id, None)
+        # Spec first: other workers stop serving it before the pyramid goes
+        path.unlink(missing_ok=True)
+        shutil.rmtree(self.root / tileset_id, ignore_errors=True)
+        for color in ("red", "blue"):
+            dataset_id=spec[f"{color}_dataset_id"]
+            if dataset_id:
+                self.registry.unpin(dataset_id, tileset_id)
+        logger.info(f"Deleted tileset {tileset_id}")
+
+    def disk_entries(self)->List[Tuple[float, str, int, Callable[[str], None]]]:
+        """(last used, id, bytes, delete) of every tileset, for the
+        registry's disk budget."""
+        entries=[]
+        for path in self.root.glob("*.json"):
+            try:
+                used=path.stat().st_mtime
+                files=[f for f in (self.root / path.stem).rglob("*") if f.is_file()]
+                size=path.stat().st_size+sum(f.stat().st_size for f in files)
+            except FileNotFoundError:
+                continue # deleted meanwhile
+            entries.append((used, path.stem, size, self.delete))
+        return entries
+
+    @staticmethod
+    def _touch(path:Path)->None:
+        # Spec mtime is the last-used stamp, shared by all workers
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+@lru_cache()
+def get_tileset_store(registry:DatasetRegistry)->TilesetStore:
+    """One store per registry (specs live in its directory)."""
+    return TilesetStore(registry, cache_size=settings.DATASET_CACHE_SIZE)
@@ -1,32 +1,117 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import StaticPool
 from backend.config import get_settings
+from backend.database.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from functools import lru_cache
+from typing import Optional
 import logging
 
+# This module is only imported by code that needs the database; the API
+# itself runs without it, so nothing here may be pulled in by backend.app.
 logger= logging.getLogger(__name__)
 settings=get_settings()
 
+# Set by use_database_url(), e.g. to point tests at a local SQLite file
+_database_url_override: Optional[str]=None
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo= settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    poolClass=QueuePool,
-    connect_args={
-        "connect_timeout": 10,
-        "options": "-c statement_timeout=utc"
+_ASYNC_DRIVERS={
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def database_url()->str:
+    return _database_url_override or settings.DATABASE_URL
+
+def async_database_url()->str:
+    if settings.ASYNC_DATABASE_URL and not _database_url_override:
+        return settings.ASYNC_DATABASE_URL
+    url=make_url(database_url())
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def engine_options(url:str, is_async:bool=False)->dict:
+    """Pool and driver arguments for ``url``, sized from Settings.
+
+    SQLite stands in for Postgres locally: file databases get the same
+    instrumented queue pool, in-memory ones share a single connection.
+    """
+    parsed=make_url(url)
+    options={
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
     }
-)
+    if parsed.get_backend_name()=="sqlite":
+        options["connect_args"]={"check_same_thread": False, "timeout": settings.DB_CONNECT_TIMEOUT}
+        if parsed.database in (None, "", ":memory:"):
+            options["poolclass"]=StaticPool
+            return options
+    elif not is_async:
+        options["connect_args"]={
+            "connect_timeout": settings.DB_CONNECT_TIMEOUT,
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    else:
+        options["connect_args"]={
+            "timeout": settings.DB_CONNECT_TIMEOUT,
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+# The engine (and its driver import) is built on first use, not at import
+@lru_cache()
+def get_engine():
+    url=database_url()
+    return create_engine(url, **engine_options(url))
+
+@lru_cache()
+def get_async_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+    url=async_database_url()
+    return create_async_engine(url, **engine_options(url, is_async=True))
+
+@lru_cache()
+def get_sessionmaker()->sessionmaker:
+    return sessionmaker(
+        autocommit= False, 
+        autoflush = False, 
+        bind= get_engine(),
+        expire_on_commit=False)
+
+@lru_cache()
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False)
+
+def SessionLocal()->Session:
+    return get_sessionmaker()()
+
+def dispose_engines():
+    """Close pooled connections and forget the cached engines."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        get_async_engine().sync_engine.dispose()
+    for cached in (get_engine, get_async_engine, get_sessionmaker, get_async_sessionmaker):
+        cached.cache_clear()
+
+def use_database_url(url:Optional[str])->None:
+    """Rebind the engines to ``url`` (None restores Settings.DATABASE_URL)."""
+    global _database_url_override
+    dispose_engines()
+    _database_url_override=url
 
-SessionLocal = sessionmaker(
-    autocommit= False, 
-    autoflush = False, 
-    bind= engine,
-    expire_on_commit=False)
 Base = declarative_base()
 def get_db()->Session:
     db = SessionLocal()
@@ -35,10 +120,14 @@ def get_db()->Session:
     finally:
         db.close()
 
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 def init_db():
     try:
         from backend.database import models
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("Database table created successfully")
 
         table_names= Base.metadata.tables.keys()
@@ -50,7 +139,7 @@ def init_db():
 def check_db_connection() -> bool:
     try:
         db=SessionLocal()
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db.close()
         logger.info("Databse Connection successful")
         return True
@@ -63,7 +152,7 @@ def drop_all_tables()->bool:
         logger.error("Drop all tables operation is only allowed in DEBUG mode")
         return False
     try:
-        Base.metadata.drop_all(bind=engine)
+        Base.metadata.drop_all(bind=get_engine())
         logger.warning("All tables dropped successfully")
         return True
     except Exception as e:
@@ -81,18 +170,27 @@ def reset_db()->bool:
     return True
 
 
+def pool_metrics(engine=None)->Optional[dict]:
+    """Size, saturation and checkout wait-time stats for the engine's pool."""
+    engine=engine or get_engine()
+    # AsyncEngine wraps a regular Engine that owns the pool
+    pool=getattr(engine, "sync_engine", engine).pool
+    metrics=getattr(pool, "metrics", None)
+    if metrics is None:
+        return None
+    return metrics.snapshot(pool)
+
 def get_db_health()->dict:
     try:
         is_connected=check_db_connection()
+        url=make_url(database_url())
 
         return{
             "status": "healthy" if is_connected else "unhealthy",
             "connected": is_connected,
-            "pool_Size":engine.pool.size(),
-            "checked_out_connections": engine.pool.checkedout(),
-            "overflow": engine.pool.overflow(),
-            "database_url":settings.DATABASE_URL.split("@")[1] if @ in settings.DATABASE_URL else "unknown"
-
+            "backend": url.get_backend_name(),
+            "database_url": url.render_as_string(hide_password=True).split("@")[-1],
+            "pool": pool_metrics()
         }
     except Exception as e:
         logger.error(f"Error getting db health:{e}")
@@ -12,6 +12,4 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    items = relationship("Item", back_populates="owner")
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
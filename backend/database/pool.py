@@ -0,0 +1,107 @@
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from threading import Lock
+import time
+
+# Pool events counted by PoolMetrics (all public sqlalchemy.events.PoolEvents)
+POOL_EVENTS=("connect", "checkout", "checkin")
+
+
+class PoolMetrics:
+    """Thread-safe counters for one pool, fed by its public pool events.
+
+    Wait time is measured around ``Pool.connect()``, so it includes
+    queueing for a free slot and opening new connections, but not query time.
+    """
+
+    def __init__(self, max_overflow:int):
+        self._lock=Lock()
+        self.max_overflow=max_overflow
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_opened=0
+            self.checkouts=0
+            self.checkins=0
+            self.timeouts=0
+            self.waits=0
+            self.total_wait_ms=0.0
+            self.max_wait_ms=0.0
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_opened+=1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts+=1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins+=1
+
+    def record_wait(self, wait_ms:float, timed_out:bool=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts+=1
+            self.waits+=1
+            self.total_wait_ms+=wait_ms
+            self.max_wait_ms=max(self.max_wait_ms, wait_ms)
+
+    def snapshot(self, pool:QueuePool)->dict:
+        with self._lock:
+            capacity=pool.size()+max(self.max_overflow, 0)
+            checked_out=pool.checkedout()
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": self.max_overflow,
+                "checked_out": checked_out,
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "saturation": round(checked_out/capacity, 4) if capacity>0 else 0.0,
+                "connections_opened": self.connections_opened,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms/self.waits, 3) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+
+class _InstrumentedMixin:
+    metrics:PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics=PoolMetrics(kwargs.get("max_overflow", 10))
+        for name in POOL_EVENTS:
+            event.listen(self, name, getattr(self.metrics, f"on_{name}"))
+
+    def recreate(self):
+        # engine.dispose() copies this pool's listeners to the new one, so
+        # keep those (and these counters) and drop the fresh set
+        pool=super().recreate()
+        for name in POOL_EVENTS:
+            event.remove(pool, name, getattr(pool.metrics, f"on_{name}"))
+        pool.metrics=self.metrics
+        return pool
+
+    def connect(self):
+        start=time.perf_counter()
+        try:
+            conn=super().connect()
+        except PoolTimeoutError:
+            self.metrics.record_wait((time.perf_counter()-start)*1000, timed_out=True)
+            raise
+        self.metrics.record_wait((time.perf_counter()-start)*1000)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    """QueuePool that records checkout wait times, timeouts and pool events."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    """Async-adapted variant used by the asyncio engine."""
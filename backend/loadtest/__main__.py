@@ -0,0 +1,5 @@
+import sys
+
+from backend.loadtest.runner import main
+
+sys.exit(main())
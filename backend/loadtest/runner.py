@@ -0,0 +1,554 @@
+"""Load generator for ``/api/compute-separators``: ``python -m backend.loadtest``.
+
+Starts ``backend.app:app`` on a free local port (see target.py), or uses
+``--url``, and runs one stage per concurrency level. In a stage, each virtual
+user keeps one HTTP/1.1 connection open and sends the next request as soon
+as the previous answer arrives (closed loop). Each request's point count and
+algorithm are drawn from the configured mixes. Every stage reports RPS,
+latency percentiles, error rate and event-loop lag, for both the server and
+the generator itself. It is then checked against the thresholds in
+``slo.json``. Throughput, latency and server loop lag limits there are
+ratios to a stored baseline run (``baseline.json``, which records the host
+it was measured on), so they carry over between machines once a baseline is
+recorded there with ``--record-baseline``. The exit status is 1 if any
+threshold is missed and 2 if the run itself failed.
+
+Only the standard library is used on the client side, so the generator
+adds as little overhead as possible and needs nothing beyond the backend's
+own requirements.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from backend.loadtest.stats import LAG_PATH, sample_event_loop_lag, summarize
+
+REPO_ROOT=Path(__file__).resolve().parents[2]
+DEFAULT_SLO_FILE=Path(__file__).with_name("slo.json")
+COMPUTE_PATH="/api/compute-separators"
+
+EXIT_OK=0
+EXIT_SLO_FAILED=1
+EXIT_ERROR=2
+
+# Distinct request bodies per (size, algorithm), generated up front
+BODIES_PER_VARIANT=16
+# Points are drawn in the frontend's 800 x 600 canvas
+CANVAS_WIDTH, CANVAS_HEIGHT=800, 600
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client connection on asyncio streams."""
+
+    def __init__(self, host:str, port:int):
+        self.host=host
+        self.port=port
+        self._reader: Optional[asyncio.StreamReader]=None
+        self._writer: Optional[asyncio.StreamWriter]=None
+
+    async def request(self, method:str, path:str, body:bytes=b"")->Tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer=await asyncio.open_connection(self.host, self.port)
+        head=(
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        self._writer.write(head.encode("latin-1")+body)
+        await self._writer.drain()
+
+        status_line=await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        status=int(status_line.split()[1])
+        length, chunked, close=None, False, False
+        while True:
+            line=await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value=line.decode("latin-1").partition(":")
+            name, value=name.strip().lower(), value.strip().lower()
+            if name=="content-length":
+                length=int(value)
+            elif name=="transfer-encoding":
+                chunked="chunked" in value
+            elif name=="connection":
+                close=value=="close"
+
+        if chunked:
+            payload=await self._read_chunked()
+        elif length is not None:
+            payload=await self._reader.readexactly(length)
+        else:
+            payload, close=await self._reader.read(), True
+        if close:
+            await self.close()
+        return status, payload
+
+    async def _read_chunked(self)->bytes:
+        parts=[]
+        while True:
+            size=int((await self._reader.readline()).split(b";")[0], 16)
+            if size==0:
+                await self._reader.readline()
+                return b"".join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readline()
+
+    async def close(self)->None:
+        writer, self._reader, self._writer=self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+@dataclass
+class Variant:
+    size: int
+    algorithm: str
+    weight: float
+    bodies: List[bytes]
+
+    @property
+    def name(self)->str:
+        return f"{self.algorithm}/{self.size}"
+
+
+def parse_mix(spec:str, cast:Callable[[str], object])->List[Tuple[object, float]]:
+    """'20:4,200:1' -> [(20, 4.0), (200, 1.0)]; a missing weight means 1."""
+    mix=[]
+    for item in spec.split(","):
+        value, _, weight=item.strip().partition(":")
+        mix.append((cast(value), float(weight or 1)))
+    return mix
+
+
+def build_payload(size:int, algorithm:str, rng:random.Random)->bytes:
+    # A quarter red, the rest blue, like a typical interactive instance
+    red=max(1, size//4)
+    points=[
+        {"x": round(rng.uniform(0, CANVAS_WIDTH), 2), "y": round(rng.uniform(0, CANVAS_HEIGHT), 2)}
+        for _ in range(size)
+    ]
+    return json.dumps({
+        "red_points": points[:red],
+        "blue_points": points[red:],
+        "algorithm": algorithm,
+        "save_to_db": False
+    }).encode()
+
+
+def build_variants(sizes:str, algorithms:str, seed:int)->List[Variant]:
+    rng=random.Random(seed)
+    return [
+        Variant(
+            size=size,
+            algorithm=algorithm,
+            weight=size_weight*algorithm_weight,
+            bodies=[build_payload(size, algorithm, rng) for _ in range(BODIES_PER_VARIANT)]
+        )
+        for size, size_weight in parse_mix(sizes, int)
+        for algorithm, algorithm_weight in parse_mix(algorithms, str)
+    ]
+
+
+class StageRecorder:
+    def __init__(self, variants:Sequence[Variant]):
+        self.latencies: Dict[str, List[float]]={v.name: [] for v in variants}
+        self.errors: Counter=Counter()
+        self.requests=0
+
+    def ok(self, variant:Variant, latency_ms:float)->None:
+        self.requests+=1
+        self.latencies[variant.name].append(latency_ms)
+
+    def error(self, kind:str)->None:
+        self.requests+=1
+        self.errors[kind]+=1
+
+
+async def virtual_user(
+    host:str,
+    port:int,
+    variants:Sequence[Variant],
+    rng:random.Random,
+    deadline:float,
+    timeout:float,
+    recorder:Optional[StageRecorder]
+)->None:
+    conn=HTTPConnection(host, port)
+    weights=[v.weight for v in variants]
+    try:
+        while time.perf_counter()<deadline:
+            variant=rng.choices(variants, weights)[0]
+            body=rng.choice(variant.bodies)
+            start=time.perf_counter()
+            try:
+                status, _=await asyncio.wait_for(conn.request("POST", COMPUTE_PATH, body), timeout)
+            except asyncio.TimeoutError:
+                kind="timeout"
+                await conn.close()
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                kind=type(e).__name__
+                await conn.close()
+            else:
+                kind=None if status==200 else f"http_{status}"
+            if recorder is None:
+                continue
+            if kind is None:
+                recorder.ok(variant, (time.perf_counter()-start)*1000)
+            else:
+                recorder.error(kind)
+    finally:
+        await conn.close()
+
+
+async def fetch_json(host:str, port:int, path:str)->Optional[dict]:
+    conn=HTTPConnection(host, port)
+    try:
+        status, payload=await asyncio.wait_for(conn.request("GET", path), 10)
+        return json.loads(payload) if status==200 else None
+    except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    finally:
+        await conn.close()
+
+
+async def run_stage(
+    host:str,
+    port:int,
+    variants:Sequence[Variant],
+    concurrency:int,
+    duration:float,
+    warmup:float,
+    timeout:float,
+    seed:int
+)->dict:
+    rngs=[random.Random(seed*100_003+i) for i in range(concurrency)]
+    if warmup>0:
+        deadline=time.perf_counter()+warmup
+        await asyncio.gather(*(virtual_user(host, port, variants, rng, deadline, timeout, None) for rng in rngs))
+
+    # Not available against --url servers, which lack the probe
+    await fetch_json(host, port, f"{LAG_PATH}?reset=true")
+    client_lag: "deque[float]"=deque(maxlen=500_000)
+    lag_task=asyncio.create_task(sample_event_loop_lag(client_lag))
+    recorder=StageRecorder(variants)
+    start=time.perf_counter()
+    await asyncio.gather(*(
+        virtual_user(host, port, variants, rng, start+duration, timeout, recorder) for rng in rngs
+    ))
+    elapsed=time.perf_counter()-start
+    lag_task.cancel()
+    server_lag=await fetch_json(host, port, LAG_PATH)
+
+    all_latencies=[ms for values in recorder.latencies.values() for ms in values]
+    errors=sum(recorder.errors.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": recorder.requests,
+        "errors": dict(recorder.errors),
+        "error_rate": errors/recorder.requests if recorder.requests else 0.0,
+        "rps": len(all_latencies)/elapsed,
+        "latency_ms": summarize(all_latencies),
+        "variants": {name: summarize(values) for name, values in recorder.latencies.items()},
+        "server_loop_lag_ms": server_lag,
+        "client_loop_lag_ms": summarize(list(client_lag)),
+    }
+
+
+# report key -> (threshold key, is a lower bound)
+SLO_CHECKS={
+    "rps": ("min_rps", True),
+    "latency_ms.p50": ("max_p50_ms", False),
+    "latency_ms.p95": ("max_p95_ms", False),
+    "latency_ms.p99": ("max_p99_ms", False),
+    "error_rate": ("max_error_rate", False),
+    "server_loop_lag_ms.p99": ("max_server_loop_lag_p99_ms", False),
+    "client_loop_lag_ms.p99": ("max_client_loop_lag_p99_ms", False),
+}
+
+
+# report key -> (threshold key, is a lower bound); the limit is the ratio
+# times the baseline stage's value, plus ``slack_ms`` for upper bounds
+RELATIVE_CHECKS={
+    "rps": ("min_rps_ratio", True),
+    "latency_ms.p50": ("max_p50_ratio", False),
+    "latency_ms.p95": ("max_p95_ratio", False),
+    "latency_ms.p99": ("max_p99_ratio", False),
+    "server_loop_lag_ms.p99": ("max_server_loop_lag_p99_ratio", False),
+}
+
+
+def stage_thresholds(slo:dict, concurrency:int)->Dict[str, float]:
+    """Default thresholds overridden by the stage's own, keyed by concurrency."""
+    return {**slo.get("default", {}), **slo.get("stages", {}).get(str(concurrency), {})}
+
+
+def report_value(report:dict, path:str)->Optional[float]:
+    value=report
+    for part in path.split("."):
+        value=value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def check_slo(report:dict, slo:dict, baseline:Optional[dict]=None)->List[str]:
+    """Human-readable SLO violations of one stage report (empty if it passes).
+
+    Relative thresholds only apply when ``baseline`` (a recorded baseline
+    run) has a stage with the same concurrency.
+    """
+    thresholds=stage_thresholds(slo, report["concurrency"])
+    reference=(baseline or {}).get("stages", {}).get(str(report["concurrency"]))
+    limits=[]
+    for path, (key, lower_bound) in SLO_CHECKS.items():
+        if key in thresholds:
+            limits.append((path, key, lower_bound, thresholds[key]))
+    for path, (key, lower_bound) in RELATIVE_CHECKS.items():
+        base=report_value(reference, path) if reference else None
+        if key in thresholds and base is not None:
+            slack=0.0 if lower_bound else thresholds.get("slack_ms", 0.0)
+            limits.append((path, key, lower_bound, thresholds[key]*base+slack))
+    violations=[]
+    for path, key, lower_bound, limit in limits:
+        value=report_value(report, path)
+        if value is None:
+            # e.g. no server lag probe behind --url
+            continue
+        if (value<limit) if lower_bound else (value>limit):
+            violations.append(
+                f"c={report['concurrency']}: {path} {value:.4g} {'<' if lower_bound else '>'} {key} {limit:.4g}"
+            )
+    if not report["requests"]:
+        violations.append(f"c={report['concurrency']}: no requests completed")
+    return violations
+
+
+def host_info()->dict:
+    """The machine a run was measured on, stored with every baseline."""
+    cpus=os.cpu_count()
+    if hasattr(os, "sched_getaffinity"):
+        cpus=len(os.sched_getaffinity(0))
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpus": cpus,
+        "python": platform.python_version(),
+    }
+
+
+def run_config(args:argparse.Namespace)->dict:
+    """The options a baseline is only comparable under."""
+    return {
+        "url": args.url,
+        "workers": None if args.url else args.workers,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "sizes": args.sizes,
+        "algorithms": args.algorithms,
+        "seed": args.seed,
+    }
+
+
+def baseline_stage(report:dict)->dict:
+    """The values of one stage report that relative thresholds scale."""
+    latency, lag=report["latency_ms"], report["server_loop_lag_ms"]
+    return {
+        "rps": round(report["rps"], 2),
+        "latency_ms": {k: round(latency[k], 2) for k in ("p50", "p95", "p99")},
+        "server_loop_lag_ms": {"p99": round(lag["p99"], 2)} if lag else None,
+    }
+
+
+def make_baseline(reports:Sequence[dict], args:argparse.Namespace)->dict:
+    return {
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": host_info(),
+        "config": run_config(args),
+        "stages": {str(report["concurrency"]): baseline_stage(report) for report in reports},
+    }
+
+
+def load_baseline(args:argparse.Namespace, slo:dict)->Optional[dict]:
+    """--baseline, else the file slo.json names (relative to slo.json)."""
+    path=args.baseline
+    if path is None and slo.get("baseline"):
+        path=Path(args.slo).parent/slo["baseline"]
+    return json.loads(Path(path).read_text()) if path else None
+
+
+def baseline_notes(baseline:dict)->List[str]:
+    """Why relative limits may not transfer to this run (empty if they do)."""
+    notes=[]
+    changed=[k for k, v in host_info().items() if k!="platform" and baseline.get("host", {}).get(k)!=v]
+    if changed:
+        notes.append(
+            f"baseline host differs ({', '.join(changed)}): {baseline.get('host')}; "
+            "record one on this host with --record-baseline"
+        )
+    return notes
+
+
+def free_port()->int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """backend.loadtest.target in a subprocess on a free local port."""
+
+    def __init__(self, workers:int=1, startup_timeout:float=60):
+        self.host="127.0.0.1"
+        self.port=free_port()
+        self.workers=workers
+        self.startup_timeout=startup_timeout
+        self.process: Optional[subprocess.Popen]=None
+
+    async def start(self)->None:
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+        self.process=subprocess.Popen(
+            [sys.executable, "-m", "backend.loadtest.target", "--port", str(self.port), "--workers", str(self.workers)],
+            cwd=REPO_ROOT,
+            env=env
+        )
+        deadline=time.monotonic()+self.startup_timeout
+        while time.monotonic()<deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup with status {self.process.returncode}")
+            if await fetch_json(self.host, self.port, "/api/health") is not None:
+                return
+            await asyncio.sleep(0.2)
+        raise RuntimeError(f"Server did not become healthy within {self.startup_timeout:g} s")
+
+    def stop(self)->None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def format_stage(report:dict)->str:
+    latency=report["latency_ms"]
+    lines=[
+        f"c={report['concurrency']:<4} {report['requests']} requests in {report['duration_s']:.1f} s, "
+        f"{report['rps']:.1f} rps, error rate {report['error_rate']:.2%}"
+        + (f" {report['errors']}" if report["errors"] else ""),
+        f"       latency ms  p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+        f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}",
+    ]
+    server, client=report["server_loop_lag_ms"], report["client_loop_lag_ms"]
+    lines.append(
+        "       loop lag ms server "
+        + (f"p99 {server['p99']:.1f} max {server['max']:.1f}" if server else "n/a")
+        + f" | generator p99 {client['p99']:.1f} max {client['max']:.1f}"
+    )
+    for name, stats in report["variants"].items():
+        lines.append(
+            f"       {name:<18} n={stats['samples']:<6} p50 {stats['p50']:.1f}  "
+            f"p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run(args:argparse.Namespace)->Tuple[List[dict], Optional[LocalServer]]:
+    variants=build_variants(args.sizes, args.algorithms, args.seed)
+    server=None
+    if args.url:
+        target=urlsplit(args.url)
+        host, port=target.hostname or "127.0.0.1", target.port or 80
+    else:
+        server=LocalServer(workers=args.workers)
+        await server.start()
+        host, port=server.host, server.port
+    reports=[]
+    try:
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            report=await run_stage(host, port, variants, concurrency, args.duration, args.warmup, args.timeout, args.seed)
+            print(format_stage(report), flush=True)
+            reports.append(report)
+    finally:
+        if server is not None:
+            server.stop()
+    return reports, server
+
+
+def parse_args(argv:Optional[List[str]]=None)->argparse.Namespace:
+    parser=argparse.ArgumentParser(
+        prog="python -m backend.loadtest",
+        description="Drive /api/compute-separators and check the results against SLO thresholds"
+    )
+    parser.add_argument("--url", help="Existing server to test instead of starting backend.app:app locally")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes when started locally")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated virtual users per stage")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per stage")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each stage")
+    parser.add_argument("--sizes", default="20:4,200:3,900:1", help="Points per request with weights, size:weight,...")
+    parser.add_argument("--algorithms", default="rectangles:3,squares:1", help="Algorithm mix, name:weight,...")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--slo", default=str(DEFAULT_SLO_FILE), help="SLO thresholds JSON; empty to skip the check")
+    parser.add_argument("--baseline", help="Baseline run for relative thresholds (default: the one slo.json names)")
+    parser.add_argument("--record-baseline", help="Write this run as a baseline to this file")
+    parser.add_argument("--report", help="Write the full JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv:Optional[List[str]]=None)->int:
+    args=parse_args(argv)
+    try:
+        slo=json.loads(Path(args.slo).read_text()) if args.slo else {}
+        baseline=load_baseline(args, slo)
+        reports, _=asyncio.run(run(args))
+        if args.record_baseline:
+            Path(args.record_baseline).write_text(json.dumps(make_baseline(reports, args), indent=2)+"\n")
+            print(f"Baseline written to {args.record_baseline}")
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Load test failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if baseline is not None:
+        if baseline.get("config")!=run_config(args):
+            # Other mixes or durations measure something else entirely
+            print(f"Relative thresholds skipped: baseline was recorded with {baseline.get('config')}")
+            baseline=None
+        else:
+            for note in baseline_notes(baseline):
+                print(f"Note: {note}")
+    violations=[v for report in reports for v in check_slo(report, slo, baseline)] if slo else []
+    if args.report:
+        Path(args.report).write_text(json.dumps(
+            {"stages": reports, "slo": slo, "baseline": baseline, "violations": violations}, indent=2
+        ))
+    if not slo:
+        print("SLO check skipped")
+        return EXIT_OK
+    if violations:
+        print("SLO FAILED:\n  "+"\n  ".join(violations))
+        return EXIT_SLO_FAILED
+    print(f"SLO passed ({args.slo})")
+    return EXIT_OK
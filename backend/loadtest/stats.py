@@ -0,0 +1,44 @@
+"""Latency and event-loop lag statistics shared by the load generator and
+the server under test."""
+import asyncio
+import math
+from collections import deque
+from typing import Dict, Sequence
+
+# Served by backend/loadtest/target.py
+LAG_PATH="/__loadtest/lag"
+# How often the lag probe wakes up, in seconds
+LAG_INTERVAL=0.01
+
+
+def percentile(sorted_values:Sequence[float], pct:float)->float:
+    """Nearest-rank percentile of an already sorted sequence (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank=max(1, math.ceil(pct/100*len(sorted_values)))
+    return sorted_values[rank-1]
+
+
+def summarize(values:Sequence[float])->Dict[str, float]:
+    ordered=sorted(values)
+    return {
+        "samples": len(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+        "mean": sum(ordered)/len(ordered) if ordered else 0.0,
+    }
+
+
+async def sample_event_loop_lag(samples:"deque[float]", interval:float=LAG_INTERVAL)->None:
+    """Record, in ms, how late each ``interval`` sleep wakes up; runs until cancelled.
+
+    Anything that blocks the loop (CPU work in a handler, a sync DB call)
+    delays the wake-up by the same amount.
+    """
+    loop=asyncio.get_running_loop()
+    while True:
+        start=loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time()-start-interval)*1000)
@@ -0,0 +1,54 @@
+"""Server under test: ``backend.app:app`` plus an event-loop lag probe.
+
+The load generator starts this module in a subprocess. Each worker samples
+its own event-loop lag from startup and serves the samples at ``LAG_PATH``;
+the route only exists in this process, so the production app is unchanged.
+"""
+import argparse
+import asyncio
+from collections import deque
+from typing import List, Optional
+
+from backend.app import app
+from backend.loadtest.stats import LAG_PATH, sample_event_loop_lag, summarize
+
+_lag_samples: "deque[float]"=deque(maxlen=500_000)
+# Keeps the probe task referenced for the worker's lifetime
+_lag_task: Optional[asyncio.Task]=None
+
+
+@app.on_event("startup")
+async def start_lag_probe():
+    global _lag_task
+    _lag_task=asyncio.get_running_loop().create_task(sample_event_loop_lag(_lag_samples))
+
+
+@app.get(LAG_PATH, include_in_schema=False)
+async def event_loop_lag(reset: bool=False)->dict:
+    """Lag percentiles in ms since the last reset, of the worker that answers."""
+    stats=summarize(list(_lag_samples))
+    if reset:
+        _lag_samples.clear()
+    return stats
+
+
+def main(argv:Optional[List[str]]=None)->None:
+    parser=argparse.ArgumentParser(description="Serve backend.app:app for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=1)
+    args=parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(
+        "backend.loadtest.target:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+        access_log=False
+    )
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,251 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from functools import partial
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from typing import AsyncIterator, List, Tuple
+import anyio
+import json
+import logging as logger
+
+from backend.api.models import (
+    ClassifyRequest,
+    ClassifyResponse,
+    ErrorResponse,
+    ShapeSchema
+)
+from backend.config import get_settings
+
+# numpy and the classifier are imported inside the handlers so that the API
+# cold start does not pay for them
+router=APIRouter(prefix="/api/classify", tags=["Classification"])
+settings=get_settings()
+
+# Same bound as PointSchema
+MAX_ABS_COORD=1e10
+
+STREAM_FORMAT=(
+    "Request body: a JSON header line {\"shapes\": [...]} followed by one 'x,y' "
+    "point per line. Response: NDJSON, one {\"labels\": [...]} line per batch of "
+    "up to CLASSIFY_STREAM_BATCH points, then a final "
+    "{\"counts\": [...], \"total_points\": n, \"outside\": m} line. Errors after "
+    "the header, including lines longer than CLASSIFY_MAX_LINE_BYTES, are "
+    "reported as an {\"error\": \"...\"} line."
+)
+
+
+class LineTooLongError(ValueError):
+    pass
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse whose generator may still be reading the request body.
+
+    Starlette (always up to 0.37, below ASGI spec 2.4 since) listens for
+    client disconnects on ``receive`` while streaming, which would swallow
+    the body chunks the generator is waiting for. Here that listener only
+    starts once ``body_read`` is set; until then a disconnect surfaces as
+    ClientDisconnect from ``Request.stream()`` in the generator.
+    """
+
+    def __init__(self, content, body_read:anyio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read=body_read
+
+    async def __call__(self, scope, receive, send)->None:
+        spec_version=tuple(map(int, scope.get("asgi", {}).get("spec_version", "2.0").split(".")))
+        if spec_version>=(2, 4):
+            # Disconnects surface as OSError from send; nothing to listen for
+            try:
+                await self.stream_response(send)
+            except OSError:
+                raise ClientDisconnect()
+        else:
+            async with anyio.create_task_group() as task_group:
+
+                async def wrap(func)->None:
+                    await func()
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(wrap, partial(self.stream_response, send))
+                await self.body_read.wait()
+                await wrap(partial(self.listen_for_disconnect, receive))
+
+        if self.background is not None:
+            await self.background()
+
+
+async def request_body(request:Request, body_read:anyio.Event)->AsyncIterator[bytes]:
+    """``request.stream()`` that sets ``body_read`` once it is exhausted."""
+    async for chunk in request.stream():
+        yield chunk
+    body_read.set()
+
+
+async def line_blocks(stream:AsyncIterator[bytes], max_line:int)->AsyncIterator[bytes]:
+    """Re-chunk a byte stream so that every block ends on a line boundary.
+
+    Raises LineTooLongError once an unfinished line exceeds ``max_line``
+    bytes, so a body without newlines is never buffered without limit.
+    """
+    pending=b""
+    async for chunk in stream:
+        pending+=chunk
+        cut=pending.rfind(b"\n")
+        if cut>=0:
+            yield pending[:cut+1]
+            pending=pending[cut+1:]
+        if len(pending)>max_line:
+            raise LineTooLongError(f"Line longer than {max_line} bytes")
+    if pending.strip():
+        yield pending
+
+
+def parse_points(block:bytes)->Tuple["np.ndarray", "np.ndarray"]:
+    """x and y arrays from 'x,y' lines; blank lines are ignored."""
+    import numpy as np
+    lines=[line for line in block.splitlines() if line.strip()]
+    if not lines:
+        return np.empty(0), np.empty(0)
+    fields=b",".join(lines).split(b",")
+    if len(fields)!=2*len(lines):
+        raise ValueError("Expected one 'x,y' point per line")
+    values=np.array(fields).astype(np.float64).reshape(-1, 2)
+    if not np.isfinite(values).all() or (np.abs(values)>MAX_ABS_COORD).any():
+        raise ValueError(f"Coordinates must be finite and within +/-{MAX_ABS_COORD:g}")
+    return values[:, 0], values[:, 1]
+
+
+def check_shape_count(shapes:List[ShapeSchema])->None:
+    if len(shapes)>settings.MAX_CLASSIFY_SHAPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {settings.MAX_CLASSIFY_SHAPES} shapes"
+        )
+
+
+@router.post(
+    "",
+    response_model=ClassifyResponse,
+    summary="Classify points against shapes",
+    description="Label each point with the first shape containing it and count the points inside each shape",
+    responses={
+        400: {"description": "Too many points or shapes", "model": ErrorResponse},
+        404: {"description": "Unknown dataset", "model": ErrorResponse}
+    }
+)
+
+async def classify(request: ClassifyRequest)->ClassifyResponse:
+    from backend.algorithm.classify import classify_points
+    if len(request.points)>settings.MAX_CLASSIFY_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {settings.MAX_CLASSIFY_POINTS} points, use /api/classify/stream"
+        )
+    check_shape_count(request.shapes)
+    if request.dataset_id:
+        from backend.data.registry import DatasetNotFoundError, get_registry
+        try:
+            dataset=await run_in_threadpool(get_registry().load, request.dataset_id)
+        except DatasetNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Dataset '{request.dataset_id}' not found"
+            )
+        # Labels would refer to deduplicated points, so datasets only get counts
+        x, y, count=dataset.arrays["x"], dataset.arrays["y"], dataset.arrays["count"]
+        include_labels=False
+    else:
+        x=[pt.x for pt in request.points]
+        y=[pt.y for pt in request.points]
+        count=None
+        include_labels=request.include_labels
+
+    labels, counts=await run_in_threadpool(classify_points, request.shapes, x, y, count)
+    total=int(count.sum()) if count is not None else len(labels)
+    return ClassifyResponse(
+        labels=labels.tolist() if include_labels else None,
+        counts=counts.tolist(),
+        total_points=total,
+        outside=int(count[labels<0].sum()) if count is not None else int((labels<0).sum())
+    )
+
+
+@router.post(
+    "/stream",
+    summary="Classify a point stream against shapes",
+    description=STREAM_FORMAT,
+    response_class=StreamingResponse,
+    responses={
+        400: {"description": "Missing or invalid header line, or too many shapes", "model": ErrorResponse},
+        413: {"description": "Line longer than CLASSIFY_MAX_LINE_BYTES", "model": ErrorResponse}
+    }
+)
+
+async def classify_stream(http_request: Request)->StreamingResponse:
+    from backend.algorithm.classify import ShapeIndex
+    body_read=anyio.Event()
+    blocks=line_blocks(request_body(http_request, body_read), settings.CLASSIFY_MAX_LINE_BYTES)
+    try:
+        first=await anext(blocks, b"")
+    except LineTooLongError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    header, _, rest=first.partition(b"\n")
+    try:
+        shapes=ClassifyRequest.model_validate(json.loads(header)).shapes
+    except (ValueError, ValidationError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"First line must be a JSON object with 'shapes': {e}"
+        )
+    check_shape_count(shapes)
+    # Building the index is O(shapes log shapes), keep it off the event loop
+    index=await run_in_threadpool(ShapeIndex, shapes)
+    return BodyStreamingResponse(
+        _classified_lines(index, rest, blocks),
+        body_read=body_read,
+        media_type="application/x-ndjson"
+    )
+
+
+async def _classified_lines(index, rest:bytes, blocks:AsyncIterator[bytes])->AsyncIterator[str]:
+    import numpy as np
+    counts=np.zeros(index.num_shapes, dtype=np.int64)
+    total=outside=0
+
+    def run(batch:List[bytes])->"np.ndarray":
+        x, y=parse_points(b"".join(batch))
+        labels, batch_counts=index.classify(x, y)
+        counts[:]+=batch_counts
+        return labels
+
+    async def pending_batches()->AsyncIterator[List[bytes]]:
+        batch, lines=[rest], rest.count(b"\n")
+        async for block in blocks:
+            batch.append(block)
+            lines+=block.count(b"\n")
+            if lines>=settings.CLASSIFY_STREAM_BATCH:
+                yield batch
+                batch, lines=[], 0
+        yield batch
+
+    try:
+        async for batch in pending_batches():
+            labels=await run_in_threadpool(run, batch)
+            total+=len(labels)
+            outside+=int((labels<0).sum())
+            step=settings.CLASSIFY_STREAM_BATCH
+            for start in range(0, len(labels), step):
+                yield json.dumps({"labels": labels[start:start+step].tolist()})+"\n"
+    except ValueError as e:
+        logger.error(f"Classification stream aborted: {str(e)}")
+        yield json.dumps({"error": str(e)})+"\n"
+        return
+    except ClientDisconnect:
+        logger.info("Classification stream client disconnected")
+        return
+    yield json.dumps({"counts": counts.tolist(), "total_points": total, "outside": outside})+"\n"
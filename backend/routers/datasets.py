@@ -0,0 +1,144 @@
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+import logging as logger
+
+from backend.api.models import (
+    DatasetImportResponse,
+    DatasetInfo,
+    DatasetUploadRequest,
+    ErrorResponse
+)
+from backend.algorithm.seperators import Point as AlgoPoint
+from backend.config import get_settings
+
+# Registry imports (and numpy) happen inside the handlers so that the API
+# cold start does not pay for them
+router=APIRouter(prefix="/api/datasets", tags=["Datasets"])
+settings=get_settings()
+
+@router.post(
+    "",
+    response_model=DatasetInfo,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register a point dataset",
+    description="Store a point set once (deduplicated, indexed, memory-mapped) and reference it by ID in compute requests",
+    responses={400: {"description": "Too many points", "model": ErrorResponse}}
+)
+
+async def register_dataset(request: DatasetUploadRequest)->DatasetInfo:
+    from backend.data.registry import get_registry
+    if len(request.points)>settings.MAX_DATASET_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dataset exceeds maximum of {settings.MAX_DATASET_POINTS} points"
+        )
+    points=[AlgoPoint(x=pt.x, y=pt.y, weight=pt.weight) for pt in request.points]
+    info=await run_in_threadpool(get_registry().register_points, points)
+    logger.info(f"Dataset {info['dataset_id']} registered with {info['num_points']} points")
+    return DatasetInfo(**info)
+
+@router.post(
+    "/import",
+    response_model=DatasetImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Import points from CSV/Parquet",
+    description="Stream a CSV or Parquet file in chunks and register its red/blue points as datasets",
+    responses={400: {"description": "Unreadable file or bad column parameters", "model": ErrorResponse}}
+)
+
+async def import_dataset(
+    file: UploadFile=File(..., description="CSV (optionally .gz) or Parquet file"),
+    file_format: Optional[str]=Form(None, description="csv or parquet; inferred from the filename if omitted"),
+    x_column: str=Form("x"),
+    y_column: str=Form("y"),
+    label_column: Optional[str]=Form("label", description="Column holding red/blue labels; empty for a single dataset"),
+    weight_column: Optional[str]=Form(None),
+    red_label: str=Form("red"),
+    blue_label: str=Form("blue")
+)->DatasetImportResponse:
+    from backend.data.importer import PointImportError, detect_format, import_points
+    from backend.data.registry import get_registry
+    try:
+        fmt=detect_format(file.filename, file_format)
+        # The upload is already spooled to a temp file; read it in chunks off the event loop
+        result=await run_in_threadpool(
+            import_points,
+            file.file,
+            get_registry(),
+            fmt,
+            x_column=x_column,
+            y_column=y_column,
+            label_column=label_column or None,
+            weight_column=weight_column or None,
+            red_label=red_label,
+            blue_label=blue_label,
+            chunk_rows=settings.IMPORT_CHUNK_ROWS,
+            max_points=settings.MAX_DATASET_POINTS,
+            compression="gzip" if (file.filename or "").endswith(".gz") else None
+        )
+    except PointImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    finally:
+        await file.close()
+    return DatasetImportResponse(
+        datasets={name: DatasetInfo(**info) for name, info in result["datasets"].items()},
+        rows_read=result["rows_read"],
+        rows_skipped=result["rows_skipped"]
+    )
+
+@router.get(
+    "",
+    response_model=List[DatasetInfo],
+    summary="List registered datasets"
+)
+
+async def list_datasets()->List[DatasetInfo]:
+    from backend.data.registry import get_registry
+    return [DatasetInfo(**info) for info in await run_in_threadpool(get_registry().list)]
+
+@router.get(
+    "/{dataset_id}",
+    response_model=DatasetInfo,
+    summary="Get dataset details",
+    responses={404: {"description": "Unknown dataset", "model": ErrorResponse}}
+)
+
+async def get_dataset(dataset_id: str)->DatasetInfo:
+    from backend.data.registry import DatasetNotFoundError, get_registry
+    try:
+        dataset=await run_in_threadpool(get_registry().load, dataset_id)
+    except DatasetNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset '{dataset_id}' not found"
+        )
+    return DatasetInfo(**dataset.info())
+
+@router.delete(
+    "/{dataset_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a dataset",
+    responses={
+        404: {"description": "Unknown dataset", "model": ErrorResponse},
+        409: {"description": "Dataset is used by a tileset", "model": ErrorResponse}
+    }
+)
+
+async def delete_dataset(dataset_id: str)->None:
+    from backend.data.registry import DatasetNotFoundError, DatasetPinnedError, get_registry
+    try:
+        await run_in_threadpool(get_registry().delete, dataset_id)
+    except DatasetNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset '{dataset_id}' not found"
+        )
+    except DatasetPinnedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
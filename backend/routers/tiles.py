@@ -0,0 +1,135 @@
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+import logging as logger
+
+from backend.api.models import (
+    ErrorResponse,
+    TileResponse,
+    TilesetInfo,
+    TilesetRequest
+)
+from backend.algorithm.seperators import Point as AlgoPoint
+from backend.config import get_settings
+
+# The tile pyramid and registry (numpy) are imported inside the handlers so
+# that the API cold start does not pay for them
+router=APIRouter(prefix="/api/tiles", tags=["Tiles"])
+settings=get_settings()
+
+def create_tileset_sync(request: TilesetRequest)->dict:
+    from backend.data.registry import get_registry
+    from backend.data.tiles import get_tileset_store
+    registry=get_registry()
+    dataset_ids={}
+    for color in ("red", "blue"):
+        points=getattr(request, f"{color}_points")
+        if points:
+            info=registry.register_points([AlgoPoint(x=pt.x, y=pt.y, weight=pt.weight) for pt in points])
+            dataset_ids[color]=info["dataset_id"]
+        else:
+            dataset_ids[color]=getattr(request, f"{color}_dataset_id")
+    return get_tileset_store(registry).create(
+        dataset_ids["red"],
+        dataset_ids["blue"],
+        shapes=[shape.model_dump() for shape in request.shapes],
+        tile_bins=settings.TILE_BINS
+    )
+
+@router.post(
+    "",
+    response_model=TilesetInfo,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a tileset",
+    description="Build a level-of-detail tile pyramid over posted points or registered datasets, with an optional shape overlay",
+    responses={
+        400: {"description": "Too many points", "model": ErrorResponse},
+        404: {"description": "Unknown dataset", "model": ErrorResponse}
+    }
+)
+
+async def create_tileset(request: TilesetRequest)->TilesetInfo:
+    from backend.data.registry import DatasetNotFoundError
+    if len(request.red_points)+len(request.blue_points)>settings.MAX_DATASET_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Points exceed maximum of {settings.MAX_DATASET_POINTS}"
+        )
+    try:
+        spec=await run_in_threadpool(create_tileset_sync, request)
+    except DatasetNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset '{e.args[0]}' not found"
+        )
+    logger.info(f"Tileset {spec['tileset_id']} ready, max zoom {spec['max_zoom']}")
+    return TilesetInfo(**spec)
+
+@router.get(
+    "/{tileset_id}",
+    response_model=TilesetInfo,
+    summary="Get tileset details",
+    responses={404: {"description": "Unknown tileset", "model": ErrorResponse}}
+)
+
+async def get_tileset(tileset_id: str)->TilesetInfo:
+    from backend.data.registry import get_registry
+    from backend.data.tiles import TilesetNotFoundError, get_tileset_store
+    try:
+        tileset=await run_in_threadpool(get_tileset_store(get_registry()).load, tileset_id)
+    except TilesetNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tileset '{tileset_id}' not found"
+        )
+    return TilesetInfo(**tileset.info())
+
+@router.delete(
+    "/{tileset_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a tileset",
+    description="Remove the tileset and its pyramid files and release its datasets for eviction",
+    responses={404: {"description": "Unknown tileset", "model": ErrorResponse}}
+)
+
+async def delete_tileset(tileset_id: str)->None:
+    from backend.data.registry import get_registry
+    from backend.data.tiles import TilesetNotFoundError, get_tileset_store
+    try:
+        await run_in_threadpool(get_tileset_store(get_registry()).delete, tileset_id)
+    except TilesetNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tileset '{tileset_id}' not found"
+        )
+
+@router.get(
+    "/{tileset_id}/{z}/{x}/{y}",
+    response_model=TileResponse,
+    summary="Get one tile",
+    description="Per-bin point counts, weights and centroids of tile (x, y) at zoom z, plus the overlay shapes it intersects",
+    responses={404: {"description": "Unknown tileset/dataset or tile out of range", "model": ErrorResponse}}
+)
+
+async def get_tile(tileset_id: str, z: int, x: int, y: int, response: Response)->TileResponse:
+    from backend.data.registry import DatasetNotFoundError, get_registry
+    from backend.data.tiles import TileOutOfRangeError, TilesetNotFoundError, get_tileset_store
+    store=get_tileset_store(get_registry())
+
+    def load_tile()->dict:
+        return store.load(tileset_id).tile(z, x, y)
+
+    try:
+        tile=await run_in_threadpool(load_tile)
+    except (TilesetNotFoundError, DatasetNotFoundError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"'{e.args[0]}' not found"
+        )
+    except TileOutOfRangeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    # Tileset IDs are content hashes, so a tile never changes
+    response.headers["Cache-Control"]=f"public, max-age={settings.TILE_CACHE_MAX_AGE}, immutable"
+    return TileResponse(**tile)
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, EmailStr
+from typing import Optional
+from datetime import datetime
+
+class UserCreate(BaseModel):
+    username: str= Field(..., description="Login name", min_length=3, max_length=50)
+    email: EmailStr= Field(..., description="Email address")
+    password: str= Field(..., description="Password", min_length=8, max_length=128)
+
+class UserResponse(BaseModel):
+    id: int= Field(..., description="User ID")
+    username: str= Field(..., description="Login name")
+    email: str= Field(..., description="Email address")
+    is_active: bool= Field(..., description="Whether the account may log in")
+    created_at: Optional[datetime]= Field(None, description="Registration time")
+
+class Token(BaseModel):
+    access_token: str= Field(..., description="JWT bearer token")
+    token_type: str= Field("bearer", description="Always 'bearer'")
+    expires_in: int= Field(..., description="Seconds until the token expires", ge=0)
@@ -0,0 +1,172 @@
+"""Production entry point: `python -m backend.server`.
+
+Runs Gunicorn with Uvicorn workers when Gunicorn is available (Linux/macOS)
+and falls back to uvicorn's own multi-process mode otherwise. Unlike the
+development server in backend/app.py this never enables auto-reload.
+"""
+import logging
+import os
+from collections import Counter
+from typing import Dict, List
+
+from backend.config import get_settings
+from backend.utils.warmup import warmup_solvers
+
+logger=logging.getLogger(__name__)
+settings=get_settings()
+
+
+def available_cpus()->List[int]:
+    # Respects cgroup/taskset restrictions, unlike os.cpu_count()
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_count()->int:
+    if settings.WORKERS > 0:
+        return settings.WORKERS
+    return len(available_cpus())
+
+
+def solve_workers_per_worker()->int:
+    """Share of the host-wide PARALLEL_SOLVE_WORKERS for one server worker,
+    so every worker's solve pool together stays within that many processes."""
+    if settings.PARALLEL_SOLVE_WORKERS<=0:
+        return 0
+    return max(1, settings.PARALLEL_SOLVE_WORKERS//worker_count())
+
+
+def share_solve_workers()->None:
+    # Before any worker starts: gunicorn forks the updated settings,
+    # uvicorn's spawned workers read them back from the environment
+    share=solve_workers_per_worker()
+    settings.PARALLEL_SOLVE_WORKERS=share
+    os.environ["PARALLEL_SOLVE_WORKERS"]=str(share)
+
+
+def pin_worker(cpu:int)->None:
+    """Pin the calling process to one core."""
+    if not settings.CPU_AFFINITY or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, {cpu})
+        logger.info(f"Worker {os.getpid()} pinned to CPU {cpu}")
+    except OSError as e:
+        logger.warning(f"Could not set CPU affinity for worker {os.getpid()}: {e}")
+
+
+class CpuAssigner:
+    """Cores handed to workers by the master, least-loaded first.
+
+    A recycled worker's core is released when it exits, so its replacement
+    gets that core back instead of piling onto an already busy one.
+    """
+
+    def __init__(self, cpus:List[int]):
+        self.cpus=cpus
+        self.assigned: Dict[object, int]={}
+
+    def claim(self, worker:object)->int:
+        load=Counter(self.assigned.values())
+        cpu=min(self.cpus, key=lambda c: (load[c], self.cpus.index(c)))
+        self.assigned[worker]=cpu
+        return cpu
+
+    def release(self, worker:object)->None:
+        self.assigned.pop(worker, None)
+
+
+def gunicorn_options()->dict:
+    cpus=CpuAssigner(available_cpus())
+
+    def pre_fork(server, worker):
+        # Runs in the master, so every assignment is seen by the next one
+        worker.cpu=cpus.claim(worker)
+
+    def post_fork(server, worker):
+        pin_worker(worker.cpu)
+
+    def child_exit(server, worker):
+        cpus.release(worker)
+
+    def when_ready(server):
+        # The app is preloaded in the master, so workers fork already warm
+        if settings.WARMUP_ON_STARTUP:
+            warmup_solvers()
+
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": worker_count(),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        # Import app + algorithm modules once in the master; workers fork warm
+        "preload_app": True,
+        "timeout": settings.WORKER_TIMEOUT,
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "loglevel": settings.LOG_LEVEL,
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "when_ready": when_ready,
+    }
+
+
+def run_gunicorn()->None:
+    from gunicorn.app.base import BaseApplication
+
+    class SeperatorApplication(BaseApplication):
+        def __init__(self, options:dict):
+            self.options=options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from backend.app import app
+            return app
+
+    options=gunicorn_options()
+    logger.info(f"Starting gunicorn with {options['workers']} workers on {options['bind']}")
+    SeperatorApplication(options).run()
+
+
+def warm_app():
+    """App factory for uvicorn workers, which import the app themselves."""
+    from backend.app import app
+    if settings.WARMUP_ON_STARTUP:
+        warmup_solvers()
+    return app
+
+
+def run_uvicorn()->None:
+    import uvicorn
+
+    workers=worker_count()
+    logger.info(f"Gunicorn unavailable, starting uvicorn with {workers} workers")
+    uvicorn.run(
+        "backend.server:warm_app",
+        factory=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        reload=False,
+        limit_max_requests=settings.WORKER_MAX_REQUESTS or None,
+        log_level=settings.LOG_LEVEL
+    )
+
+
+def main()->None:
+    share_solve_workers()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_uvicorn()
+        return
+    run_gunicorn()
+
+
+if __name__=="__main__":
+    main()
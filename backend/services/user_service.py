@@ -0,0 +1,49 @@
+from typing import Optional, Tuple
+
+from backend.schemas.user import UserCreate, UserResponse
+
+# Blocking database access for the auth routes, run in the threadpool.
+# SQLAlchemy is imported inside the functions: the API starts (and runs its
+# unauthenticated endpoints) without a database
+
+def to_user_response(user)->UserResponse:
+    return UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        is_active=bool(user.is_active),
+        created_at=user.created_at
+    )
+
+def load_user_sync(username: str)->Optional[UserResponse]:
+    from backend.database.connection import SessionLocal
+    from backend.database.models import User
+    with SessionLocal() as db:
+        user=db.query(User).filter(User.username==username).first()
+        return to_user_response(user) if user else None
+
+def create_user_sync(request: UserCreate, hashed_password: str)->Optional[UserResponse]:
+    """The new user, or None when the username or email is taken."""
+    from sqlalchemy.exc import IntegrityError
+    from backend.database.connection import SessionLocal
+    from backend.database.models import User
+    with SessionLocal() as db:
+        user=User(username=request.username, email=request.email, hashed_password=hashed_password)
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+        db.refresh(user)
+        return to_user_response(user)
+
+def load_credentials_sync(username: str)->Tuple[Optional[UserResponse], Optional[str]]:
+    """User and password hash, or (None, None) for an unknown username."""
+    from backend.database.connection import SessionLocal
+    from backend.database.models import User
+    with SessionLocal() as db:
+        user=db.query(User).filter(User.username==username).first()
+        if user is None:
+            return None, None
+        return to_user_response(user), user.hashed_password
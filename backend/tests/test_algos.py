@@ -0,0 +1,222 @@
+import asyncio
+import math
+import random
+
+import pytest
+
+from backend.algorithm.preprocessing import compress_points, split_bounds
+from backend.algorithm.range_sum import WEIGHT_BITS, RangeSumIndex
+from backend.algorithm.seperators import Point, Rectangle, RectangleSeperator, SquareSeperator
+
+
+def _random_points(rng, count, weighted=False):
+    # Coarse grid so duplicates and equal-coordinate runs are common
+    return [
+        Point(x=rng.randint(0, 20)/4, y=rng.randint(0, 20)/4, weight=rng.choice([0.5, 1.0, 2.0]) if weighted else 1.0)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("solver", [RectangleSeperator, SquareSeperator])
+def test_parallel_solve_matches_sequential(solver):
+    rng=random.Random(7)
+    for _ in range(5):
+        seperator=solver(_random_points(rng, 80), _random_points(rng, 60, weighted=True))
+        expected=seperator.solve()
+        assert seperator.solve_parallel(workers=1)==expected
+        assert seperator.solve_parallel(workers=2)==expected
+        assert asyncio.run(seperator.solve_parallel_async(workers=2))==expected
+
+
+@pytest.mark.parametrize("solver", [RectangleSeperator, SquareSeperator])
+def test_split_shapes_match_sequential_candidates(solver):
+    from backend.algorithm.parallel import coordinate_arrays, split_shapes, sweep_arrays
+    seperator=solver(_random_points(random.Random(3), 200), [])
+    arrays=sweep_arrays(*coordinate_arrays(seperator.red))
+    squares=solver is SquareSeperator
+    shapes=[
+        tuple(tuple(float(v) for v in shape) for shape in pair)
+        for axis in ("y", "x")
+        for pair in split_shapes(arrays, axis, 0, len(arrays[f"{axis}_cuts"]), squares)
+    ]
+    candidates=seperator.candidate_squares() if squares else seperator.candidate_rects()
+    assert shapes==[tuple((r.x, r.y, r.width, r.height) for r in pair) for pair in candidates]
+
+
+def test_compress_points_merges_duplicates_and_ranks_shared_coordinates():
+    points=[Point(x=1, y=5), Point(x=3, y=5), Point(x=1, y=5, weight=2.5), Point(x=1, y=2), Point(x=3, y=5)]
+    compressed=compress_points(points)
+    # First-occurrence order, one entry per distinct location
+    assert [(p.x, p.y) for p in compressed.points]==[(1, 5), (3, 5), (1, 2)]
+    assert compressed.counts==[2, 2, 1]
+    assert compressed.weights==[3.5, 2.0, 1.0]
+    assert compressed.total_count==5 and compressed.total_weight==6.5
+    assert compressed.xs==[1, 3] and compressed.ys==[2, 5]
+    assert compressed.x_ranks==[0, 1, 0] and compressed.y_ranks==[1, 1, 0]
+    assert [[(p.x, p.y) for p in group] for group in compressed.groups('x')]==[[(1, 5), (1, 2)], [(3, 5)]]
+    with pytest.raises(ValueError):
+        compressed.groups('z')
+
+
+def test_split_bounds_never_splits_equal_coordinates():
+    compressed=compress_points([Point(x=x, y=y) for x, y in [(0, 0), (0, 4), (2, 1), (2, 1), (5, 3)]])
+    # Three distinct x values give exactly two splits, each with both columns of x=0 and x=2 kept together
+    assert split_bounds(compressed.groups('x'))==[
+        ((0, 0, 0, 4), (2, 5, 1, 3)),
+        ((0, 2, 0, 4), (5, 5, 3, 3)),
+    ]
+    assert split_bounds(compress_points([Point(x=1, y=1)]*3).groups('y'))==[]
+
+
+def _baseline_solve(red, blue, squares):
+    """Reference sweep as the solvers ran before preprocessing: refilter and
+    recount for every split of the sorted raw points, duplicates included."""
+    EPS=1e-6
+
+    def bounds(points):
+        return (min(p.x for p in points), max(p.x for p in points), min(p.y for p in points), max(p.y for p in points))
+
+    def shape(b):
+        if squares:
+            side=max(b[1]-b[0], b[3]-b[2], EPS)
+            return Rectangle(b[0], b[2], side, side)
+        return Rectangle(b[0], b[2], max(b[1]-b[0], EPS), max(b[3]-b[2], EPS))
+
+    best, best_count=None, float('inf')
+    for axis in ('y', 'x'):
+        ordered=sorted(red, key=lambda p: getattr(p, axis))
+        for a, b in zip(ordered, ordered[1:]):
+            split=(getattr(a, axis)+getattr(b, axis))/2
+            low=[p for p in red if getattr(p, axis)<=split]
+            high=[p for p in red if getattr(p, axis)>split]
+            if not low or not high:
+                continue
+            pair=(shape(bounds(low)), shape(bounds(high)))
+            count=sum(r.contains(p) for r in pair for p in blue)
+            if count<best_count:
+                best, best_count=pair, count
+    return [r.to_dict() for r in best] if best else [], best_count if best else 0
+
+
+@pytest.mark.parametrize("solver,key", [(RectangleSeperator, "rectangles"), (SquareSeperator, "squares")])
+def test_solvers_match_baseline_sweep(solver, key):
+    rng=random.Random(11)
+    for _ in range(40):
+        red, blue=_random_points(rng, rng.randint(1, 30)), _random_points(rng, rng.randint(0, 30))
+        result=solver(red, blue).solve()
+        shapes, blue_covered=_baseline_solve(red, blue, squares=key=="squares")
+        assert result[key]==shapes
+        assert result["blue_covered"]==blue_covered
+        assert result["blue_weight_covered"]==blue_covered
+        assert result["red_covered"]==len(red)
+
+
+def test_range_sums_are_exact_across_weight_magnitudes():
+    blue=compress_points([Point(x=0, y=0, weight=1e17), Point(x=5.5, y=5.5, weight=3), Point(x=7, y=7, weight=1)])
+    index=RangeSumIndex(blue)
+    assert index.query(5, 8, 5, 8)==4.0
+    assert index.count(5, 8, 5, 8)==2
+
+    rng=random.Random(3)
+    points=[
+        Point(x=rng.randint(0, 30), y=rng.randint(0, 30), weight=rng.choice([1e-9, 0.1, 0.3, 1.0, 7.25, 1e9, 1e17]))
+        for _ in range(300)
+    ]
+    compressed=compress_points(points)
+    index=RangeSumIndex(compressed)
+    boxes=[]
+    for _ in range(500):
+        x0, x1=sorted(rng.uniform(-1, 31) for _ in range(2))
+        y0, y1=sorted(rng.uniform(-1, 31) for _ in range(2))
+        boxes.append((x0, x1, y0, y1))
+    sums=index.box_sums(boxes)
+    # Stored merge levels (as registered datasets keep them) give the same sums
+    stored=RangeSumIndex.from_export(RangeSumIndex(compressed).store_levels().export())
+    assert (stored.box_sums(boxes)==sums).all()
+    # The weights span more than WEIGHT_BITS, so they are held rounded to multiples of 2**-scale
+    assert index.limbs<=3
+    held=[math.ldexp(round(math.ldexp(w, index.scale)), -index.scale) for w in compressed.weights]
+    locations=list(zip(compressed.points, held, compressed.weights, compressed.counts))
+    for (x0, x1, y0, y1), row in zip(boxes, sums):
+        # Exact (correctly rounded) sum of the held per-location weights inside
+        inside=[(h, w, c) for p, h, w, c in locations if x0<=p.x<=x1 and y0<=p.y<=y1]
+        assert index.to_weight(row)==math.fsum(h for h, _, _ in inside)
+        assert abs(index.to_weight(row)-math.fsum(w for _, w, _ in inside))<=len(inside)*1e17*2.0**-WEIGHT_BITS
+        assert row[-1]==sum(c for _, _, c in inside)
+    assert index.total_weight==math.fsum(held)
+
+    # Extreme spreads stay bounded instead of widening the index
+    index=RangeSumIndex(compress_points([Point(x=0, y=0, weight=1e9), Point(x=1, y=1, weight=5e-324)]))
+    assert index.limbs<=3
+    assert index.query(-1, 2, -1, 2)==1e9
+
+
+@pytest.mark.parametrize("solver,candidates", [
+    (RectangleSeperator, RectangleSeperator.candidate_rects),
+    (SquareSeperator, SquareSeperator.candidate_squares),
+])
+def test_weighted_solve_matches_brute_force(solver, candidates):
+    rng=random.Random(5)
+    for _ in range(30):
+        red=_random_points(rng, rng.randint(2, 25))
+        blue=[
+            Point(x=p.x, y=p.y, weight=rng.choice([1e-6, 0.1, 1.0, 3.5, 1e9]))
+            for p in _random_points(rng, rng.randint(0, 40))
+        ]
+        seperator=solver(red, blue)
+        compressed=compress_points(blue)
+        locations=list(zip(compressed.points, compressed.weights))
+        best, best_weight=None, float('inf')
+        for pair in candidates(seperator):
+            weight=math.fsum(w for shape in pair for p, w in locations if shape.contains(p))
+            if weight<best_weight:
+                best, best_weight=pair, weight
+        result=seperator.solve()
+        key="rectangles" if solver is RectangleSeperator else "squares"
+        assert result[key]==([s.to_dict() for s in best] if best else [])
+        if best:
+            assert result["blue_weight_covered"]==best_weight
+            assert result["blue_covered"]==sum(shape.contains(p) for shape in best for p in blue)
+
+
+def test_shape_index_interval_path_matches_linear_scan():
+    from backend.algorithm.classify import INTERVAL_INDEX_MIN_SHAPES, ShapeIndex
+    rng=random.Random(11)
+    # Grid coordinates, so points often sit exactly on shape edges
+    shapes=[
+        Rectangle(rng.randint(0, 20)/2, rng.randint(0, 20)/2, rng.randint(0, 8)/2, rng.randint(0, 8)/2)
+        for _ in range(3*INTERVAL_INDEX_MIN_SHAPES)
+    ]
+    x=[rng.randint(-2, 30)/2 for _ in range(2000)]
+    y=[rng.randint(-2, 30)/2 for _ in range(2000)]
+    count=[rng.randint(1, 4) for _ in range(2000)]
+    indexed=ShapeIndex(shapes)
+    linear=ShapeIndex(shapes)
+    linear.use_interval_index=False
+    assert indexed.use_interval_index
+    labels, counts=indexed.classify(x, y, count)
+    expected_labels, expected_counts=linear.classify(x, y, count)
+    assert labels.tolist()==expected_labels.tolist()
+    assert counts.tolist()==expected_counts.tolist()
+    assert (labels>=0).any() and (labels<0).any()
+
+
+def test_shape_index_with_dense_overlap_matches_contains():
+    from backend.algorithm.classify import ShapeIndex
+    rng=random.Random(13)
+    # Wide shapes overlapping on both axes: the slab index would need
+    # about shapes**2 entries, so the overlap path answers instead
+    shapes=[
+        Rectangle(rng.uniform(-10, 0), rng.uniform(-10, 0), rng.uniform(10, 20), rng.uniform(10, 20))
+        for _ in range(400)
+    ]
+    points=[Point(x=rng.uniform(-12, 22), y=rng.uniform(-12, 22)) for _ in range(1500)]
+    count=[rng.randint(1, 4) for _ in points]
+    index=ShapeIndex(shapes)
+    assert not index.use_interval_index
+    labels, counts=index.classify([p.x for p in points], [p.y for p in points], count)
+    expected_labels=[next((k for k, s in enumerate(shapes) if s.contains(p)), -1) for p in points]
+    expected_counts=[sum(c for p, c in zip(points, count) if s.contains(p)) for s in shapes]
+    assert labels.tolist()==expected_labels
+    assert counts.tolist()==expected_counts
+    assert (labels<0).any() and (labels>0).any()
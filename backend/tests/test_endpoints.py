@@ -0,0 +1,594 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.api import routes
+from backend.algorithm.seperators import Point as AlgoPoint
+from backend.utils.imports import LAZY_MODULES
+
+REPO_ROOT=Path(__file__).resolve().parents[2]
+# Cold-start budget for `import backend.app` plus its ASGI lifespan
+# startup, best of a few fresh interpreters
+IMPORT_BUDGET_MS=float(os.environ.get("IMPORT_BUDGET_MS", "1500"))
+
+_PROBE=(
+    "import asyncio, sys, time\n"
+    "async def lifespan(app):\n"
+    "    queue=asyncio.Queue()\n"
+    "    queue.put_nowait({{'type': 'lifespan.startup'}})\n"
+    "    async def send(message):\n"
+    "        if message['type']!='lifespan.startup.complete':\n"
+    "            assert message['type']=='lifespan.shutdown.complete', message\n"
+    "        queue.put_nowait({{'type': 'lifespan.shutdown'}})\n"
+    "    await app({{'type': 'lifespan', 'asgi': {{'version': '3.0', 'spec_version': '2.0'}}, 'state': {{}}}}, queue.get, send)\n"
+    "start=time.perf_counter()\n"
+    "import backend.app\n"
+    "asyncio.run(lifespan(backend.app.app))\n"
+    "elapsed=(time.perf_counter()-start)*1000\n"
+    "print(elapsed)\n"
+    "print(','.join(sorted(m for m in sys.modules if m.split('.')[0] in {mods!r})))\n"
+)
+
+
+def _probe_import():
+    out=subprocess.run(
+        [sys.executable, "-c", _PROBE.format(mods=set(LAZY_MODULES))],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    loaded=out[1].split(",") if len(out)>1 and out[1] else []
+    return float(out[0]), loaded
+
+
+def test_app_import_skips_heavy_modules():
+    _, loaded=_probe_import()
+    assert loaded==[], f"backend.app import or startup loads {loaded}"
+
+
+# Imports backend.app with the given top-level modules hidden
+_HIDDEN_PROBE=(
+    "import sys\n"
+    "hidden=set(sys.argv[1].split(','))\n"
+    "class Hidden:\n"
+    "    def find_spec(self, name, path=None, target=None):\n"
+    "        if name.split('.')[0] in hidden:\n"
+    "            raise ModuleNotFoundError(f'{name} is not installed by requirements.txt', name=name)\n"
+    "sys.meta_path.insert(0, Hidden())\n"
+    "import backend.app\n"
+)
+
+
+def _requirement(spec):
+    match=re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[([^\]]*)\])?", spec)
+    extras={e.strip() for e in (match.group(2) or "").split(",") if e.strip()}
+    return re.sub(r"[-_.]+", "-", match.group(1)).lower(), extras
+
+
+def _required_distributions():
+    """requirements.txt pins plus everything they (with their extras) depend on."""
+    from importlib.metadata import PackageNotFoundError, requires
+    lines=(REPO_ROOT / "requirements.txt").read_bytes().decode("utf-16").splitlines()
+    pending=[_requirement(line) for line in lines if "==" in line]
+    required=set()
+    while pending:
+        name, extras=pending.pop()
+        if name in required:
+            continue
+        required.add(name)
+        try:
+            dependencies=requires(name) or []
+        except PackageNotFoundError:
+            continue
+        for dependency in dependencies:
+            needs=re.findall(r"extra\s*==\s*[\"']([^\"']+)", dependency.partition(";")[2])
+            if not needs or extras.intersection(needs):
+                pending.append(_requirement(dependency))
+    return required
+
+
+def test_app_imports_with_only_pinned_requirements():
+    # Hide every installed module that an install from requirements.txt
+    # would not bring in (e.g. pydantic's optional email-validator)
+    from importlib.metadata import packages_distributions
+    required=_required_distributions()
+    hidden=sorted(
+        module for module, dists in packages_distributions().items()
+        if not any(_requirement(dist)[0] in required for dist in dists)
+    )
+    probe=subprocess.run(
+        [sys.executable, "-c", _HIDDEN_PROBE, ",".join(hidden)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert probe.returncode==0, probe.stderr
+
+
+def test_app_import_time_budget():
+    best=min(_probe_import()[0] for _ in range(3))
+    assert best<=IMPORT_BUDGET_MS, f"backend.app import and startup took {best:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """Local SQLite file standing in for Postgres, with the API's DB mode on."""
+    from backend.database.connection import use_database_url
+    monkeypatch.setattr(routes.settings, "DATABASE_ENABLED", True)
+    use_database_url(f"sqlite:///{tmp_path / 'separator.db'}")
+    yield
+    use_database_url(None)
+
+
+def test_health_reports_pool_metrics(sqlite_db):
+    from backend.database.connection import get_engine
+
+    with get_engine().connect():
+        body=TestClient(app).get("/api/health").json()
+
+    assert body["database_connected"] is True
+    assert body["database"]["backend"]=="sqlite"
+    pool=body["database"]["pool"]
+    assert pool["pool_size"]==routes.settings.DB_POOL_SIZE
+    # Our open connection; the one used for SELECT 1 was already returned
+    assert pool["checked_out"]==1
+    assert pool["checkouts"]>=2
+    assert 0<pool["saturation"]<=1
+
+
+def test_health_without_database():
+    body=TestClient(app).get("/api/health").json()
+    assert body["database_connected"] is False
+    assert body["database"] is None
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    from backend.data import registry as registry_module
+    fresh=registry_module.DatasetRegistry(tmp_path / "datasets", disk_budget_bytes=10**9)
+    monkeypatch.setattr(registry_module, "get_registry", lambda: fresh)
+    return fresh
+
+
+def test_registered_dataset_matches_inline_points(registry, monkeypatch):
+    client=TestClient(app)
+    red=[{"x": float(i % 7), "y": float(i % 5), "weight": 0.25+i % 2} for i in range(30)]
+    blue=[{"x": i/3, "y": (i*7 % 11)/2, "weight": 1+i % 3} for i in range(40)]
+
+    upload=client.post("/api/datasets", json={"points": blue+blue})
+    assert upload.status_code==201
+    info=upload.json()
+    assert info["num_points"]==80 and info["unique_points"]==40 and info["indexed"]
+
+    inline=client.post("/api/compute-separators", json={"red_points": red, "blue_points": blue+blue}).json()
+    by_id=client.post(
+        "/api/compute-separators",
+        json={"red_points": red, "blue_dataset_id": info["dataset_id"]}
+    ).json()
+    for key in ("shapes", "blue_covered", "blue_weight_covered", "total_blue"):
+        assert by_id[key]==inline[key]
+    assert inline["red_weight_covered"]==by_id["red_weight_covered"]==sum(p["weight"] for p in red)
+
+    # Array-backed red points go through the vectorized sweep
+    red_id=client.post("/api/datasets", json={"points": red}).json()["dataset_id"]
+    for algorithm in ("rectangles", "squares"):
+        inline=client.post(
+            "/api/compute-separators",
+            json={"red_points": red, "blue_points": blue+blue, "algorithm": algorithm}
+        ).json()
+        both=client.post(
+            "/api/compute-separators",
+            json={"red_dataset_id": red_id, "blue_dataset_id": info["dataset_id"], "algorithm": algorithm}
+        ).json()
+        for key in ("shapes", "blue_covered", "blue_weight_covered", "red_covered", "red_weight_covered", "total_red", "total_blue"):
+            assert both[key]==inline[key]
+
+    monkeypatch.setattr(routes.settings, "MAX_SOLVE_POINTS", 100)
+    too_large=client.post("/api/compute-separators", json={"red_points": red, "blue_dataset_id": info["dataset_id"]})
+    assert too_large.status_code==400
+
+    missing=client.post("/api/compute-separators", json={"red_points": red, "blue_dataset_id": "0"*32})
+    assert missing.status_code==404
+    heavy=client.post("/api/compute-separators", json={"red_points": red, "blue_points": [{"x": 0, "y": 0, "weight": 2e9}]})
+    assert heavy.status_code==422
+
+
+def test_square_vertical_split_with_single_point_side():
+    # Best split is vertical with one red point on the right: its square must
+    # be clamped to EPS, not a zero-size shape rejected by the response model
+    client=TestClient(app)
+    red=[{"x": 0, "y": 0}, {"x": 0, "y": 2}, {"x": 10, "y": 1}]
+    blue=[{"x": 5, "y": 1.5}]
+    response=client.post("/api/compute-separators", json={"red_points": red, "blue_points": blue, "algorithm": "squares"})
+    assert response.status_code==200, response.text
+    body=response.json()
+    assert body["blue_covered"]==0
+    assert all(s["width"]>0 and s["height"]>0 for s in body["shapes"])
+
+
+def test_registry_evicts_least_recently_used(registry):
+    first=registry.register_points([AlgoPoint(x=i, y=i) for i in range(200)])
+    second=registry.register_points([AlgoPoint(x=i, y=-i) for i in range(200)])
+    registry.load(first["dataset_id"])
+    # Room for one dataset only: the least recently used one goes
+    os.utime(registry.root / second["dataset_id"], (0, 0))
+    registry.disk_budget_bytes=first["size_bytes"]
+    assert registry.evict()==[second["dataset_id"]]
+    assert [d["dataset_id"] for d in registry.list()]==[first["dataset_id"]]
+
+
+def test_import_accumulator_merges_geometrically(monkeypatch):
+    import math
+    import numpy as np
+    from backend.data import importer
+    monkeypatch.setattr(importer, "CONSOLIDATE_ROWS", 10_000)
+    merges=[]
+    consolidate=importer.PointAccumulator._consolidate
+    monkeypatch.setattr(importer.PointAccumulator, "_consolidate", lambda self: (merges.append(1), consolidate(self)))
+    accumulator=importer.PointAccumulator()
+    rows, chunk=2_000_000, 20_000
+    for start in range(0, rows, chunk):
+        # Every row is a new location, so the aggregate keeps growing
+        x=np.arange(start, start+chunk, dtype=np.float64)
+        accumulator.add(x, -x, np.ones(chunk))
+    arrays=accumulator.arrays()
+    assert len(arrays["x"])==rows and int(arrays["count"].sum())==rows
+    assert len(merges)<=math.log2(rows/10_000)+2
+
+
+def test_import_csv_and_parquet_register_labelled_datasets(registry, monkeypatch):
+    import io
+    import pandas as pd
+    monkeypatch.setattr(routes.settings, "IMPORT_CHUNK_ROWS", 7)
+    client=TestClient(app)
+    frame=pd.DataFrame({
+        "px": [i % 6 for i in range(40)]+["bad"],
+        "py": [i % 4 for i in range(40)]+[1],
+        "kind": ["RED" if i % 3 else "blue" for i in range(40)]+["red"],
+        "cost": [1+i % 2 for i in range(40)]+[1],
+    })
+    form={"x_column": "px", "y_column": "py", "label_column": "kind", "weight_column": "cost"}
+    uploads=[("points.csv", frame.to_csv(index=False).encode())]
+    try:
+        buffer=io.BytesIO()
+        frame.astype({"px": str}).to_parquet(buffer)
+        uploads.append(("points.parquet", buffer.getvalue()))
+    except ImportError:
+        pass
+
+    for filename, content in uploads:
+        response=client.post("/api/datasets/import", data=form, files={"file": (filename, content)})
+        assert response.status_code==201, response.text
+        body=response.json()
+        assert body["rows_read"]==41 and body["rows_skipped"]==1
+        red, blue=body["datasets"]["red"], body["datasets"]["blue"]
+        assert red["num_points"]+blue["num_points"]==40
+        assert blue["total_weight"]==sum(1+i % 2 for i in range(0, 40, 3))
+
+    bad=client.post("/api/datasets/import", data={"x_column": "nope"}, files={"file": ("p.csv", b"x,y\n1,2\n")})
+    assert bad.status_code==400
+
+
+
+def test_classify_inline_and_streamed_points_agree(monkeypatch):
+    import json
+    from backend.algorithm.seperators import Rectangle
+    monkeypatch.setattr(routes.settings, "CLASSIFY_STREAM_BATCH", 25)
+    client=TestClient(app)
+    shapes=[{"x": 0, "y": 0, "width": 2, "height": 2}, {"x": 2, "y": 1, "width": 3, "height": 3}]
+    rects=[Rectangle(**s) for s in shapes]
+    points=[{"x": float(i % 7), "y": float(i % 5)} for i in range(60)]
+    expected=[]
+    for pt in points:
+        inside=[k for k, r in enumerate(rects) if r.contains(AlgoPoint(**pt))]
+        expected.append(inside[0] if inside else -1)
+
+    body=client.post("/api/classify", json={"shapes": shapes, "points": points}).json()
+    assert body["labels"]==expected
+    assert body["counts"]==[sum(r.contains(AlgoPoint(**pt)) for pt in points) for r in rects]
+    assert body["outside"]==expected.count(-1)
+
+    lines=[json.dumps({"shapes": shapes})]+[f"{pt['x']},{pt['y']}" for pt in points]
+    response=client.post("/api/classify/stream", content="\n".join(lines).encode())
+    out=[json.loads(line) for line in response.text.splitlines()]
+    assert [len(line["labels"]) for line in out[:-1]]==[25, 25, 10]
+    assert sum((line["labels"] for line in out[:-1]), [])==expected
+    assert out[-1]=={"counts": body["counts"], "total_points": 60, "outside": body["outside"]}
+
+    assert client.post("/api/classify/stream", content=b"1,2\n").status_code==400
+    bad=client.post("/api/classify/stream", content=lines[0].encode()+b"\n1,2\nfoo\n")
+    assert "error" in json.loads(bad.text.splitlines()[-1])
+
+    # Lines are capped, header included, so a body without newlines is not buffered whole
+    monkeypatch.setattr(routes.settings, "CLASSIFY_MAX_LINE_BYTES", 200)
+    assert client.post("/api/classify/stream", content=b"x"*1000).status_code==413
+    long=client.post("/api/classify/stream", content=lines[0].encode()+b"\n1,2\n"+b"1"*1000)
+    assert "error" in json.loads(long.text.splitlines()[-1])
+
+    monkeypatch.setattr(routes.settings, "MAX_CLASSIFY_SHAPES", 1)
+    assert client.post("/api/classify", json={"shapes": shapes, "points": points}).status_code==400
+    assert client.post("/api/classify/stream", content=lines[0].encode()+b"\n1,2\n").status_code==400
+
+
+def test_body_streaming_response_stops_on_disconnect_and_runs_background():
+    import asyncio
+    import anyio
+    from starlette.background import BackgroundTask
+    from backend.routers.classification import BodyStreamingResponse
+    done, sent=[], []
+
+    async def scenario():
+        body_read=anyio.Event()
+
+        async def content():
+            yield "first\n"
+            body_read.set()
+            await anyio.sleep(30) # only a disconnect ends this stream early
+            yield "second\n"
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        response=BodyStreamingResponse(content(), body_read=body_read, background=BackgroundTask(done.append, True))
+        with anyio.fail_after(5):
+            await response({"type": "http", "asgi": {"spec_version": "2.3"}}, receive, send)
+
+    asyncio.run(scenario())
+    assert [m.get("body") for m in sent if m["type"]=="http.response.body"]==[b"first\n"]
+    assert done==[True]
+
+
+def test_tiles_aggregate_all_points_at_every_zoom(registry):
+    client=TestClient(app)
+    red=[{"x": float(i % 10), "y": float(i % 4)} for i in range(50)]
+    blue=[{"x": i/2, "y": (i*3 % 17)/2, "weight": 2} for i in range(90)]
+    shapes=[{"x": 0, "y": 0, "width": 1, "height": 1}]
+    created=client.post("/api/tiles", json={"red_points": red, "blue_points": blue, "shapes": shapes})
+    assert created.status_code==201, created.text
+    info=created.json()
+    assert info["total_red"]==50 and info["total_blue"]==90
+    assert client.get(f"/api/tiles/{info['tileset_id']}").json()==info
+
+    for z in (0, 2):
+        tiles=[
+            client.get(f"/api/tiles/{info['tileset_id']}/{z}/{tx}/{ty}").json()
+            for tx in range(2**z) for ty in range(2**z)
+        ]
+        assert sum(t["red"]["total"] for t in tiles)==50
+        assert sum(sum(t["blue"]["weight"]) for t in tiles)==180
+        assert all(len(t["blue"]["x"])<=info["tile_bins"]**2 for t in tiles)
+    top=client.get(f"/api/tiles/{info['tileset_id']}/0/0/0")
+    assert top.headers["cache-control"].startswith("public")
+    assert top.json()["shapes"]==[{"x": 0, "y": 0, "width": 1, "height": 1}]
+    assert client.get(f"/api/tiles/{info['tileset_id']}/2/0/0").json()["shapes"]!=[]
+    assert client.get(f"/api/tiles/{info['tileset_id']}/2/3/3").json()["shapes"]==[]
+    assert client.get(f"/api/tiles/{info['tileset_id']}/1/2/0").status_code==404
+    assert client.get(f"/api/tiles/{'0'*32}/0/0/0").status_code==404
+
+    # Finest zoom reads single points straight from the mapped dataset
+    z=info["max_zoom"]
+    step=info["size"]/2**z
+    tx, ty=int((7.5-info["origin_x"])/step), int((5.5-info["origin_y"])/step)
+    fine=client.get(f"/api/tiles/{info['tileset_id']}/{z}/{tx}/{ty}").json()["blue"]
+    assert list(zip(fine["x"], fine["y"], fine["weight"]))==[(7.5, 5.5, 2.0)]
+
+    # The tileset pins its datasets: deleting them is refused, and eviction
+    # must take the tileset (pyramid files included) before them
+    assert client.delete(f"/api/datasets/{info['blue_dataset_id']}").status_code==409
+    pyramid_bytes=sum(f.stat().st_size for f in (registry.root / ".tilesets").rglob("*") if f.is_file())
+    dataset_bytes=sum(d["size_bytes"] for d in registry.list())
+    assert registry.disk_usage()==pyramid_bytes+dataset_bytes
+    registry.disk_budget_bytes=registry.disk_usage()
+    assert registry.evict()==[]
+    assert client.get(f"/api/tiles/{info['tileset_id']}/2/1/1").status_code==200
+
+    # Deleting the tileset releases the pins
+    assert client.delete(f"/api/tiles/{info['tileset_id']}").status_code==204
+    assert client.get(f"/api/tiles/{info['tileset_id']}/0/0/0").status_code==404
+    assert client.delete(f"/api/tiles/{info['tileset_id']}").status_code==404
+    assert not (registry.root / ".tilesets" / info["tileset_id"]).exists()
+    assert client.delete(f"/api/datasets/{info['blue_dataset_id']}").status_code==204
+
+
+def test_tilesets_are_evicted_least_recently_used(registry):
+    client=TestClient(app)
+    tilesets=[]
+    for k in range(2):
+        points=[{"x": float(i), "y": float((i*k) % 7)} for i in range(200)]
+        info=client.post("/api/tiles", json={"red_points": points}).json()
+        assert client.get(f"/api/tiles/{info['tileset_id']}/3/0/0").status_code==200
+        tilesets.append(info)
+    old, recent=tilesets
+    os.utime(registry.root / ".tilesets" / f"{old['tileset_id']}.json", (0, 0))
+    for info in tilesets:
+        os.utime(registry.root / info["red_dataset_id"], (1, 1))
+    # Room for the recent tileset only: the old one goes, then the dataset it pinned
+    sizes={name: size for _, name, size, _ in registry.disk_entries()}
+    registry.disk_budget_bytes=sizes[recent["tileset_id"]]+sizes[recent["red_dataset_id"]]
+    assert registry.evict()==[old["tileset_id"], old["red_dataset_id"]]
+    assert client.get(f"/api/tiles/{old['tileset_id']}").status_code==404
+    assert client.get(f"/api/tiles/{recent['tileset_id']}/3/0/0").status_code==200
+
+    # Pyramid levels written by later tile requests count against the budget too
+    registry.disk_budget_bytes=10**9
+    spare=registry.register_points([AlgoPoint(x=i, y=-i) for i in range(40)])
+    os.utime(registry.root / spare["dataset_id"], (0, 0))
+    registry.disk_budget_bytes=registry.disk_usage()
+    # 200 x values in 64 bins: zoom 0 merges points into a new level file
+    assert client.get(f"/api/tiles/{recent['tileset_id']}/0/0/0").status_code==200
+    assert [d["dataset_id"] for d in registry.list()]==[recent["red_dataset_id"]]
+
+
+def test_auth_login_and_cached_current_user(sqlite_db, monkeypatch):
+    from datetime import timedelta
+    from backend.auth import dependencies
+    from backend.auth.jwt_handler import create_access_token, token_cache
+    from backend.database.connection import init_db
+    init_db()
+    dependencies.user_cache.clear()
+    token_cache.clear()
+    client=TestClient(app)
+
+    user={"username": "alice", "email": "alice@example.com", "password": "correct horse"}
+    assert client.post("/api/auth/register", json=user).status_code==201
+    assert client.post("/api/auth/register", json=user).status_code==400
+    assert client.post("/api/auth/login", data={"username": "alice", "password": "wrong pass"}).status_code==401
+    assert client.post("/api/auth/login", data={"username": "nobody", "password": "wrong pass"}).status_code==401
+    login=client.post("/api/auth/login", data={"username": "alice", "password": "correct horse"})
+    assert login.status_code==200
+    headers={"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    # Login warmed the user cache: authenticated requests skip the database
+    def no_db(username):
+        raise AssertionError("user lookup should be cached")
+    monkeypatch.setattr(dependencies, "load_user_sync", no_db)
+    for _ in range(3):
+        me=client.get("/api/auth/me", headers=headers)
+        assert me.status_code==200 and me.json()["username"]=="alice"
+    assert token_cache.hits==2 and token_cache.misses==1
+
+    # Claims for another user under alice's signature
+    header, _, signature=login.json()["access_token"].split(".")
+    forged=create_access_token("mallory").split(".")[1]
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {header}.{forged}.{signature}"}).status_code==401
+    expired=create_access_token("alice", expires_delta=timedelta(seconds=-1))
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {expired}"}).status_code==401
+    assert client.get("/api/auth/me").status_code==401
+
+
+def test_auth_requires_database():
+    response=TestClient(app).get("/api/auth/me", headers={"Authorization": "Bearer x"})
+    assert response.status_code==503
+
+
+def test_loadtest_boots_app_and_checks_slo(tmp_path):
+    import json
+    from backend.loadtest.runner import DEFAULT_SLO_FILE, EXIT_OK, check_slo, host_info, main
+    slo=tmp_path/"slo.json"
+    slo.write_text(json.dumps({"default": {"min_rps": 1, "max_error_rate": 0.5, "max_server_loop_lag_p99_ms": 10_000}}))
+    report=tmp_path/"report.json"
+    baseline=tmp_path/"baseline.json"
+    argv=[
+        "--duration", "1", "--warmup", "0", "--concurrency", "2", "--sizes", "20", "--algorithms", "rectangles",
+        "--slo", str(slo), "--report", str(report), "--record-baseline", str(baseline)
+    ]
+    assert main(argv)==EXIT_OK
+
+    stage=json.loads(report.read_text())["stages"][0]
+    assert stage["requests"]>0 and stage["latency_ms"]["samples"]>0
+    assert stage["server_loop_lag_ms"]["samples"]>0
+    assert check_slo(stage, {"default": {}})==[]
+    violations=check_slo(stage, {"default": {"min_rps": 1e9}, "stages": {"2": {"max_p99_ms": 0}}})
+    assert len(violations)==2
+
+    # Ratio limits scale the recorded baseline, which names its host
+    recorded=json.loads(baseline.read_text())
+    assert recorded["host"]==host_info() and recorded["stages"]["2"]["rps"]>0
+    relative={"default": {"min_rps_ratio": 0.5, "max_p99_ratio": 4.0, "slack_ms": 1000}}
+    assert check_slo(stage, relative, recorded)==[]
+    assert len(check_slo(stage, {"default": {"min_rps_ratio": 2.0, "max_p50_ratio": 0.0}}, recorded))==2
+    # ... and do not apply without a baseline for the stage
+    assert check_slo(stage, {"default": {"min_rps_ratio": 2.0}}, {"stages": {}})==[]
+
+    # The shipped SLO tolerates rare errors under load, none at c=1
+    shipped=json.loads(DEFAULT_SLO_FILE.read_text())
+    assert (DEFAULT_SLO_FILE.parent/shipped["baseline"]).exists()
+    erring={**stage, "error_rate": 0.0005, "client_loop_lag_ms": {"p99": 0.0}}
+    assert check_slo({**erring, "concurrency": 8}, shipped)==[]
+    assert len(check_slo({**erring, "concurrency": 1}, shipped))==1
+
+
+def test_server_workers_and_cpu_assignment(monkeypatch):
+    from backend import server
+    monkeypatch.setattr(server.settings, "WORKERS", 3)
+    assert server.worker_count()==3
+    monkeypatch.setattr(server.settings, "WORKERS", 0)
+    assert server.worker_count()==len(server.available_cpus())
+
+    monkeypatch.setattr(server.settings, "WORKER_MAX_REQUESTS", 500)
+    monkeypatch.setattr(server, "available_cpus", lambda: [2, 5, 7])
+    options=server.gunicorn_options()
+    assert options["max_requests"]==500 and options["preload_app"]
+    # Warmup runs once in the master before workers fork, never on app startup
+    warmed=[]
+    monkeypatch.setattr(server.settings, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(server, "warmup_solvers", lambda: warmed.append(True))
+    options["when_ready"](None)
+    assert warmed==[True]
+
+    # Recycle workers repeatedly: replacements take the freed core
+    workers=[type("Worker", (), {})() for _ in range(3)]
+    for w in workers:
+        options["pre_fork"](None, w)
+    assert [w.cpu for w in workers]==[2, 5, 7]
+    for _ in range(10):
+        old=workers.pop(1)
+        options["child_exit"](None, old)
+        new=type("Worker", (), {})()
+        options["pre_fork"](None, new)
+        workers.insert(1, new)
+        assert sorted(w.cpu for w in workers)==[2, 5, 7]
+
+    pinned=[]
+    monkeypatch.setattr(server.os, "sched_setaffinity", lambda pid, cpus: pinned.append(cpus), raising=False)
+    monkeypatch.setattr(server.settings, "CPU_AFFINITY", True)
+    options["post_fork"](None, workers[1])
+    monkeypatch.setattr(server.settings, "CPU_AFFINITY", False)
+    server.pin_worker(7)
+    assert pinned==[{5}]
+
+
+def test_solve_pool_is_shared_per_host_and_unpinned(monkeypatch):
+    from backend import server
+    from backend.algorithm import parallel
+    monkeypatch.setattr(server.settings, "WORKERS", 3)
+    for total, share in ((0, 0), (2, 1), (8, 2)):
+        monkeypatch.setattr(server.settings, "PARALLEL_SOLVE_WORKERS", total)
+        assert server.solve_workers_per_worker()==share
+
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    # A worker pinned to one core must not pin its pool processes with it
+    allowed=os.sched_getaffinity(0)
+    os.sched_setaffinity(0, {min(allowed)})
+    try:
+        parallel.shutdown_executor()
+        pool_cpus=parallel.get_executor(1).submit(os.sched_getaffinity, 0).result()
+    finally:
+        os.sched_setaffinity(0, allowed)
+        parallel.shutdown_executor()
+    assert pool_cpus>=allowed
+
+
+def test_async_engine_pool_metrics(sqlite_db):
+    import asyncio
+    from sqlalchemy import text
+    from backend.database.connection import get_async_engine, get_async_sessionmaker, pool_metrics
+
+    async def run_queries():
+        async with get_async_sessionmaker()() as db:
+            assert (await db.execute(text("SELECT 1"))).scalar()==1
+        async with get_async_engine().connect() as conn:
+            before=pool_metrics(get_async_engine())
+            assert before["checked_out"]==1
+        await get_async_engine().dispose()
+        async with get_async_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    asyncio.run(run_queries())
+    pool=pool_metrics(get_async_engine())
+    # Counters survive dispose() and each event is counted once
+    assert pool["checkouts"]==3 and pool["checkins"]==3
+    assert pool["connections_opened"]==2
+    assert pool["checked_out"]==0 and pool["timeouts"]==0
+    assert pool["max_overflow"]==routes.settings.DB_MAX_OVERFLOW
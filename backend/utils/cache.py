@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    ``set`` accepts a per-entry ``ttl`` so that callers can expire an entry
+    earlier than the default, e.g. a token that expires in ten seconds.
+    """
+
+    def __init__(self, maxsize:int, ttl:float):
+        self.maxsize=maxsize
+        self.ttl=ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]"=OrderedDict()
+        self._lock=Lock()
+        self.hits=0
+        self.misses=0
+
+    def get(self, key:Hashable, default:Any=None)->Any:
+        now=time.monotonic()
+        with self._lock:
+            entry=self._data.get(key)
+            if entry is None or entry[0]<=now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses+=1
+                return default
+            self._data.move_to_end(key)
+            self.hits+=1
+            return entry[1]
+
+    def set(self, key:Hashable, value:Any, ttl:Optional[float]=None)->None:
+        ttl=self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl<=0 or self.maxsize<=0:
+            return
+        with self._lock:
+            self._data[key]=(time.monotonic()+ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data)>self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key:Hashable)->None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self)->None:
+        with self._lock:
+            self._data.clear()
+            self.hits=self.misses=0
+
+    def __len__(self)->int:
+        return len(self._data)
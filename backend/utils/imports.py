@@ -0,0 +1,16 @@
+import importlib
+from types import ModuleType
+
+# Heavy optional dependencies that must never be imported by `import backend.app`;
+# backend/tests/test_endpoints.py enforces this together with the import-time budget
+LAZY_MODULES=("numpy", "pandas", "pyarrow", "sqlalchemy", "uvicorn", "gunicorn")
+
+
+def lazy_import(module_name:str, feature:str)->ModuleType:
+    """Import ``module_name`` on first use, with a readable error if it is missing."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise RuntimeError(
+            f"{feature} requires the optional dependency '{module_name}'"
+        ) from e
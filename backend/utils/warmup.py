@@ -0,0 +1,30 @@
+import logging
+import random
+import time
+
+from backend.algorithm.seperators import (
+    Point,
+    RectangleSeperator,
+    SquareSeperator
+)
+
+logger=logging.getLogger(__name__)
+
+# Small enough to finish in a few ms, large enough to touch every code path
+WARMUP_RED_POINTS=200
+WARMUP_BLUE_POINTS=200
+
+
+def warmup_solvers(seed:int=0)->float:
+    """Run one throwaway solve per algorithm so the first real request
+    does not pay for lazy imports, pydantic schema builds and cold caches.
+    Returns the time spent in milliseconds."""
+    rng=random.Random(seed)
+    red=[Point(x=rng.uniform(0,100), y=rng.uniform(0,100)) for _ in range(WARMUP_RED_POINTS)]
+    blue=[Point(x=rng.uniform(0,100), y=rng.uniform(0,100)) for _ in range(WARMUP_BLUE_POINTS)]
+    start=time.perf_counter()
+    RectangleSeperator(red, blue).solve()
+    SquareSeperator(red, blue).solve()
+    elapsed=(time.perf_counter()-start)*1000
+    logger.info(f"Solver warmup finished in {elapsed:.2f} ms")
+    return elapsed
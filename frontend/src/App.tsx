@@ -8,6 +8,7 @@ import type {
   AlgorithmType,
   ComputeResponse,
   HealthResponse,
+  TilesetInfo,
 } from './types';
 import './App.css';
 
@@ -19,12 +20,25 @@ function App() {
   const [isComputing, setIsComputing] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [apiHealth, setApiHealth] = useState<HealthResponse | null>(null);
+  const [tileset, setTileset] = useState<TilesetInfo | null>(null);
 
   // Check API health on mount
   useEffect(() => {
     checkAPIHealth();
+    loadTilesetFromURL();
   }, []);
 
+  // ?tileset=<id> explores a large (server-side) instance through its tiles
+  const loadTilesetFromURL = async (): Promise<void> => {
+    const tilesetId = new URLSearchParams(window.location.search).get('tileset');
+    if (!tilesetId) return;
+    try {
+      setTileset(await separatorAPI.getTileset(tilesetId));
+    } catch (err) {
+      setError((err as Error).message);
+    }
+  };
+
   const checkAPIHealth = async (): Promise<void> => {
     try {
       const health = await separatorAPI.getHealth();
@@ -62,6 +76,8 @@ function App() {
     setBluePoints([]);
     setResult(null);
     setError(null);
+    setTileset(null);
+    window.history.replaceState(null, '', window.location.pathname);
   };
 
   const handleGenerateRandom = (): void => {
@@ -121,6 +137,28 @@ function App() {
     }
   };
 
+  // Hand the current points and result shapes to the server as a tileset;
+  // the ?tileset=<id> URL reopens it later
+  const handleExploreTiles = async (): Promise<void> => {
+    setIsComputing(true);
+    setError(null);
+
+    try {
+      const info = await separatorAPI.createTileset({
+        red_points: redPoints,
+        blue_points: bluePoints,
+        shapes: result?.shapes || [],
+      });
+      setTileset(info);
+      window.history.replaceState(null, '', `?tileset=${info.tileset_id}`);
+    } catch (err) {
+      setError((err as Error).message);
+      console.error('Tileset Error:', err);
+    } finally {
+      setIsComputing(false);
+    }
+  };
+
   return (
     <div className="app">
 
@@ -148,6 +186,7 @@ function App() {
             onCompute={handleCompute}
             onClear={handleClear}
             onGenerateRandom={handleGenerateRandom}
+            onExploreTiles={handleExploreTiles}
             isComputing={isComputing}
             redCount={redPoints.length}
             blueCount={bluePoints.length}
@@ -172,6 +211,7 @@ function App() {
               bluePoints={bluePoints}
               shapes={result?.shapes || []}
               onCanvasClick={handleCanvasClick}
+              tileset={tileset}
             />
           </div>
         </main>
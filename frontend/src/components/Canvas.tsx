@@ -1,28 +1,227 @@
-import React, { useRef, useEffect } from 'react';
-import type { Point, Shape } from '../types';
+import React, { useRef, useEffect, useState } from 'react';
+import type { Point, Shape, Tile, TileLayer, TilesetInfo } from '../types';
+import { separatorAPI } from '../services/api';
 
 interface CanvasProps {
   redPoints: Point[];
   bluePoints: Point[];
   shapes: Shape[];
   onCanvasClick: (x: number, y: number, isShiftPressed: boolean) => void;
+  // Large instances: draw the visible tiles of this tileset instead of points
+  tileset?: TilesetInfo | null;
   width?: number;
   height?: number;
 }
 
+// Tiled mode: on-screen size a tile aims for, which picks the zoom level
+const TILE_SCREEN_SIZE = 256;
+// Tiles kept in memory; the oldest are dropped first
+const TILE_CACHE_SIZE = 512;
+
+interface View {
+  scale: number; // canvas pixels per world unit
+  left: number; // world x at the left edge of the canvas
+  top: number; // world y at the top edge of the canvas
+}
+
+const tileKey = (z: number, x: number, y: number): string => `${z}/${x}/${y}`;
+
+// Zoom level and tile coordinates covering the view
+const visibleTiles = (
+  view: View,
+  tileset: TilesetInfo,
+  width: number,
+  height: number
+): { z: number; tiles: [number, number][] } => {
+  const z = Math.min(
+    tileset.max_zoom,
+    Math.max(0, Math.ceil(Math.log2((tileset.size * view.scale) / TILE_SCREEN_SIZE)))
+  );
+  const count = 2 ** z;
+  const tileSize = tileset.size / count;
+  const index = (value: number, origin: number): number =>
+    Math.min(count - 1, Math.max(0, Math.floor((value - origin) / tileSize)));
+
+  const x0 = index(view.left, tileset.origin_x);
+  const x1 = index(view.left + width / view.scale, tileset.origin_x);
+  const y0 = index(view.top, tileset.origin_y);
+  const y1 = index(view.top + height / view.scale, tileset.origin_y);
+  const tiles: [number, number][] = [];
+  for (let x = x0; x <= x1; x++) {
+    for (let y = y0; y <= y1; y++) {
+      tiles.push([x, y]);
+    }
+  }
+  return { z, tiles };
+};
+
 const Canvas: React.FC<CanvasProps> = ({
   redPoints,
   bluePoints,
   shapes,
   onCanvasClick,
+  tileset = null,
   width = 800,
   height = 600,
 }) => {
   const canvasRef = useRef<HTMLCanvasElement>(null);
+  const [view, setView] = useState<View | null>(null);
+  const [tileVersion, setTileVersion] = useState(0);
+  const tileCache = useRef(new Map<string, Tile>());
+  const pendingTiles = useRef(new Map<string, AbortController>());
+  const dragStart = useRef<{ clientX: number; clientY: number; view: View } | null>(null);
 
   useEffect(() => {
     drawCanvas();
-  }, [redPoints, bluePoints, shapes]);
+  }, [redPoints, bluePoints, shapes, tileset, view, tileVersion]);
+
+  // New tileset: forget its predecessor's tiles and fit its bounds
+  useEffect(() => {
+    tileCache.current.clear();
+    pendingTiles.current.forEach((controller) => controller.abort());
+    pendingTiles.current.clear();
+    if (!tileset) {
+      setView(null);
+      return;
+    }
+    const [minX, minY, maxX, maxY] = tileset.bounds;
+    const spanX = maxX - minX || tileset.size;
+    const spanY = maxY - minY || tileset.size;
+    const scale = 0.95 * Math.min(width / spanX, height / spanY);
+    setView({
+      scale,
+      left: (minX + maxX) / 2 - width / (2 * scale),
+      top: (minY + maxY) / 2 - height / (2 * scale),
+    });
+  }, [tileset, width, height]);
+
+  // Fetch only the tiles in view; cancel the ones that scrolled out of it
+  useEffect(() => {
+    if (!tileset || !view) return;
+    const { z, tiles } = visibleTiles(view, tileset, width, height);
+    const wanted = new Set(tiles.map(([x, y]) => tileKey(z, x, y)));
+
+    pendingTiles.current.forEach((controller, key) => {
+      if (!wanted.has(key)) {
+        controller.abort();
+        pendingTiles.current.delete(key);
+      }
+    });
+
+    tiles.forEach(([x, y]) => {
+      const key = tileKey(z, x, y);
+      if (tileCache.current.has(key) || pendingTiles.current.has(key)) return;
+      const controller = new AbortController();
+      pendingTiles.current.set(key, controller);
+      separatorAPI
+        .getTile(tileset.tileset_id, z, x, y, controller.signal)
+        .then((tile) => {
+          const cache = tileCache.current;
+          cache.set(key, tile);
+          while (cache.size > TILE_CACHE_SIZE) {
+            cache.delete(cache.keys().next().value as string);
+          }
+          setTileVersion((version) => version + 1);
+        })
+        .catch(() => {
+          // Cancelled or failed; it is requested again when back in view
+        })
+        .finally(() => {
+          if (pendingTiles.current.get(key) === controller) {
+            pendingTiles.current.delete(key);
+          }
+        });
+    });
+  }, [tileset, view, width, height]);
+
+  // Wheel zoom around the cursor; a native listener so the page does not scroll
+  useEffect(() => {
+    const canvas = canvasRef.current;
+    if (!canvas || !tileset) return;
+
+    const handleWheel = (e: WheelEvent): void => {
+      e.preventDefault();
+      const rect = canvas.getBoundingClientRect();
+      const cx = e.clientX - rect.left;
+      const cy = e.clientY - rect.top;
+      const factor = Math.exp(-e.deltaY * 0.0015);
+      setView((current) => {
+        if (!current) return current;
+        const scale = current.scale * factor;
+        return {
+          scale,
+          left: current.left + cx / current.scale - cx / scale,
+          top: current.top + cy / current.scale - cy / scale,
+        };
+      });
+    };
+    canvas.addEventListener('wheel', handleWheel, { passive: false });
+    return () => canvas.removeEventListener('wheel', handleWheel);
+  }, [tileset]);
+
+  // Closest loaded tile covering (z, x, y): the tile itself or an ancestor
+  const findTile = (z: number, x: number, y: number): Tile | undefined => {
+    for (let level = z; level >= 0; level--) {
+      const shift = z - level;
+      const tile = tileCache.current.get(tileKey(level, x >> shift, y >> shift));
+      if (tile) return tile;
+    }
+    return undefined;
+  };
+
+  const drawLayers = (
+    ctx: CanvasRenderingContext2D,
+    currentView: View,
+    layers: TileLayer[],
+    color: string
+  ): void => {
+    // One path per colour; bins with more points get bigger dots
+    ctx.fillStyle = color;
+    ctx.beginPath();
+    layers.forEach((layer) => {
+      for (let i = 0; i < layer.x.length; i++) {
+        const sx = (layer.x[i] - currentView.left) * currentView.scale;
+        const sy = (layer.y[i] - currentView.top) * currentView.scale;
+        if (sx < -10 || sy < -10 || sx > width + 10 || sy > height + 10) continue;
+        const radius = Math.min(8, 2 + Math.log2(layer.count[i]));
+        ctx.moveTo(sx + radius, sy);
+        ctx.arc(sx, sy, radius, 0, 2 * Math.PI);
+      }
+    });
+    ctx.fill();
+  };
+
+  const drawTiles = (ctx: CanvasRenderingContext2D, currentView: View, currentTileset: TilesetInfo): void => {
+    const { z, tiles } = visibleTiles(currentView, currentTileset, width, height);
+    const drawn = new Set<Tile>();
+    tiles.forEach(([x, y]) => {
+      const tile = findTile(z, x, y);
+      if (tile) drawn.add(tile);
+    });
+
+    // Shape overlays, once even when several tiles intersect them
+    const seen = new Set<string>();
+    ctx.fillStyle = 'rgba(139, 92, 246, 0.15)';
+    ctx.strokeStyle = '#8b5cf6';
+    ctx.lineWidth = 2;
+    drawn.forEach((tile) => {
+      tile.shapes.forEach((shape) => {
+        const key = `${shape.x},${shape.y},${shape.width},${shape.height}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+        const sx = (shape.x - currentView.left) * currentView.scale;
+        const sy = (shape.y - currentView.top) * currentView.scale;
+        const sw = shape.width * currentView.scale;
+        const sh = shape.height * currentView.scale;
+        ctx.fillRect(sx, sy, sw, sh);
+        ctx.strokeRect(sx, sy, sw, sh);
+      });
+    });
+
+    const loaded = Array.from(drawn);
+    drawLayers(ctx, currentView, loaded.map((tile) => tile.blue), 'rgba(59, 130, 246, 0.8)');
+    drawLayers(ctx, currentView, loaded.map((tile) => tile.red), 'rgba(239, 68, 68, 0.8)');
+  };
 
   const drawCanvas = (): void => {
     const canvas = canvasRef.current;
@@ -49,6 +248,11 @@ const Canvas: React.FC<CanvasProps> = ({
       ctx.stroke();
     }
 
+    if (tileset) {
+      if (view) drawTiles(ctx, view, tileset);
+      return;
+    }
+
     // Draw shapes (rectangles/squares)
     if (shapes && shapes.length > 0) {
       ctx.fillStyle = 'rgba(139, 92, 246, 0.15)';
@@ -90,7 +294,8 @@ const Canvas: React.FC<CanvasProps> = ({
 
   const handleClick = (e: React.MouseEvent<HTMLCanvasElement>): void => {
     const canvas = canvasRef.current;
-    if (!canvas) return;
+    // Tiled mode is for exploring; points are only added in point mode
+    if (!canvas || tileset) return;
 
     const rect = canvas.getBoundingClientRect();
     const x = e.clientX - rect.left;
@@ -98,16 +303,39 @@ const Canvas: React.FC<CanvasProps> = ({
     onCanvasClick(x, y, e.shiftKey);
   };
 
+  const handleMouseDown = (e: React.MouseEvent<HTMLCanvasElement>): void => {
+    if (!tileset || !view) return;
+    dragStart.current = { clientX: e.clientX, clientY: e.clientY, view };
+  };
+
+  const handleMouseMove = (e: React.MouseEvent<HTMLCanvasElement>): void => {
+    const start = dragStart.current;
+    if (!start) return;
+    setView({
+      scale: start.view.scale,
+      left: start.view.left - (e.clientX - start.clientX) / start.view.scale,
+      top: start.view.top - (e.clientY - start.clientY) / start.view.scale,
+    });
+  };
+
+  const handleMouseUp = (): void => {
+    dragStart.current = null;
+  };
+
   return (
     <canvas
       ref={canvasRef}
       width={width}
       height={height}
       onClick={handleClick}
+      onMouseDown={handleMouseDown}
+      onMouseMove={handleMouseMove}
+      onMouseUp={handleMouseUp}
+      onMouseLeave={handleMouseUp}
       style={{
         border: '2px solid #ccc',
         borderRadius: '8px',
-        cursor: 'crosshair',
+        cursor: tileset ? 'grab' : 'crosshair',
         backgroundColor: '#ffffff',
         boxShadow: '0 4px 6px rgba(0, 0, 0, 0.1)',
       }}
@@ -8,6 +8,7 @@ interface ControlPanelProps {
   onCompute: () => void;
   onClear: () => void;
   onGenerateRandom: () => void;
+  onExploreTiles: () => void;
   isComputing: boolean;
   redCount: number;
   blueCount: number;
@@ -19,6 +20,7 @@ const ControlPanel: React.FC<ControlPanelProps> = ({
   onCompute,
   onClear,
   onGenerateRandom,
+  onExploreTiles,
   isComputing,
   redCount,
   blueCount,
@@ -59,6 +61,14 @@ const ControlPanel: React.FC<ControlPanelProps> = ({
           🎲 Random Points
         </button>
 
+        <button
+          className="btn btn-secondary"
+          onClick={onExploreTiles}
+          disabled={isComputing || redCount + blueCount === 0}
+        >
+          🗺️ Explore as Tiles
+        </button>
+
         <button className="btn btn-danger" onClick={onClear} disabled={isComputing}>
           🗑️ Clear All
         </button>
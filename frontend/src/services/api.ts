@@ -6,6 +6,9 @@ import type {
   HealthResponse,
   AlgorithmsResponse,
   VersionResponse,
+  TilesetRequest,
+  TilesetInfo,
+  Tile,
   APIError,
 } from '../types';
 
@@ -59,6 +62,50 @@ export const separatorAPI = {
     }
   },
 
+  /**
+   * Build a level-of-detail tileset over posted points or registered datasets
+   */
+  createTileset: async (data: TilesetRequest): Promise<TilesetInfo> => {
+    try {
+      const response = await api.post<TilesetInfo>('/api/tiles', data);
+      return response.data;
+    } catch (error) {
+      const axiosError = error as AxiosError<APIError>;
+      throw new Error(
+        axiosError.response?.data?.detail || 'Failed to create tileset'
+      );
+    }
+  },
+
+  /**
+   * Get tileset details
+   */
+  getTileset: async (tilesetId: string): Promise<TilesetInfo> => {
+    try {
+      const response = await api.get<TilesetInfo>(`/api/tiles/${tilesetId}`);
+      return response.data;
+    } catch (error) {
+      throw new Error(`Failed to load tileset ${tilesetId}`);
+    }
+  },
+
+  /**
+   * Get one tile; pass a signal to cancel tiles that scrolled out of view
+   */
+  getTile: async (
+    tilesetId: string,
+    z: number,
+    x: number,
+    y: number,
+    signal?: AbortSignal
+  ): Promise<Tile> => {
+    const response = await api.get<Tile>(
+      `/api/tiles/${tilesetId}/${z}/${x}/${y}`,
+      { signal }
+    );
+    return response.data;
+  },
+
   /**
    * Get API health status
    */
@@ -2,6 +2,7 @@
 export interface Point {
   x: number;
   y: number;
+  weight?: number;
 }
 
 // Shape types
@@ -28,7 +29,9 @@ export interface ComputeResponse {
   computation_id: number | null;
   shapes: Shape[];
   blue_covered: number;
+  blue_weight_covered: number;
   red_covered: number;
+  red_weight_covered: number;
   total_red: number;
   total_blue: number;
   execution_time_ms: number;
@@ -36,6 +39,50 @@ export interface ComputeResponse {
   created_at: string | null;
 }
 
+// Level-of-detail tiles
+export interface TilesetRequest {
+  red_points?: Point[];
+  blue_points?: Point[];
+  red_dataset_id?: string;
+  blue_dataset_id?: string;
+  shapes?: Shape[];
+}
+
+export interface TilesetInfo {
+  tileset_id: string;
+  red_dataset_id: string | null;
+  blue_dataset_id: string | null;
+  shapes: Shape[];
+  tile_bins: number;
+  origin_x: number;
+  origin_y: number;
+  size: number;
+  bounds: [number, number, number, number];
+  max_zoom: number;
+  total_red: number;
+  total_blue: number;
+}
+
+// Non-empty bins of one colour as parallel arrays
+export interface TileLayer {
+  x: number[];
+  y: number[];
+  count: number[];
+  weight: number[];
+  total: number;
+}
+
+export interface Tile {
+  tileset_id: string;
+  z: number;
+  x: number;
+  y: number;
+  bounds: [number, number, number, number];
+  red: TileLayer;
+  blue: TileLayer;
+  shapes: Shape[];
+}
+
 export interface HealthResponse {
   status: string;
   message: string;